@@ -455,6 +455,7 @@ usage(const string& n)
         "--all                    Generate code for Slice definitions in included files.\n"
         "--checksum               Generate checksums for Slice definitions.\n"
         "--prefix PREFIX          Prepend filenames of Python modules with PREFIX.\n"
+        "--slots                  Generate __slots__ for all structs and classes.\n"
         ;
 }
 
@@ -482,6 +483,7 @@ Slice::Python::compile(const vector<string>& argv)
     opts.addOpt("", "build-package");
     opts.addOpt("", "checksum");
     opts.addOpt("", "prefix", IceUtilInternal::Options::NeedArg);
+    opts.addOpt("", "slots");
 
     vector<string> args;
     try
@@ -552,6 +554,8 @@ Slice::Python::compile(const vector<string>& argv)
 
     string prefix = opts.optArg("prefix");
 
+    bool slots = opts.isSet("slots");
+
     if(args.empty())
     {
         consoleErr << argv[0] << ": error: no input file" << endl;
@@ -761,7 +765,7 @@ Slice::Python::compile(const vector<string>& argv)
                             //
                             // Generate Python code.
                             //
-                            generate(u, all, checksum, includePaths, out);
+                            generate(u, all, checksum, slots, includePaths, out);
 
                             out.close();
                         }
@@ -33,6 +33,111 @@ getEscapedParamName(const OperationPtr& p, const string& name)
     return name;
 }
 
+//
+// Returns true if the given structure only contains numeric members or fixed-size
+// structures with numeric members, such structures can be mapped to NumPy records.
+//
+bool
+isNumericStruct(const StructPtr& st)
+{
+    if(!st)
+    {
+        return false;
+    }
+
+    DataMemberList members = st->dataMembers();
+    for(DataMemberList::const_iterator p = members.begin(); p != members.end(); ++p)
+    {
+        BuiltinPtr builtin = BuiltinPtr::dynamicCast((*p)->type());
+        if(builtin)
+        {
+            switch(builtin->kind())
+            {
+            case Builtin::KindBool:
+            case Builtin::KindByte:
+            case Builtin::KindShort:
+            case Builtin::KindInt:
+            case Builtin::KindLong:
+            case Builtin::KindFloat:
+            case Builtin::KindDouble:
+                {
+                    break;
+                }
+            default:
+                {
+                    return false;
+                }
+            }
+        }
+        else if(!isNumericStruct(StructPtr::dynamicCast((*p)->type())))
+        {
+            return false;
+        }
+    }
+    return true;
+}
+
+//
+// Returns true if values of the given type can be skipped over in the stream without
+// unmarshaling them, that is if the type doesn't contain any classes or proxies. The
+// elements of lazy sequences must be of such a type.
+//
+bool
+isLazyElementType(const TypePtr& type)
+{
+    BuiltinPtr builtin = BuiltinPtr::dynamicCast(type);
+    if(builtin)
+    {
+        switch(builtin->kind())
+        {
+        case Builtin::KindObject:
+        case Builtin::KindObjectProxy:
+        case Builtin::KindLocalObject:
+        case Builtin::KindValue:
+            {
+                return false;
+            }
+        default:
+            {
+                return true;
+            }
+        }
+    }
+
+    if(EnumPtr::dynamicCast(type))
+    {
+        return true;
+    }
+
+    StructPtr st = StructPtr::dynamicCast(type);
+    if(st)
+    {
+        DataMemberList members = st->dataMembers();
+        for(DataMemberList::const_iterator p = members.begin(); p != members.end(); ++p)
+        {
+            if(!isLazyElementType((*p)->type()))
+            {
+                return false;
+            }
+        }
+        return true;
+    }
+
+    SequencePtr seq = SequencePtr::dynamicCast(type);
+    if(seq)
+    {
+        return isLazyElementType(seq->type());
+    }
+
+    DictionaryPtr dict = DictionaryPtr::dynamicCast(type);
+    if(dict)
+    {
+        return isLazyElementType(dict->keyType()) && isLazyElementType(dict->valueType());
+    }
+
+    return false;
+}
+
 }
 
 namespace Slice
@@ -65,9 +170,10 @@ private:
     StringList validateSequence(const string&, const string&, const TypePtr&, const StringList&);
 
     //
-    // Checks a definition that doesn't currently support Python metadata.
+    // Checks a definition that doesn't currently support Python metadata, other
+    // than the given directive (if any).
     //
-    void reject(const ContainedPtr&);
+    void reject(const ContainedPtr&, const string& = "");
 
     StringSet _history;
 };
@@ -102,7 +208,7 @@ class CodeVisitor : public ParserVisitor
 {
 public:
 
-    CodeVisitor(IceUtilInternal::Output&, set<string>&);
+    CodeVisitor(IceUtilInternal::Output&, set<string>&, bool);
 
     virtual bool visitModuleStart(const ModulePtr&);
     virtual void visitModuleEnd(const ModulePtr&);
@@ -152,6 +258,12 @@ private:
     //
     void writeMetaData(const StringList&);
 
+    //
+    // Emit a __slots__ declaration for the given data members if the type
+    // uses the python:slots metadata or slots are enabled for all types.
+    //
+    void writeSlots(const ContainedPtr&, const DataMemberList&, bool);
+
     //
     // Convert an operation mode into a string.
     //
@@ -201,7 +313,7 @@ private:
     };
     bool parseOpComment(const string&, OpComment&);
 
-    enum DocstringMode { DocSync, DocAsync, DocAsyncBegin, DocAsyncEnd, DocDispatch, DocAsyncDispatch };
+    enum DocstringMode { DocSync, DocAsync, DocAsyncMany, DocAsyncBegin, DocAsyncEnd, DocDispatch, DocAsyncDispatch };
 
     void writeDocstring(const OperationPtr&, DocstringMode, bool);
 
@@ -209,6 +321,7 @@ private:
     set<string>& _moduleHistory;
     list<string> _moduleStack;
     set<string> _classHistory;
+    bool _slots;
 };
 
 }
@@ -335,9 +448,10 @@ Slice::Python::ModuleVisitor::visitModuleStart(const ModulePtr& p)
 //
 // CodeVisitor implementation.
 //
-Slice::Python::CodeVisitor::CodeVisitor(Output& out, set<string>& moduleHistory) :
+Slice::Python::CodeVisitor::CodeVisitor(Output& out, set<string>& moduleHistory, bool slots) :
     _out(out),
-    _moduleHistory(moduleHistory)
+    _moduleHistory(moduleHistory),
+    _slots(slots)
 {
 }
 
@@ -486,7 +600,7 @@ Slice::Python::CodeVisitor::writeOperations(const ClassDefPtr& p)
                     }
                 }
 
-                if(!p->isLocal())
+                if(!p->isLocal() && !(*oli)->hasMetaData("python:no-current"))
                 {
                     const string currentParamName = getEscapedParamName(*oli, "current");
                     _out << ", " << currentParamName << "=None";
@@ -512,7 +626,7 @@ Slice::Python::CodeVisitor::writeOperations(const ClassDefPtr& p)
                         _out << ", " << fixIdent((*pli)->name());
                     }
                 }
-                if(!p->isLocal())
+                if(!p->isLocal() && !(*oli)->hasMetaData("python:no-current"))
                 {
                     const string currentParamName = getEscapedParamName(*oli, "current");
                     _out << ", " << currentParamName << "=None";
@@ -596,6 +710,15 @@ Slice::Python::CodeVisitor::visitClassDefStart(const ClassDefPtr& p)
 
         writeDocstring(p->comment(), p->dataMembers());
 
+        if(!isInterface)
+        {
+            //
+            // Preserved instances also need a slot for their sliced data.
+            //
+            bool preservedRoot = p->hasMetaData("preserve-slice") && !p->inheritsMetaData("preserve-slice");
+            writeSlots(p, p->dataMembers(), preservedRoot);
+        }
+
         //
         // __init__
         //
@@ -856,6 +979,14 @@ Slice::Python::CodeVisitor::visitClassDefStart(const ClassDefPtr& p)
             _out << "), " << contextParamName << "))";
             _out.dec();
 
+            _out << sp;
+            writeDocstring(*oli, DocAsyncMany, false);
+            _out << nl << "def " << (*oli)->name() << "AsyncMany(self, args, " << contextParamName << "=None):";
+            _out.inc();
+            _out << nl << "return _M_" << classAbs << "._op_" << (*oli)->name() << ".invokeAsyncMany(self, (args, "
+                 << contextParamName << "))";
+            _out.dec();
+
             _out << sp;
             writeDocstring(*oli, DocAsyncBegin, false);
             _out << nl << "def begin_" << (*oli)->name() << "(self";
@@ -1208,6 +1339,10 @@ Slice::Python::CodeVisitor::visitExceptionStart(const ExceptionPtr& p)
 
     writeDocstring(p->comment(), members);
 
+    //
+    // Exceptions don't declare __slots__, instances of BaseException subclasses always have a dictionary.
+    //
+
     //
     // __init__
     //
@@ -1349,6 +1484,8 @@ Slice::Python::CodeVisitor::visitStructStart(const StructPtr& p)
 
     writeDocstring(p->comment(), members);
 
+    writeSlots(p, members, false);
+
     _out << nl << "def __init__(self";
     writeConstructorParams(memberList);
     _out << "):";
@@ -1977,6 +2114,44 @@ Slice::Python::CodeVisitor::writeMetaData(const StringList& meta)
     _out << ')';
 }
 
+void
+Slice::Python::CodeVisitor::writeSlots(const ContainedPtr& p, const DataMemberList& members, bool slicedData)
+{
+    if(!_slots && !p->hasMetaData("python:slots"))
+    {
+        return;
+    }
+
+    //
+    // Only the members declared by this type are listed, the slots of the
+    // base types are inherited.
+    //
+    _out << nl << "__slots__ = (";
+    int count = 0;
+    for(DataMemberList::const_iterator q = members.begin(); q != members.end(); ++q, ++count)
+    {
+        if(count > 0)
+        {
+            _out << ", ";
+        }
+        _out << "'" << fixIdent((*q)->name()) << "'";
+    }
+    if(slicedData)
+    {
+        if(count > 0)
+        {
+            _out << ", ";
+        }
+        _out << "'_ice_slicedData'";
+        ++count;
+    }
+    if(count == 1)
+    {
+        _out << ',';
+    }
+    _out << ")";
+}
+
 void
 Slice::Python::CodeVisitor::writeAssign(const MemberInfo& info)
 {
@@ -2687,7 +2862,7 @@ Slice::Python::CodeVisitor::writeDocstring(const OperationPtr& op, DocstringMode
         {
             return;
         }
-        else if((mode == DocAsync || mode == DocAsyncBegin) && inParams.empty())
+        else if((mode == DocAsync || mode == DocAsyncMany || mode == DocAsyncBegin) && inParams.empty())
         {
             return;
         }
@@ -2725,13 +2900,35 @@ Slice::Python::CodeVisitor::writeDocstring(const OperationPtr& op, DocstringMode
     case DocDispatch:
         needArgs = !local || !inParams.empty();
         break;
+    case DocAsyncMany:
     case DocAsyncEnd:
     case DocAsyncDispatch:
         needArgs = true;
         break;
     }
 
-    if(needArgs)
+    if(mode == DocAsyncMany)
+    {
+        _out << nl << "Arguments:"
+             << nl << "args -- An iterable of tuples, each tuple holds the in parameters of one invocation:";
+        for(vector<string>::iterator q = inParams.begin(); q != inParams.end(); ++q)
+        {
+            string fixed = fixIdent(*q);
+            _out << nl << "    " << fixed << " -- ";
+            StringMap::const_iterator r = comment.params.find(*q);
+            if(r == comment.params.end())
+            {
+                r = comment.params.find(fixed); // Just in case.
+            }
+            if(r != comment.params.end())
+            {
+                _out << r->second;
+            }
+        }
+        const string contextParamName = getEscapedParamName(op, "context");
+        _out << nl << contextParamName << " -- The request context for the invocations.";
+    }
+    else if(needArgs)
     {
         _out << nl << "Arguments:";
         for(vector<string>::iterator q = inParams.begin(); q != inParams.end(); ++q)
@@ -2759,7 +2956,7 @@ Slice::Python::CodeVisitor::writeDocstring(const OperationPtr& op, DocstringMode
              const string contextParamName = getEscapedParamName(op, "context");
             _out << nl << contextParamName << " -- The request context for the invocation.";
         }
-        if(!local && (mode == DocDispatch || mode == DocAsyncDispatch))
+        if(!local && (mode == DocDispatch || mode == DocAsyncDispatch) && !op->hasMetaData("python:no-current"))
         {
             const string currentParamName = getEscapedParamName(op, "current");
             _out << nl << currentParamName << " -- The Current object for the invocation.";
@@ -2778,6 +2975,10 @@ Slice::Python::CodeVisitor::writeDocstring(const OperationPtr& op, DocstringMode
     {
         _out << nl << "Returns: A future object for the invocation.";
     }
+    if(mode == DocAsyncMany)
+    {
+        _out << nl << "Returns: A future object that completes with the list of results, in the order of args.";
+    }
     if(mode == DocAsyncBegin)
     {
         _out << nl << "Returns: An asynchronous result object for the invocation.";
@@ -2917,7 +3118,7 @@ Slice::Python::getImportFileName(const string& file, const UnitPtr& ut, const ve
 }
 
 void
-Slice::Python::generate(const UnitPtr& un, bool all, bool checksum, const vector<string>& includePaths,
+Slice::Python::generate(const UnitPtr& un, bool all, bool checksum, bool slots, const vector<string>& includePaths,
                         Output& out)
 {
     Slice::Python::MetaDataVisitor visitor;
@@ -2946,7 +3147,7 @@ Slice::Python::generate(const UnitPtr& un, bool all, bool checksum, const vector
     ModuleVisitor moduleVisitor(out, moduleHistory);
     un->visit(&moduleVisitor, true);
 
-    CodeVisitor codeVisitor(out, moduleHistory);
+    CodeVisitor codeVisitor(out, moduleHistory, slots);
     un->visit(&codeVisitor, false);
 
     if(checksum)
@@ -3175,7 +3376,7 @@ Slice::Python::MetaDataVisitor::visitClassDecl(const ClassDeclPtr& p)
 bool
 Slice::Python::MetaDataVisitor::visitClassDefStart(const ClassDefPtr& p)
 {
-    reject(p);
+    reject(p, p->isInterface() ? "" : "python:slots");
     return true;
 }
 
@@ -3189,17 +3390,49 @@ Slice::Python::MetaDataVisitor::visitExceptionStart(const ExceptionPtr& p)
 bool
 Slice::Python::MetaDataVisitor::visitStructStart(const StructPtr& p)
 {
-    reject(p);
+    reject(p, "python:slots");
     return true;
 }
 
 void
 Slice::Python::MetaDataVisitor::visitOperation(const OperationPtr& p)
 {
+    static const string noCurrent = "python:no-current";
+    StringList metaData = p->getMetaData();
+    if(p->hasMetaData(noCurrent))
+    {
+        //
+        // Remove from list so validateSequence does not try to handle as well.
+        //
+        metaData.remove(noCurrent);
+        ClassDefPtr cl = ClassDefPtr::dynamicCast(p->container());
+        string reason;
+        if(cl->isLocal())
+        {
+            reason = "local operations do not receive a current object";
+        }
+        else if(p->hasMarshaledResult())
+        {
+            reason = "operations with a marshaled result require the current object";
+        }
+
+        if(!reason.empty())
+        {
+            const UnitPtr ut = p->unit();
+            const DefinitionContextPtr dc = ut->findDefinitionContext(p->file());
+            assert(dc);
+            dc->warning(InvalidMetaData, p->file(), p->line(), "ignoring invalid metadata `" + noCurrent + "': " +
+                        reason);
+            StringList localMetaData = p->getMetaData();
+            localMetaData.remove(noCurrent);
+            p->setMetaData(localMetaData);
+        }
+    }
+
     TypePtr ret = p->returnType();
     if(ret)
     {
-        validateSequence(p->file(), p->line(), ret, p->getMetaData());
+        validateSequence(p->file(), p->line(), ret, metaData);
     }
 
     ParamDeclList params = p->parameters();
@@ -3219,10 +3452,12 @@ void
 Slice::Python::MetaDataVisitor::visitSequence(const SequencePtr& p)
 {
     static const string protobuf = "python:protobuf:";
+    static const string zeroCopy = "python:zero-copy";
     StringList metaData = p->getMetaData();
     const string file = p->file();
     const string line = p->line();
     StringList protobufMetaData;
+    StringList zeroCopyMetaData;
     const UnitPtr ut = p->unit();
     const DefinitionContextPtr dc = ut->findDefinitionContext(file);
     assert(dc);
@@ -3247,10 +3482,37 @@ Slice::Python::MetaDataVisitor::visitSequence(const SequencePtr& p)
                 protobufMetaData.push_back(s);
             }
         }
+        else if(s == zeroCopy)
+        {
+            //
+            // Remove from list so validateSequence does not try to handle as well. The
+            // zero-copy metadata only applies to the buffer based sequence mappings.
+            //
+            metaData.remove(s);
+            BuiltinPtr builtin = BuiltinPtr::dynamicCast(p->type());
+            bool buffer = false;
+            for(StringList::const_iterator r = metaData.begin(); r != metaData.end(); ++r)
+            {
+                if(*r == "python:numpy.ndarray" || r->find("python:memoryview:") == 0)
+                {
+                    buffer = true;
+                }
+            }
+            if(!builtin || builtin->kind() >= Builtin::KindString || !buffer)
+            {
+                dc->warning(InvalidMetaData, file, line, "ignoring invalid metadata `" + s + ": " +
+                            "`zero-copy' requires the `numpy.ndarray' or `memoryview' mapping");
+            }
+            else
+            {
+                zeroCopyMetaData.push_back(s);
+            }
+        }
     }
 
     metaData = validateSequence(file, line, p, metaData);
     metaData.insert(metaData.end(), protobufMetaData.begin(), protobufMetaData.end());
+    metaData.insert(metaData.end(), zeroCopyMetaData.begin(), zeroCopyMetaData.end());
     p->setMetaData(metaData);
 }
 
@@ -3298,6 +3560,17 @@ Slice::Python::MetaDataVisitor::validateSequence(const string& file, const strin
                     {
                         continue;
                     }
+                    else if(arg == "lazy")
+                    {
+                        //
+                        // The elements of a lazy sequence are unmarshaled on demand, this requires
+                        // an element type that doesn't contain classes or proxies.
+                        //
+                        if(isLazyElementType(seq->type()))
+                        {
+                            continue;
+                        }
+                    }
                 }
                 else if(s.size() > prefix.size())
                 {
@@ -3306,6 +3579,17 @@ Slice::Python::MetaDataVisitor::validateSequence(const string& file, const strin
                     {
                         continue;
                     }
+                    else if(arg == "numpy.recarray")
+                    {
+                        //
+                        // The numpy.recarray sequence metadata is only valid for sequences of
+                        // structures with numeric members.
+                        //
+                        if(isNumericStruct(StructPtr::dynamicCast(seq->type())))
+                        {
+                            continue;
+                        }
+                    }
                     else if(arg == "array.array" || arg == "numpy.ndarray" || arg.find("memoryview:") == 0)
                     {
                         //
@@ -3344,7 +3628,7 @@ Slice::Python::MetaDataVisitor::validateSequence(const string& file, const strin
 }
 
 void
-Slice::Python::MetaDataVisitor::reject(const ContainedPtr& cont)
+Slice::Python::MetaDataVisitor::reject(const ContainedPtr& cont, const string& allowed)
 {
     StringList localMetaData = cont->getMetaData();
     static const string prefix = "python:";
@@ -3356,7 +3640,7 @@ Slice::Python::MetaDataVisitor::reject(const ContainedPtr& cont)
     for(StringList::const_iterator p = localMetaData.begin(); p != localMetaData.end();)
     {
         string s = *p++;
-        if(s.find(prefix) == 0)
+        if(s.find(prefix) == 0 && s != allowed)
         {
             dc->warning(InvalidMetaData, cont->file(), cont->line(), "ignoring invalid metadata `" + s + "'");
             localMetaData.remove(s);
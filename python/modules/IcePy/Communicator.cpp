@@ -9,6 +9,7 @@
 #include <ImplicitContext.h>
 #include <Logger.h>
 #include <ObjectAdapter.h>
+#include <Observer.h>
 #include <Operation.h>
 #include <Properties.h>
 #include <PropertiesAdmin.h>
@@ -61,6 +62,10 @@ struct CommunicatorObject
     WaitForShutdownThreadPtr* shutdownThread;
     bool shutdown;
     DispatcherPtr* dispatcher;
+    CommunicatorObserverPtr* observer;
+    PyObject* eventLoopAdapter;
+    StringTablePtr* stringTable;
+    ContextCachePtr* contextCache;
 };
 
 }
@@ -83,6 +88,10 @@ communicatorNew(PyTypeObject* type, PyObject* /*args*/, PyObject* /*kwds*/)
     self->shutdownThread = 0;
     self->shutdown = false;
     self->dispatcher = 0;
+    self->observer = 0;
+    self->eventLoopAdapter = 0;
+    self->stringTable = new StringTablePtr(new StringTable);
+    self->contextCache = new ContextCachePtr(new ContextCache);
     return self;
 }
 
@@ -200,6 +209,8 @@ communicatorInit(CommunicatorObject* self, PyObject* args, PyObject* /*kwds*/)
 
     Ice::InitializationData data;
     DispatcherPtr dispatcherWrapper;
+    CommunicatorObserverPtr observerWrapper;
+    PyObjectHandle eventLoopAdapter;
 
     try
     {
@@ -212,6 +223,9 @@ communicatorInit(CommunicatorObject* self, PyObject* args, PyObject* /*kwds*/)
             PyObjectHandle threadStop = getAttr(initData, "threadStop", false);
             PyObjectHandle batchRequestInterceptor = getAttr(initData, "batchRequestInterceptor", false);
             PyObjectHandle dispatcher = getAttr(initData, "dispatcher", false);
+            PyObjectHandle eventLoop = getAttr(initData, "eventLoop", false);
+            PyObjectHandle observer = getAttr(initData, "observer", false);
+            PyObjectHandle observerSampleRate = getAttr(initData, "observerSampleRate", false);
 
             if(properties.get())
             {
@@ -243,6 +257,39 @@ communicatorInit(CommunicatorObject* self, PyObject* args, PyObject* /*kwds*/)
             {
                 data.batchRequestInterceptor = new BatchRequestInterceptor(batchRequestInterceptor.get());
             }
+
+            if(observer.get())
+            {
+                long sampleRate = 1;
+                if(observerSampleRate.get())
+                {
+                    sampleRate = PyLong_AsLong(observerSampleRate.get());
+                    if(PyErr_Occurred() || sampleRate < 1 || sampleRate > INT_MAX)
+                    {
+                        PyErr_Clear();
+                        PyErr_Format(PyExc_ValueError, STRCAST("observerSampleRate must be a positive integer"));
+                        return -1;
+                    }
+                }
+                observerWrapper = new CommunicatorObserver(observer.get(), static_cast<int>(sampleRate));
+                data.observer = observerWrapper;
+            }
+
+            if(eventLoop.get())
+            {
+                PyObject* eventLoopAdapterType = lookupType("Ice.EventLoopAdapter");
+                if(!eventLoopAdapterType)
+                {
+                    PyErr_Clear();
+                    PyErr_Format(PyExc_ValueError, STRCAST("eventLoop requires Python 3.5 or later"));
+                    return -1;
+                }
+                eventLoopAdapter = PyObject_CallFunctionObjArgs(eventLoopAdapterType, eventLoop.get(), 0);
+                if(!eventLoopAdapter.get())
+                {
+                    return -1;
+                }
+            }
         }
 
         //
@@ -346,6 +393,14 @@ communicatorInit(CommunicatorObject* self, PyObject* args, PyObject* /*kwds*/)
         dispatcherWrapper->setCommunicator(communicator);
     }
 
+    if(observerWrapper)
+    {
+        self->observer = new CommunicatorObserverPtr(observerWrapper);
+        observerWrapper->setCommunicator(communicator);
+    }
+
+    self->eventLoopAdapter = eventLoopAdapter.release();
+
     return 0;
 }
 
@@ -369,11 +424,16 @@ communicatorDealloc(CommunicatorObject* self)
 
     if(self->shutdownThread)
     {
+        AllowThreads allowThreads; // The thread needs the GIL to call its callbacks.
         (*self->shutdownThread)->getThreadControl().join();
     }
     delete self->communicator;
     delete self->shutdownMonitor;
     delete self->shutdownThread;
+    delete self->observer;
+    Py_XDECREF(self->eventLoopAdapter);
+    delete self->stringTable;
+    delete self->contextCache;
     Py_TYPE(self)->tp_free(reinterpret_cast<PyObject*>(self));
 }
 
@@ -405,6 +465,11 @@ communicatorDestroy(CommunicatorObject* self, PyObject* /*args*/)
         (*self->dispatcher)->setCommunicator(0); // Break cyclic reference.
     }
 
+    if(self->observer)
+    {
+        (*self->observer)->setCommunicator(0); // Break cyclic reference.
+    }
+
     //
     // Break cyclic reference between this object and its Python wrapper.
     //
@@ -444,6 +509,22 @@ communicatorShutdown(CommunicatorObject* self, PyObject* /*args*/)
     return Py_None;
 }
 
+//
+// Must be called with the shutdown monitor locked.
+//
+static void
+startShutdownThread(CommunicatorObject* self)
+{
+    if(self->shutdownThread == 0)
+    {
+        WaitForShutdownThreadPtr t = new WaitForShutdownThread(*self->communicator,
+                                                               &Ice::Communicator::waitForShutdown,
+                                                               *self->shutdownMonitor, self->shutdown);
+        self->shutdownThread = new WaitForShutdownThreadPtr(t);
+        t->start();
+    }
+}
+
 #ifdef WIN32
 extern "C"
 #endif
@@ -474,18 +555,11 @@ communicatorWaitForShutdown(CommunicatorObject* self, PyObject* args)
     //
     if(PyThread_get_thread_ident() == _mainThreadId)
     {
-        IceUtil::Monitor<IceUtil::Mutex>::Lock sync(*self->shutdownMonitor);
+        AllowThreadsLock sync(*self->shutdownMonitor);
 
         if(!self->shutdown)
         {
-            if(self->shutdownThread == 0)
-            {
-                WaitForShutdownThreadPtr t = new WaitForShutdownThread(*self->communicator,
-                                                                       &Ice::Communicator::waitForShutdown,
-                                                                       *self->shutdownMonitor, self->shutdown);
-                self->shutdownThread = new WaitForShutdownThreadPtr(t);
-                t->start();
-            }
+            startShutdownThread(self);
 
             while(!self->shutdown)
             {
@@ -528,6 +602,40 @@ communicatorWaitForShutdown(CommunicatorObject* self, PyObject* args)
     PyRETURN_TRUE;
 }
 
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+communicatorNotifyShutdown(CommunicatorObject* self, PyObject* args)
+{
+    //
+    // Calls the given callable from an Ice thread once the communicator is shut down. Returns false
+    // without registering the callable if the communicator is already shut down.
+    //
+    PyObject* callback;
+    if(!PyArg_ParseTuple(args, STRCAST("O"), &callback))
+    {
+        return 0;
+    }
+
+    if(!PyCallable_Check(callback))
+    {
+        PyErr_Format(PyExc_ValueError, STRCAST("callback must be a callable"));
+        return 0;
+    }
+
+    assert(self->communicator);
+
+    AllowThreadsLock sync(*self->shutdownMonitor);
+    if(self->shutdown)
+    {
+        PyRETURN_FALSE;
+    }
+    startShutdownThread(self);
+    (*self->shutdownThread)->addCallback(callback);
+    PyRETURN_TRUE;
+}
+
 #ifdef WIN32
 extern "C"
 #endif
@@ -1714,6 +1822,8 @@ static PyMethodDef CommunicatorMethods[] =
         PyDoc_STR(STRCAST("shutdown() -> None")) },
     { STRCAST("waitForShutdown"), reinterpret_cast<PyCFunction>(communicatorWaitForShutdown), METH_VARARGS,
         PyDoc_STR(STRCAST("waitForShutdown() -> None")) },
+    { STRCAST("_notifyShutdown"), reinterpret_cast<PyCFunction>(communicatorNotifyShutdown), METH_VARARGS,
+        PyDoc_STR(STRCAST("internal function")) },
     { STRCAST("isShutdown"), reinterpret_cast<PyCFunction>(communicatorIsShutdown), METH_NOARGS,
         PyDoc_STR(STRCAST("isShutdown() -> bool")) },
     { STRCAST("stringToProxy"), reinterpret_cast<PyCFunction>(communicatorStringToProxy), METH_VARARGS,
@@ -1901,6 +2011,39 @@ IcePy::getCommunicatorWrapper(const Ice::CommunicatorPtr& communicator)
     }
 }
 
+PyObject*
+IcePy::getCommunicatorEventLoopAdapter(const Ice::CommunicatorPtr& communicator)
+{
+    CommunicatorMap::iterator p = _communicatorMap.find(communicator);
+    if(p == _communicatorMap.end())
+    {
+        return 0;
+    }
+    return reinterpret_cast<CommunicatorObject*>(p->second)->eventLoopAdapter;
+}
+
+IcePy::StringTablePtr
+IcePy::getCommunicatorStringTable(const Ice::CommunicatorPtr& communicator)
+{
+    CommunicatorMap::iterator p = _communicatorMap.find(communicator);
+    if(p == _communicatorMap.end())
+    {
+        return 0;
+    }
+    return *reinterpret_cast<CommunicatorObject*>(p->second)->stringTable;
+}
+
+IcePy::ContextCachePtr
+IcePy::getCommunicatorContextCache(const Ice::CommunicatorPtr& communicator)
+{
+    CommunicatorMap::iterator p = _communicatorMap.find(communicator);
+    if(p == _communicatorMap.end())
+    {
+        return 0;
+    }
+    return *reinterpret_cast<CommunicatorObject*>(p->second)->contextCache;
+}
+
 extern "C"
 PyObject*
 IcePy_identityToString(PyObject* /*self*/, PyObject* args)
@@ -7,10 +7,17 @@
 
 #include <Config.h>
 #include <Ice/CommunicatorF.h>
+#include <IceUtil/Handle.h>
 
 namespace IcePy
 {
 
+class StringTable;
+typedef IceUtil::Handle<StringTable> StringTablePtr;
+
+class ContextCache;
+typedef IceUtil::Handle<ContextCache> ContextCachePtr;
+
 extern PyTypeObject CommunicatorType;
 
 bool initCommunicator(PyObject*);
@@ -20,6 +27,24 @@ Ice::CommunicatorPtr getCommunicator(PyObject*);
 PyObject* createCommunicator(const Ice::CommunicatorPtr&);
 PyObject* getCommunicatorWrapper(const Ice::CommunicatorPtr&);
 
+//
+// Returns a borrowed reference to the communicator's Ice.EventLoopAdapter, or 0 if the
+// communicator was not configured with an event loop.
+//
+PyObject* getCommunicatorEventLoopAdapter(const Ice::CommunicatorPtr&);
+
+//
+// Returns the table used to share the string objects unmarshaled by the communicator's
+// streams, or nil if the communicator has no Python wrapper.
+//
+StringTablePtr getCommunicatorStringTable(const Ice::CommunicatorPtr&);
+
+//
+// Returns the cache of the context dictionaries converted by the communicator's invocations,
+// or nil if the communicator has no Python wrapper.
+//
+ContextCachePtr getCommunicatorContextCache(const Ice::CommunicatorPtr&);
+
 }
 
 extern "C" PyObject* IcePy_initialize(PyObject*, PyObject*);
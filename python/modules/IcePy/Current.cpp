@@ -4,6 +4,7 @@
 
 #include <Current.h>
 #include <structmember.h>
+#include <Communicator.h>
 #include <Connection.h>
 #include <ObjectAdapter.h>
 #include <Util.h>
@@ -203,6 +204,21 @@ currentGetter(CurrentObject* self, void* closure)
                 self->ctx = 0;
                 break;
             }
+
+            //
+            // Servants often pass the dispatch context to their own invocations. Add the dictionary
+            // to the communicator's context cache so that it doesn't need to be converted back.
+            //
+            if(self->current->adapter && !self->current->ctx.empty())
+            {
+                ContextCachePtr cache = getCommunicatorContextCache(self->current->adapter->getCommunicator());
+                if(cache)
+                {
+                    SharedContextPtr context = new SharedContext;
+                    context->context = self->current->ctx;
+                    cache->add(self->ctx, context);
+                }
+            }
         }
         Py_INCREF(self->ctx);
         result = self->ctx;
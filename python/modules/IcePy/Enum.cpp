@@ -0,0 +1,314 @@
+//
+// Copyright (c) ZeroC, Inc. All rights reserved.
+//
+
+#include <Enum.h>
+#include <Util.h>
+
+using namespace std;
+using namespace IcePy;
+
+#ifdef WIN32
+extern "C"
+#endif
+static EnumObject*
+enumNew(PyTypeObject* type, PyObject* /*args*/, PyObject* /*kwds*/)
+{
+    EnumObject* self = reinterpret_cast<EnumObject*>(type->tp_alloc(type, 0));
+    if(!self)
+    {
+        return 0;
+    }
+    self->name = 0;
+    self->value = 0;
+    return self;
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static int
+enumInit(EnumObject* self, PyObject* args, PyObject* /*kwds*/)
+{
+    PyObject* name;
+    PyObject* value;
+    if(!PyArg_ParseTuple(args, STRCAST("OO"), &name, &value))
+    {
+        return -1;
+    }
+
+    long v = PyLong_AsLong(value);
+    if(v == -1 && PyErr_Occurred())
+    {
+        return -1;
+    }
+
+    Py_INCREF(name);
+    Py_XDECREF(self->name);
+    self->name = name;
+    self->value = v;
+    return 0;
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static void
+enumDealloc(EnumObject* self)
+{
+    Py_XDECREF(self->name);
+    Py_TYPE(self)->tp_free(reinterpret_cast<PyObject*>(self));
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+enumGetName(EnumObject* self, void* /*closure*/)
+{
+    if(!self->name)
+    {
+        return createString("");
+    }
+    Py_INCREF(self->name);
+    return self->name;
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+enumGetValue(EnumObject* self, void* /*closure*/)
+{
+#if PY_VERSION_HEX >= 0x03000000
+    return PyLong_FromLong(self->value);
+#else
+    return PyInt_FromLong(self->value);
+#endif
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+enumStr(EnumObject* self)
+{
+    return enumGetName(self, 0);
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static long
+enumHash(EnumObject* self)
+{
+    //
+    // -1 is reserved for errors.
+    //
+    return self->value == -1 ? -2 : self->value;
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+enumRichCompare(EnumObject* self, PyObject* other, int op)
+{
+    //
+    // Same semantics as the former Python implementation: enumerators are only ordered
+    // against enumerators of the same type, and any comparison with None is false.
+    //
+    if(other == Py_None)
+    {
+        PyRETURN_FALSE;
+    }
+
+    int isInstance = PyObject_IsInstance(other, reinterpret_cast<PyObject*>(Py_TYPE(self)));
+    if(isInstance < 0)
+    {
+        return 0;
+    }
+    else if(!isInstance)
+    {
+        Py_INCREF(Py_NotImplemented);
+        return Py_NotImplemented;
+    }
+
+    long lhs = self->value;
+    long rhs = reinterpret_cast<EnumObject*>(other)->value;
+    bool result = false;
+    switch(op)
+    {
+        case Py_LT:
+        {
+            result = lhs < rhs;
+            break;
+        }
+        case Py_LE:
+        {
+            result = lhs <= rhs;
+            break;
+        }
+        case Py_EQ:
+        {
+            result = lhs == rhs;
+            break;
+        }
+        case Py_NE:
+        {
+            result = lhs != rhs;
+            break;
+        }
+        case Py_GT:
+        {
+            result = lhs > rhs;
+            break;
+        }
+        case Py_GE:
+        {
+            result = lhs >= rhs;
+            break;
+        }
+    }
+    PyRETURN_BOOL(result);
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+enumReduce(EnumObject* self, PyObject* /*args*/)
+{
+    PyObjectHandle name = enumGetName(self, 0);
+    PyObjectHandle value = enumGetValue(self, 0);
+    if(!name.get() || !value.get())
+    {
+        return 0;
+    }
+    return Py_BuildValue(STRCAST("O(OO)"), Py_TYPE(self), name.get(), value.get());
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+enumSetState(EnumObject* self, PyObject* state)
+{
+    //
+    // Enumerators pickled by the former Python implementation with protocol 2 or later are
+    // created with __new__ and then receive their instance dictionary as the state.
+    //
+    if(!PyDict_Check(state))
+    {
+        PyErr_Format(PyExc_TypeError, STRCAST("enumerator state must be a dictionary"));
+        return 0;
+    }
+
+    PyObject* name = PyDict_GetItemString(state, STRCAST("_name")); // Borrowed reference.
+    PyObject* value = PyDict_GetItemString(state, STRCAST("_value")); // Borrowed reference.
+    if(!name || !value)
+    {
+        PyErr_Format(PyExc_ValueError, STRCAST("enumerator state must contain _name and _value"));
+        return 0;
+    }
+
+    long v = PyLong_AsLong(value);
+    if(v == -1 && PyErr_Occurred())
+    {
+        return 0;
+    }
+
+    Py_INCREF(name);
+    Py_XDECREF(self->name);
+    self->name = name;
+    self->value = v;
+
+    Py_INCREF(Py_None);
+    return Py_None;
+}
+
+static PyMethodDef EnumMethods[] =
+{
+    { STRCAST("__reduce__"), reinterpret_cast<PyCFunction>(enumReduce), METH_NOARGS,
+        PyDoc_STR(STRCAST("__reduce__() -> tuple")) },
+    { STRCAST("__setstate__"), reinterpret_cast<PyCFunction>(enumSetState), METH_O,
+        PyDoc_STR(STRCAST("__setstate__(state) -> None")) },
+    { 0, 0 } /* sentinel */
+};
+
+static PyGetSetDef EnumGetSetters[] =
+{
+    { STRCAST("name"), reinterpret_cast<getter>(enumGetName), 0, STRCAST("enumerator name"), 0 },
+    { STRCAST("value"), reinterpret_cast<getter>(enumGetValue), 0, STRCAST("enumerator value"), 0 },
+    { STRCAST("_name"), reinterpret_cast<getter>(enumGetName), 0, STRCAST("enumerator name"), 0 },
+    { STRCAST("_value"), reinterpret_cast<getter>(enumGetValue), 0, STRCAST("enumerator value"), 0 },
+    { 0 }  /* Sentinel */
+};
+
+namespace IcePy
+{
+
+PyTypeObject EnumBaseType =
+{
+    /* The ob_type field must be initialized in the module init function
+     * to be portable to Windows without using C++. */
+    PyVarObject_HEAD_INIT(0, 0)
+    STRCAST("IcePy.EnumBase"),       /* tp_name */
+    sizeof(EnumObject),              /* tp_basicsize */
+    0,                               /* tp_itemsize */
+    /* methods */
+    reinterpret_cast<destructor>(enumDealloc), /* tp_dealloc */
+    0,                               /* tp_print */
+    0,                               /* tp_getattr */
+    0,                               /* tp_setattr */
+    0,                               /* tp_reserved */
+    reinterpret_cast<reprfunc>(enumStr), /* tp_repr */
+    0,                               /* tp_as_number */
+    0,                               /* tp_as_sequence */
+    0,                               /* tp_as_mapping */
+    reinterpret_cast<hashfunc>(enumHash), /* tp_hash */
+    0,                               /* tp_call */
+    reinterpret_cast<reprfunc>(enumStr), /* tp_str */
+    0,                               /* tp_getattro */
+    0,                               /* tp_setattro */
+    0,                               /* tp_as_buffer */
+    Py_TPFLAGS_DEFAULT | Py_TPFLAGS_BASETYPE, /* tp_flags */
+    0,                               /* tp_doc */
+    0,                               /* tp_traverse */
+    0,                               /* tp_clear */
+    reinterpret_cast<richcmpfunc>(enumRichCompare), /* tp_richcompare */
+    0,                               /* tp_weaklistoffset */
+    0,                               /* tp_iter */
+    0,                               /* tp_iternext */
+    EnumMethods,                     /* tp_methods */
+    0,                               /* tp_members */
+    EnumGetSetters,                  /* tp_getset */
+    0,                               /* tp_base */
+    0,                               /* tp_dict */
+    0,                               /* tp_descr_get */
+    0,                               /* tp_descr_set */
+    0,                               /* tp_dictoffset */
+    reinterpret_cast<initproc>(enumInit), /* tp_init */
+    0,                               /* tp_alloc */
+    reinterpret_cast<newfunc>(enumNew), /* tp_new */
+    0,                               /* tp_free */
+    0,                               /* tp_is_gc */
+};
+
+}
+
+bool
+IcePy::initEnum(PyObject* module)
+{
+    if(PyType_Ready(&EnumBaseType) < 0)
+    {
+        return false;
+    }
+    PyTypeObject* type = &EnumBaseType; // Necessary to prevent GCC's strict-alias warnings.
+    if(PyModule_AddObject(module, STRCAST("EnumBase"), reinterpret_cast<PyObject*>(type)) < 0)
+    {
+        return false;
+    }
+
+    return true;
+}
@@ -0,0 +1,31 @@
+//
+// Copyright (c) ZeroC, Inc. All rights reserved.
+//
+
+#ifndef ICEPY_ENUM_H
+#define ICEPY_ENUM_H
+
+#include <Config.h>
+
+namespace IcePy
+{
+
+//
+// The base type of the classes generated for Slice enumerations. The name and the value
+// of an enumerator are stored in the object, so marshaling an enumerator reads its value
+// directly and hashing and comparisons don't call Python code.
+//
+struct EnumObject
+{
+    PyObject_HEAD
+    PyObject* name;
+    long value;
+};
+
+extern PyTypeObject EnumBaseType;
+
+bool initEnum(PyObject*);
+
+}
+
+#endif
@@ -10,9 +10,11 @@
 #include <Dispatcher.h>
 #include <Endpoint.h>
 #include <EndpointInfo.h>
+#include <Enum.h>
 #include <ImplicitContext.h>
 #include <Logger.h>
 #include <ObjectAdapter.h>
+#include <Observer.h>
 #include <Operation.h>
 #include <Properties.h>
 #include <PropertiesAdmin.h>
@@ -185,6 +187,14 @@ initIcePy(void)
     {
         INIT_RETURN;
     }
+    if(!initObserver(module))
+    {
+        INIT_RETURN;
+    }
+    if(!initEnum(module))
+    {
+        INIT_RETURN;
+    }
     if(!initCommunicator(module))
     {
         INIT_RETURN;
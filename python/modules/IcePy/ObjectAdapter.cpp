@@ -304,13 +304,17 @@ extern "C"
 static void
 adapterDealloc(ObjectAdapterObject* self)
 {
-    if(self->deactivateThread)
+    if(self->deactivateThread || self->holdThread)
     {
-        (*self->deactivateThread)->getThreadControl().join();
-    }
-    if(self->holdThread)
-    {
-        (*self->holdThread)->getThreadControl().join();
+        AllowThreads allowThreads; // The threads need the GIL to call their callbacks.
+        if(self->deactivateThread)
+        {
+            (*self->deactivateThread)->getThreadControl().join();
+        }
+        if(self->holdThread)
+        {
+            (*self->holdThread)->getThreadControl().join();
+        }
     }
     delete self->adapter;
     delete self->deactivateMonitor;
@@ -374,14 +378,23 @@ adapterActivate(ObjectAdapterObject* self, PyObject* /*args*/)
         AllowThreads allowThreads; // Release Python's global interpreter lock during blocking calls.
         (*self->adapter)->activate();
 
-        IceUtil::Monitor<IceUtil::Mutex>::Lock sync(*self->holdMonitor);
-        self->held = false;
-        if(self->holdThread)
+        //
+        // Join the hold thread without the monitor, the thread locks it once the wait completes.
+        //
+        AdapterInvokeThreadPtr* holdThread;
         {
-            (*self->holdThread)->getThreadControl().join();
-            delete self->holdThread;
+            IceUtil::Monitor<IceUtil::Mutex>::Lock sync(*self->holdMonitor);
+            holdThread = self->holdThread;
             self->holdThread = 0;
         }
+        if(holdThread)
+        {
+            (*holdThread)->getThreadControl().join();
+            delete holdThread;
+        }
+
+        IceUtil::Monitor<IceUtil::Mutex>::Lock sync(*self->holdMonitor);
+        self->held = false;
     }
     catch(const Ice::Exception& ex)
     {
@@ -414,6 +427,36 @@ adapterHold(ObjectAdapterObject* self, PyObject* /*args*/)
     return Py_None;
 }
 
+//
+// Must be called with the hold monitor locked.
+//
+static void
+startHoldThread(ObjectAdapterObject* self)
+{
+    if(self->holdThread == 0)
+    {
+        AdapterInvokeThreadPtr t = new AdapterInvokeThread(*self->adapter, &Ice::ObjectAdapter::waitForHold,
+                                                           *self->holdMonitor, self->held);
+        self->holdThread = new AdapterInvokeThreadPtr(t);
+        t->start();
+    }
+}
+
+//
+// Must be called with the deactivate monitor locked.
+//
+static void
+startDeactivateThread(ObjectAdapterObject* self)
+{
+    if(self->deactivateThread == 0)
+    {
+        AdapterInvokeThreadPtr t = new AdapterInvokeThread(*self->adapter, &Ice::ObjectAdapter::waitForDeactivate,
+                                                           *self->deactivateMonitor, self->deactivated);
+        self->deactivateThread = new AdapterInvokeThreadPtr(t);
+        t->start();
+    }
+}
+
 #ifdef WIN32
 extern "C"
 #endif
@@ -444,18 +487,11 @@ adapterWaitForHold(ObjectAdapterObject* self, PyObject* args)
     //
     if(PyThread_get_thread_ident() == _mainThreadId)
     {
-        IceUtil::Monitor<IceUtil::Mutex>::Lock sync(*self->holdMonitor);
+        AllowThreadsLock sync(*self->holdMonitor);
 
         if(!self->held)
         {
-            if(self->holdThread == 0)
-            {
-                AdapterInvokeThreadPtr t = new AdapterInvokeThread(*self->adapter,
-                                                                   &Ice::ObjectAdapter::waitForHold,
-                                                                   *self->holdMonitor, self->held);
-                self->holdThread = new AdapterInvokeThreadPtr(t);
-                t->start();
-            }
+            startHoldThread(self);
 
             bool done;
             {
@@ -495,6 +531,40 @@ adapterWaitForHold(ObjectAdapterObject* self, PyObject* args)
     PyRETURN_TRUE;
 }
 
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+adapterNotifyHold(ObjectAdapterObject* self, PyObject* args)
+{
+    //
+    // Calls the given callable from an Ice thread once the adapter is on hold. Returns false without
+    // registering the callable if the adapter is already on hold.
+    //
+    PyObject* callback;
+    if(!PyArg_ParseTuple(args, STRCAST("O"), &callback))
+    {
+        return 0;
+    }
+
+    if(!PyCallable_Check(callback))
+    {
+        PyErr_Format(PyExc_ValueError, STRCAST("callback must be a callable"));
+        return 0;
+    }
+
+    assert(self->adapter);
+
+    AllowThreadsLock sync(*self->holdMonitor);
+    if(self->held)
+    {
+        PyRETURN_FALSE;
+    }
+    startHoldThread(self);
+    (*self->holdThread)->addCallback(callback);
+    PyRETURN_TRUE;
+}
+
 #ifdef WIN32
 extern "C"
 #endif
@@ -547,18 +617,11 @@ adapterWaitForDeactivate(ObjectAdapterObject* self, PyObject* args)
     //
     if(PyThread_get_thread_ident() == _mainThreadId)
     {
-        IceUtil::Monitor<IceUtil::Mutex>::Lock sync(*self->deactivateMonitor);
+        AllowThreadsLock sync(*self->deactivateMonitor);
 
         if(!self->deactivated)
         {
-            if(self->deactivateThread == 0)
-            {
-                AdapterInvokeThreadPtr t = new AdapterInvokeThread(*self->adapter,
-                                                                   &Ice::ObjectAdapter::waitForDeactivate,
-                                                                   *self->deactivateMonitor, self->deactivated);
-                self->deactivateThread = new AdapterInvokeThreadPtr(t);
-                t->start();
-            }
+            startDeactivateThread(self);
 
             while(!self->deactivated)
             {
@@ -601,6 +664,40 @@ adapterWaitForDeactivate(ObjectAdapterObject* self, PyObject* args)
     PyRETURN_TRUE;
 }
 
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+adapterNotifyDeactivate(ObjectAdapterObject* self, PyObject* args)
+{
+    //
+    // Calls the given callable from an Ice thread once the adapter is deactivated. Returns false
+    // without registering the callable if the adapter is already deactivated.
+    //
+    PyObject* callback;
+    if(!PyArg_ParseTuple(args, STRCAST("O"), &callback))
+    {
+        return 0;
+    }
+
+    if(!PyCallable_Check(callback))
+    {
+        PyErr_Format(PyExc_ValueError, STRCAST("callback must be a callable"));
+        return 0;
+    }
+
+    assert(self->adapter);
+
+    AllowThreadsLock sync(*self->deactivateMonitor);
+    if(self->deactivated)
+    {
+        PyRETURN_FALSE;
+    }
+    startDeactivateThread(self);
+    (*self->deactivateThread)->addCallback(callback);
+    PyRETURN_TRUE;
+}
+
 #ifdef WIN32
 extern "C"
 #endif
@@ -1683,10 +1780,14 @@ static PyMethodDef AdapterMethods[] =
         PyDoc_STR(STRCAST("hold() -> None")) },
     { STRCAST("waitForHold"), reinterpret_cast<PyCFunction>(adapterWaitForHold), METH_VARARGS,
         PyDoc_STR(STRCAST("waitForHold() -> None")) },
+    { STRCAST("_notifyHold"), reinterpret_cast<PyCFunction>(adapterNotifyHold), METH_VARARGS,
+        PyDoc_STR(STRCAST("internal function")) },
     { STRCAST("deactivate"), reinterpret_cast<PyCFunction>(adapterDeactivate), METH_NOARGS,
         PyDoc_STR(STRCAST("deactivate() -> None")) },
     { STRCAST("waitForDeactivate"), reinterpret_cast<PyCFunction>(adapterWaitForDeactivate), METH_VARARGS,
         PyDoc_STR(STRCAST("waitForDeactivate() -> None")) },
+    { STRCAST("_notifyDeactivate"), reinterpret_cast<PyCFunction>(adapterNotifyDeactivate), METH_VARARGS,
+        PyDoc_STR(STRCAST("internal function")) },
     { STRCAST("isDeactivated"), reinterpret_cast<PyCFunction>(adapterIsDeactivated), METH_NOARGS,
         PyDoc_STR(STRCAST("isDeactivatied() -> None")) },
     { STRCAST("destroy"), reinterpret_cast<PyCFunction>(adapterDestroy), METH_NOARGS,
@@ -0,0 +1,844 @@
+//
+// Copyright (c) ZeroC, Inc. All rights reserved.
+//
+
+#include <Observer.h>
+#include <ConnectionInfo.h>
+#include <Current.h>
+#include <Endpoint.h>
+#include <ObjectAdapter.h>
+#include <Proxy.h>
+#include <Thread.h>
+#include <Ice/Communicator.h>
+#include <Ice/Initialize.h>
+#include <Ice/LoggerUtil.h>
+
+using namespace std;
+using namespace IcePy;
+
+namespace IcePy
+{
+
+extern PyTypeObject ObserverUpdaterType;
+
+struct ObserverUpdaterObject
+{
+    PyObject_HEAD
+    Ice::Instrumentation::ObserverUpdaterPtr* updater;
+};
+
+}
+
+namespace
+{
+
+PyObject*
+createEnumerator(const char* typeName, int value)
+{
+    PyObject* type = lookupType(typeName);
+    assert(type);
+    return PyObject_CallMethod(type, STRCAST("valueOf"), STRCAST("i"), value);
+}
+
+//
+// Base class of the observer wrappers, used to retrieve the Python observer of a wrapper.
+//
+class ObserverWrapperBase
+{
+public:
+
+    ObserverWrapperBase(PyObject* observer, const CommunicatorObserverPtr& communicatorObserver) :
+        _observer(incRef(observer)), _communicatorObserver(communicatorObserver)
+    {
+    }
+
+    virtual ~ObserverWrapperBase()
+    {
+        AdoptThread adoptThread; // Ensure the current thread is able to call into Python.
+        _observer = 0;
+    }
+
+    PyObject* getObject()
+    {
+        return _observer.get();
+    }
+
+protected:
+
+    PyObjectHandle _observer;
+    CommunicatorObserverPtr _communicatorObserver;
+};
+
+PyObject*
+getObject(const Ice::Instrumentation::ObserverPtr& observer)
+{
+    ObserverWrapperBase* wrapper = dynamic_cast<ObserverWrapperBase*>(observer.get());
+    return wrapper ? wrapper->getObject() : Py_None;
+}
+
+template<typename T> class ObserverWrapper : public T, public ObserverWrapperBase
+{
+public:
+
+    ObserverWrapper(PyObject* observer, const CommunicatorObserverPtr& communicatorObserver) :
+        ObserverWrapperBase(observer, communicatorObserver)
+    {
+    }
+
+    virtual void attach()
+    {
+        AdoptThread adoptThread; // Ensure the current thread is able to call into Python.
+        PyObjectHandle tmp = PyObject_CallMethod(_observer.get(), STRCAST("attach"), 0);
+        if(!tmp.get())
+        {
+            _communicatorObserver->reportException("attach");
+        }
+    }
+
+    virtual void detach()
+    {
+        AdoptThread adoptThread; // Ensure the current thread is able to call into Python.
+        PyObjectHandle tmp = PyObject_CallMethod(_observer.get(), STRCAST("detach"), 0);
+        if(!tmp.get())
+        {
+            _communicatorObserver->reportException("detach");
+        }
+    }
+
+    virtual void failed(const string& exceptionName)
+    {
+        AdoptThread adoptThread; // Ensure the current thread is able to call into Python.
+        PyObjectHandle tmp = PyObject_CallMethod(_observer.get(), STRCAST("failed"), STRCAST("s"),
+                                                 exceptionName.c_str());
+        if(!tmp.get())
+        {
+            _communicatorObserver->reportException("failed");
+        }
+    }
+};
+
+class ConnectionObserverWrapper : public ObserverWrapper<Ice::Instrumentation::ConnectionObserver>
+{
+public:
+
+    ConnectionObserverWrapper(PyObject* observer, const CommunicatorObserverPtr& communicatorObserver) :
+        ObserverWrapper<Ice::Instrumentation::ConnectionObserver>(observer, communicatorObserver),
+        _sent(0), _sentCalls(0), _received(0), _receivedCalls(0)
+    {
+    }
+
+    virtual void detach()
+    {
+        Ice::Long sent;
+        Ice::Long received;
+        {
+            IceUtil::Mutex::Lock sync(_mutex);
+            sent = _sent;
+            received = _received;
+            _sent = _received = 0;
+            _sentCalls = _receivedCalls = 0;
+        }
+
+        if(sent > 0)
+        {
+            report("sentBytes", sent);
+        }
+        if(received > 0)
+        {
+            report("receivedBytes", received);
+        }
+        ObserverWrapper<Ice::Instrumentation::ConnectionObserver>::detach();
+    }
+
+    virtual void sentBytes(Ice::Int num)
+    {
+        Ice::Long total;
+        {
+            IceUtil::Mutex::Lock sync(_mutex);
+            _sent += num;
+            if(++_sentCalls < _communicatorObserver->sampleRate())
+            {
+                return;
+            }
+            total = _sent;
+            _sent = 0;
+            _sentCalls = 0;
+        }
+        report("sentBytes", total);
+    }
+
+    virtual void receivedBytes(Ice::Int num)
+    {
+        Ice::Long total;
+        {
+            IceUtil::Mutex::Lock sync(_mutex);
+            _received += num;
+            if(++_receivedCalls < _communicatorObserver->sampleRate())
+            {
+                return;
+            }
+            total = _received;
+            _received = 0;
+            _receivedCalls = 0;
+        }
+        report("receivedBytes", total);
+    }
+
+private:
+
+    void report(const char* method, Ice::Long num)
+    {
+        AdoptThread adoptThread; // Ensure the current thread is able to call into Python.
+        PyObjectHandle tmp = PyObject_CallMethod(_observer.get(), STRCAST(method), STRCAST("L"),
+                                                 static_cast<PY_LONG_LONG>(num));
+        if(!tmp.get())
+        {
+            _communicatorObserver->reportException(method);
+        }
+    }
+
+    IceUtil::Mutex _mutex;
+    Ice::Long _sent;
+    unsigned int _sentCalls;
+    Ice::Long _received;
+    unsigned int _receivedCalls;
+};
+
+class ThreadObserverWrapper : public ObserverWrapper<Ice::Instrumentation::ThreadObserver>
+{
+public:
+
+    ThreadObserverWrapper(PyObject* observer, const CommunicatorObserverPtr& communicatorObserver) :
+        ObserverWrapper<Ice::Instrumentation::ThreadObserver>(observer, communicatorObserver),
+        _changes(0), _oldState(Ice::Instrumentation::ThreadStateIdle),
+        _newState(Ice::Instrumentation::ThreadStateIdle)
+    {
+    }
+
+    virtual void detach()
+    {
+        Ice::Instrumentation::ThreadState oldState;
+        Ice::Instrumentation::ThreadState newState;
+        bool pending;
+        {
+            IceUtil::Mutex::Lock sync(_mutex);
+            pending = _changes > 0;
+            oldState = _oldState;
+            newState = _newState;
+            _changes = 0;
+        }
+
+        if(pending && oldState != newState)
+        {
+            report(oldState, newState);
+        }
+        ObserverWrapper<Ice::Instrumentation::ThreadObserver>::detach();
+    }
+
+    virtual void stateChanged(Ice::Instrumentation::ThreadState oldState, Ice::Instrumentation::ThreadState newState)
+    {
+        //
+        // Consecutive state changes are reported as a single change from the first old state to the
+        // last new state.
+        //
+        {
+            IceUtil::Mutex::Lock sync(_mutex);
+            if(_changes == 0)
+            {
+                _oldState = oldState;
+            }
+            _newState = newState;
+            if(++_changes < _communicatorObserver->sampleRate())
+            {
+                return;
+            }
+            oldState = _oldState;
+            _changes = 0;
+        }
+
+        if(oldState != newState)
+        {
+            report(oldState, newState);
+        }
+    }
+
+private:
+
+    void report(Ice::Instrumentation::ThreadState oldState, Ice::Instrumentation::ThreadState newState)
+    {
+        AdoptThread adoptThread; // Ensure the current thread is able to call into Python.
+        PyObjectHandle o = createEnumerator("Ice.Instrumentation.ThreadState", static_cast<int>(oldState));
+        PyObjectHandle n = createEnumerator("Ice.Instrumentation.ThreadState", static_cast<int>(newState));
+        if(!o.get() || !n.get())
+        {
+            _communicatorObserver->reportException("stateChanged");
+            return;
+        }
+
+        PyObjectHandle tmp = PyObject_CallMethod(_observer.get(), STRCAST("stateChanged"), STRCAST("OO"), o.get(),
+                                                 n.get());
+        if(!tmp.get())
+        {
+            _communicatorObserver->reportException("stateChanged");
+        }
+    }
+
+    IceUtil::Mutex _mutex;
+    unsigned int _changes;
+    Ice::Instrumentation::ThreadState _oldState;
+    Ice::Instrumentation::ThreadState _newState;
+};
+
+class DispatchObserverWrapper : public ObserverWrapper<Ice::Instrumentation::DispatchObserver>
+{
+public:
+
+    DispatchObserverWrapper(PyObject* observer, const CommunicatorObserverPtr& communicatorObserver) :
+        ObserverWrapper<Ice::Instrumentation::DispatchObserver>(observer, communicatorObserver)
+    {
+    }
+
+    virtual void userException()
+    {
+        AdoptThread adoptThread; // Ensure the current thread is able to call into Python.
+        PyObjectHandle tmp = PyObject_CallMethod(_observer.get(), STRCAST("userException"), 0);
+        if(!tmp.get())
+        {
+            _communicatorObserver->reportException("userException");
+        }
+    }
+
+    virtual void reply(Ice::Int size)
+    {
+        AdoptThread adoptThread; // Ensure the current thread is able to call into Python.
+        PyObjectHandle tmp = PyObject_CallMethod(_observer.get(), STRCAST("reply"), STRCAST("i"), size);
+        if(!tmp.get())
+        {
+            _communicatorObserver->reportException("reply");
+        }
+    }
+};
+
+template<typename T> class ChildInvocationObserverWrapper : public ObserverWrapper<T>
+{
+public:
+
+    ChildInvocationObserverWrapper(PyObject* observer, const CommunicatorObserverPtr& communicatorObserver) :
+        ObserverWrapper<T>(observer, communicatorObserver)
+    {
+    }
+
+    virtual void reply(Ice::Int size)
+    {
+        AdoptThread adoptThread; // Ensure the current thread is able to call into Python.
+        PyObjectHandle tmp = PyObject_CallMethod(this->_observer.get(), STRCAST("reply"), STRCAST("i"), size);
+        if(!tmp.get())
+        {
+            this->_communicatorObserver->reportException("reply");
+        }
+    }
+};
+
+class InvocationObserverWrapper : public ObserverWrapper<Ice::Instrumentation::InvocationObserver>
+{
+public:
+
+    InvocationObserverWrapper(PyObject* observer, const CommunicatorObserverPtr& communicatorObserver) :
+        ObserverWrapper<Ice::Instrumentation::InvocationObserver>(observer, communicatorObserver)
+    {
+    }
+
+    virtual void retried()
+    {
+        AdoptThread adoptThread; // Ensure the current thread is able to call into Python.
+        PyObjectHandle tmp = PyObject_CallMethod(_observer.get(), STRCAST("retried"), 0);
+        if(!tmp.get())
+        {
+            _communicatorObserver->reportException("retried");
+        }
+    }
+
+    virtual void userException()
+    {
+        AdoptThread adoptThread; // Ensure the current thread is able to call into Python.
+        PyObjectHandle tmp = PyObject_CallMethod(_observer.get(), STRCAST("userException"), 0);
+        if(!tmp.get())
+        {
+            _communicatorObserver->reportException("userException");
+        }
+    }
+
+    virtual Ice::Instrumentation::RemoteObserverPtr
+    getRemoteObserver(const Ice::ConnectionInfoPtr& con, const Ice::EndpointPtr& endpt, Ice::Int requestId,
+                      Ice::Int size)
+    {
+        AdoptThread adoptThread; // Ensure the current thread is able to call into Python.
+        PyObjectHandle c = createConnectionInfo(con);
+        PyObjectHandle e = createEndpoint(endpt);
+        if(!c.get() || !e.get())
+        {
+            _communicatorObserver->reportException("getRemoteObserver");
+            return 0;
+        }
+
+        PyObjectHandle obs = PyObject_CallMethod(_observer.get(), STRCAST("getRemoteObserver"), STRCAST("OOii"),
+                                                 c.get(), e.get(), requestId, size);
+        if(!obs.get())
+        {
+            _communicatorObserver->reportException("getRemoteObserver");
+            return 0;
+        }
+        else if(obs.get() == Py_None)
+        {
+            return 0;
+        }
+        return new ChildInvocationObserverWrapper<Ice::Instrumentation::RemoteObserver>(obs.get(),
+                                                                                        _communicatorObserver);
+    }
+
+    virtual Ice::Instrumentation::CollocatedObserverPtr
+    getCollocatedObserver(const Ice::ObjectAdapterPtr& adapter, Ice::Int requestId, Ice::Int size)
+    {
+        AdoptThread adoptThread; // Ensure the current thread is able to call into Python.
+        PyObjectHandle a = wrapObjectAdapter(adapter);
+        if(!a.get())
+        {
+            _communicatorObserver->reportException("getCollocatedObserver");
+            return 0;
+        }
+
+        PyObjectHandle obs = PyObject_CallMethod(_observer.get(), STRCAST("getCollocatedObserver"), STRCAST("Oii"),
+                                                 a.get(), requestId, size);
+        if(!obs.get())
+        {
+            _communicatorObserver->reportException("getCollocatedObserver");
+            return 0;
+        }
+        else if(obs.get() == Py_None)
+        {
+            return 0;
+        }
+        return new ChildInvocationObserverWrapper<Ice::Instrumentation::CollocatedObserver>(obs.get(),
+                                                                                            _communicatorObserver);
+    }
+};
+
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static ObserverUpdaterObject*
+observerUpdaterNew(PyTypeObject* /*type*/, PyObject* /*args*/, PyObject* /*kwds*/)
+{
+    PyErr_Format(PyExc_RuntimeError, STRCAST("An observer updater can only be created by the Ice runtime"));
+    return 0;
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static void
+observerUpdaterDealloc(ObserverUpdaterObject* self)
+{
+    delete self->updater;
+    Py_TYPE(self)->tp_free(reinterpret_cast<PyObject*>(self));
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+observerUpdaterUpdateConnectionObservers(ObserverUpdaterObject* self, PyObject* /*args*/)
+{
+    assert(self->updater);
+    try
+    {
+        AllowThreads allowThreads; // Release Python's global interpreter lock during remote invocations.
+        (*self->updater)->updateConnectionObservers();
+    }
+    catch(const Ice::Exception& ex)
+    {
+        setPythonException(ex);
+        return 0;
+    }
+
+    return incRef(Py_None);
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+observerUpdaterUpdateThreadObservers(ObserverUpdaterObject* self, PyObject* /*args*/)
+{
+    assert(self->updater);
+    try
+    {
+        AllowThreads allowThreads; // Release Python's global interpreter lock during remote invocations.
+        (*self->updater)->updateThreadObservers();
+    }
+    catch(const Ice::Exception& ex)
+    {
+        setPythonException(ex);
+        return 0;
+    }
+
+    return incRef(Py_None);
+}
+
+static PyMethodDef ObserverUpdaterMethods[] =
+{
+    { STRCAST("updateConnectionObservers"), reinterpret_cast<PyCFunction>(observerUpdaterUpdateConnectionObservers),
+        METH_NOARGS, PyDoc_STR(STRCAST("updateConnectionObservers() -> None")) },
+    { STRCAST("updateThreadObservers"), reinterpret_cast<PyCFunction>(observerUpdaterUpdateThreadObservers),
+        METH_NOARGS, PyDoc_STR(STRCAST("updateThreadObservers() -> None")) },
+    { 0, 0 } /* sentinel */
+};
+
+namespace IcePy
+{
+
+PyTypeObject ObserverUpdaterType =
+{
+    /* The ob_type field must be initialized in the module init function
+     * to be portable to Windows without using C++. */
+    PyVarObject_HEAD_INIT(0, 0)
+    STRCAST("IcePy.ObserverUpdater"),     /* tp_name */
+    sizeof(ObserverUpdaterObject),        /* tp_basicsize */
+    0,                                    /* tp_itemsize */
+    /* methods */
+    reinterpret_cast<destructor>(observerUpdaterDealloc), /* tp_dealloc */
+    0,                               /* tp_print */
+    0,                               /* tp_getattr */
+    0,                               /* tp_setattr */
+    0,                               /* tp_reserved */
+    0,                               /* tp_repr */
+    0,                               /* tp_as_number */
+    0,                               /* tp_as_sequence */
+    0,                               /* tp_as_mapping */
+    0,                               /* tp_hash */
+    0,                               /* tp_call */
+    0,                               /* tp_str */
+    0,                               /* tp_getattro */
+    0,                               /* tp_setattro */
+    0,                               /* tp_as_buffer */
+    Py_TPFLAGS_DEFAULT,              /* tp_flags */
+    0,                               /* tp_doc */
+    0,                               /* tp_traverse */
+    0,                               /* tp_clear */
+    0,                               /* tp_richcompare */
+    0,                               /* tp_weaklistoffset */
+    0,                               /* tp_iter */
+    0,                               /* tp_iternext */
+    ObserverUpdaterMethods,          /* tp_methods */
+    0,                               /* tp_members */
+    0,                               /* tp_getset */
+    0,                               /* tp_base */
+    0,                               /* tp_dict */
+    0,                               /* tp_descr_get */
+    0,                               /* tp_descr_set */
+    0,                               /* tp_dictoffset */
+    0,                               /* tp_init */
+    0,                               /* tp_alloc */
+    reinterpret_cast<newfunc>(observerUpdaterNew), /* tp_new */
+    0,                               /* tp_free */
+    0,                               /* tp_is_gc */
+};
+
+}
+
+bool
+IcePy::initObserver(PyObject* module)
+{
+    if(PyType_Ready(&ObserverUpdaterType) < 0)
+    {
+        return false;
+    }
+    PyTypeObject* type = &ObserverUpdaterType; // Necessary to prevent GCC's strict-alias warnings.
+    if(PyModule_AddObject(module, STRCAST("ObserverUpdater"), reinterpret_cast<PyObject*>(type)) < 0)
+    {
+        return false;
+    }
+
+    return true;
+}
+
+IcePy::CommunicatorObserver::CommunicatorObserver(PyObject* observer, int sampleRate) :
+    _observer(observer), _sampleRate(sampleRate > 1 ? static_cast<unsigned int>(sampleRate) : 1), _requests(0)
+{
+    Py_INCREF(observer);
+}
+
+IcePy::CommunicatorObserver::~CommunicatorObserver()
+{
+    AdoptThread adoptThread; // Ensure the current thread is able to call into Python.
+    _observer = 0;
+}
+
+void
+IcePy::CommunicatorObserver::setCommunicator(const Ice::CommunicatorPtr& communicator)
+{
+    IceUtil::Mutex::Lock sync(_mutex);
+    _communicator = communicator;
+}
+
+Ice::Instrumentation::ObserverPtr
+IcePy::CommunicatorObserver::getConnectionEstablishmentObserver(const Ice::EndpointPtr& endpt,
+                                                                const string& connector)
+{
+    AdoptThread adoptThread; // Ensure the current thread is able to call into Python.
+
+    PyObjectHandle e = createEndpoint(endpt);
+    if(!e.get())
+    {
+        reportException("getConnectionEstablishmentObserver");
+        return 0;
+    }
+
+    PyObjectHandle obs = PyObject_CallMethod(_observer.get(), STRCAST("getConnectionEstablishmentObserver"),
+                                             STRCAST("Os"), e.get(), connector.c_str());
+    if(!obs.get())
+    {
+        reportException("getConnectionEstablishmentObserver");
+        return 0;
+    }
+    else if(obs.get() == Py_None)
+    {
+        return 0;
+    }
+    return new ObserverWrapper<Ice::Instrumentation::Observer>(obs.get(), this);
+}
+
+Ice::Instrumentation::ObserverPtr
+IcePy::CommunicatorObserver::getEndpointLookupObserver(const Ice::EndpointPtr& endpt)
+{
+    AdoptThread adoptThread; // Ensure the current thread is able to call into Python.
+
+    PyObjectHandle e = createEndpoint(endpt);
+    if(!e.get())
+    {
+        reportException("getEndpointLookupObserver");
+        return 0;
+    }
+
+    PyObjectHandle obs = PyObject_CallMethod(_observer.get(), STRCAST("getEndpointLookupObserver"), STRCAST("O"),
+                                             e.get());
+    if(!obs.get())
+    {
+        reportException("getEndpointLookupObserver");
+        return 0;
+    }
+    else if(obs.get() == Py_None)
+    {
+        return 0;
+    }
+    return new ObserverWrapper<Ice::Instrumentation::Observer>(obs.get(), this);
+}
+
+Ice::Instrumentation::ConnectionObserverPtr
+IcePy::CommunicatorObserver::getConnectionObserver(const Ice::ConnectionInfoPtr& con,
+                                                   const Ice::EndpointPtr& endpt,
+                                                   Ice::Instrumentation::ConnectionState state,
+                                                   const Ice::Instrumentation::ConnectionObserverPtr& old)
+{
+    AdoptThread adoptThread; // Ensure the current thread is able to call into Python.
+
+    PyObjectHandle c = createConnectionInfo(con);
+    PyObjectHandle e = createEndpoint(endpt);
+    PyObjectHandle s = createEnumerator("Ice.Instrumentation.ConnectionState", static_cast<int>(state));
+    if(!c.get() || !e.get() || !s.get())
+    {
+        reportException("getConnectionObserver");
+        return 0;
+    }
+
+    PyObjectHandle obs = PyObject_CallMethod(_observer.get(), STRCAST("getConnectionObserver"), STRCAST("OOOO"),
+                                             c.get(), e.get(), s.get(), getObject(old));
+    if(!obs.get())
+    {
+        reportException("getConnectionObserver");
+        return 0;
+    }
+    else if(obs.get() == Py_None)
+    {
+        return 0;
+    }
+    else if(old && obs.get() == getObject(old))
+    {
+        return old; // Keep using the same wrapper.
+    }
+    return new ConnectionObserverWrapper(obs.get(), this);
+}
+
+Ice::Instrumentation::ThreadObserverPtr
+IcePy::CommunicatorObserver::getThreadObserver(const string& parent, const string& id,
+                                               Ice::Instrumentation::ThreadState state,
+                                               const Ice::Instrumentation::ThreadObserverPtr& old)
+{
+    AdoptThread adoptThread; // Ensure the current thread is able to call into Python.
+
+    PyObjectHandle s = createEnumerator("Ice.Instrumentation.ThreadState", static_cast<int>(state));
+    if(!s.get())
+    {
+        reportException("getThreadObserver");
+        return 0;
+    }
+
+    PyObjectHandle obs = PyObject_CallMethod(_observer.get(), STRCAST("getThreadObserver"), STRCAST("ssOO"),
+                                             parent.c_str(), id.c_str(), s.get(), getObject(old));
+    if(!obs.get())
+    {
+        reportException("getThreadObserver");
+        return 0;
+    }
+    else if(obs.get() == Py_None)
+    {
+        return 0;
+    }
+    else if(old && obs.get() == getObject(old))
+    {
+        return old; // Keep using the same wrapper.
+    }
+    return new ThreadObserverWrapper(obs.get(), this);
+}
+
+Ice::Instrumentation::InvocationObserverPtr
+IcePy::CommunicatorObserver::getInvocationObserver(const Ice::ObjectPrx& prx, const string& operation,
+                                                   const Ice::Context& ctx)
+{
+    if(!sample())
+    {
+        return 0;
+    }
+
+    //
+    // The communicator is needed to create the proxy, invocations cannot occur before it's set.
+    //
+    Ice::CommunicatorPtr communicator = getCommunicator();
+    if(!communicator)
+    {
+        return 0;
+    }
+
+    AdoptThread adoptThread; // Ensure the current thread is able to call into Python.
+
+    PyObjectHandle p = createProxy(prx, communicator);
+    PyObjectHandle c = PyDict_New();
+    if(!p.get() || !c.get() || !contextToDictionary(ctx, c.get()))
+    {
+        reportException("getInvocationObserver");
+        return 0;
+    }
+
+    PyObjectHandle obs = PyObject_CallMethod(_observer.get(), STRCAST("getInvocationObserver"), STRCAST("OsO"),
+                                             p.get(), operation.c_str(), c.get());
+    if(!obs.get())
+    {
+        reportException("getInvocationObserver");
+        return 0;
+    }
+    else if(obs.get() == Py_None)
+    {
+        return 0;
+    }
+    return new InvocationObserverWrapper(obs.get(), this);
+}
+
+Ice::Instrumentation::DispatchObserverPtr
+IcePy::CommunicatorObserver::getDispatchObserver(const Ice::Current& current, Ice::Int size)
+{
+    if(!sample())
+    {
+        return 0;
+    }
+
+    AdoptThread adoptThread; // Ensure the current thread is able to call into Python.
+
+    PyObjectHandle c = createCurrent(current);
+    if(!c.get())
+    {
+        reportException("getDispatchObserver");
+        return 0;
+    }
+
+    PyObjectHandle obs = PyObject_CallMethod(_observer.get(), STRCAST("getDispatchObserver"), STRCAST("Oi"),
+                                             c.get(), size);
+    if(!obs.get())
+    {
+        reportException("getDispatchObserver");
+        return 0;
+    }
+    else if(obs.get() == Py_None)
+    {
+        return 0;
+    }
+    return new DispatchObserverWrapper(obs.get(), this);
+}
+
+void
+IcePy::CommunicatorObserver::setObserverUpdater(const Ice::Instrumentation::ObserverUpdaterPtr& updater)
+{
+    AdoptThread adoptThread; // Ensure the current thread is able to call into Python.
+
+    ObserverUpdaterObject* obj =
+        reinterpret_cast<ObserverUpdaterObject*>(ObserverUpdaterType.tp_alloc(&ObserverUpdaterType, 0));
+    if(!obj)
+    {
+        reportException("setObserverUpdater");
+        return;
+    }
+    obj->updater = new Ice::Instrumentation::ObserverUpdaterPtr(updater);
+
+    PyObjectHandle u = reinterpret_cast<PyObject*>(obj);
+    PyObjectHandle tmp = PyObject_CallMethod(_observer.get(), STRCAST("setObserverUpdater"), STRCAST("O"), u.get());
+    if(!tmp.get())
+    {
+        reportException("setObserverUpdater");
+    }
+}
+
+void
+IcePy::CommunicatorObserver::reportException(const char* method)
+{
+    assert(PyErr_Occurred());
+
+    //
+    // Ice.Instrumentation methods that the Python observer doesn't implement raise NotImplementedError, they
+    // are equivalent to methods that return None.
+    //
+    if(PyErr_ExceptionMatches(PyExc_NotImplementedError))
+    {
+        PyErr_Clear();
+        return;
+    }
+
+    PyException ex; // Retrieve it before another Python API call clears it.
+
+    //
+    // Observers can't raise exceptions to the Ice run time, we log a warning instead.
+    //
+    Ice::CommunicatorPtr communicator = getCommunicator();
+    try
+    {
+        ex.raise();
+    }
+    catch(const Ice::Exception& e)
+    {
+        Ice::Warning out(communicator ? communicator->getLogger() : Ice::getProcessLogger());
+        out << "Python observer `" << method << "' raised an exception:\n" << e;
+    }
+}
+
+bool
+IcePy::CommunicatorObserver::sample()
+{
+    return _sampleRate == 1 || static_cast<unsigned int>(_requests.fetch_add(1)) % _sampleRate == 0;
+}
+
+Ice::CommunicatorPtr
+IcePy::CommunicatorObserver::getCommunicator()
+{
+    IceUtil::Mutex::Lock sync(_mutex);
+    return _communicator;
+}
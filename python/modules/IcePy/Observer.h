@@ -0,0 +1,83 @@
+//
+// Copyright (c) ZeroC, Inc. All rights reserved.
+//
+
+#ifndef ICEPY_OBSERVER_H
+#define ICEPY_OBSERVER_H
+
+#include <Config.h>
+#include <Util.h>
+#include <Ice/CommunicatorF.h>
+#include <Ice/Instrumentation.h>
+#include <IceUtil/Atomic.h>
+#include <IceUtil/Mutex.h>
+
+namespace IcePy
+{
+
+bool initObserver(PyObject*);
+
+//
+// Wraps a Python implementation of Ice.Instrumentation.CommunicatorObserver. Invocation and dispatch observers
+// are only requested for one out of every sampleRate requests, the other requests don't acquire the GIL. The
+// byte counts of connection observers and the state changes of thread observers are accumulated and reported
+// once every sampleRate calls, and when the observer is detached.
+//
+class CommunicatorObserver : public Ice::Instrumentation::CommunicatorObserver
+{
+public:
+
+    CommunicatorObserver(PyObject*, int);
+    ~CommunicatorObserver();
+
+    void setCommunicator(const Ice::CommunicatorPtr&);
+
+    virtual Ice::Instrumentation::ObserverPtr getConnectionEstablishmentObserver(const Ice::EndpointPtr&,
+                                                                                 const std::string&);
+
+    virtual Ice::Instrumentation::ObserverPtr getEndpointLookupObserver(const Ice::EndpointPtr&);
+
+    virtual Ice::Instrumentation::ConnectionObserverPtr
+    getConnectionObserver(const Ice::ConnectionInfoPtr&,
+                          const Ice::EndpointPtr&,
+                          Ice::Instrumentation::ConnectionState,
+                          const Ice::Instrumentation::ConnectionObserverPtr&);
+
+    virtual Ice::Instrumentation::ThreadObserverPtr getThreadObserver(const std::string&, const std::string&,
+                                                                      Ice::Instrumentation::ThreadState,
+                                                                      const Ice::Instrumentation::ThreadObserverPtr&);
+
+    virtual Ice::Instrumentation::InvocationObserverPtr getInvocationObserver(const Ice::ObjectPrx&,
+                                                                              const std::string&,
+                                                                              const Ice::Context&);
+
+    virtual Ice::Instrumentation::DispatchObserverPtr getDispatchObserver(const Ice::Current&, Ice::Int);
+
+    virtual void setObserverUpdater(const Ice::Instrumentation::ObserverUpdaterPtr&);
+
+    //
+    // Must be called with the GIL held after a Python observer method raised an exception.
+    //
+    void reportException(const char*);
+
+    unsigned int sampleRate() const
+    {
+        return _sampleRate;
+    }
+
+private:
+
+    bool sample();
+    Ice::CommunicatorPtr getCommunicator();
+
+    PyObjectHandle _observer;
+    const unsigned int _sampleRate;
+    IceUtilInternal::Atomic _requests;
+    IceUtil::Mutex _mutex;
+    Ice::CommunicatorPtr _communicator;
+};
+typedef IceUtil::Handle<CommunicatorObserver> CommunicatorObserverPtr;
+
+}
+
+#endif
@@ -19,9 +19,12 @@
 #include <Ice/AsyncResult.h>
 #include <Ice/Properties.h>
 #include <Ice/Proxy.h>
+#include <Ice/UniquePtr.h>
 #include <IceUtil/Time.h>
 #include <Slice/PythonUtil.h>
 
+#include <algorithm>
+
 using namespace std;
 using namespace IcePy;
 using namespace Slice::Python;
@@ -76,6 +79,7 @@ public:
     bool sendsClasses;
     bool returnsClasses;
     bool pseudoOp;
+    bool noCurrent;
 
 private:
 
@@ -107,7 +111,8 @@ protected:
 
     bool prepareRequest(const OperationPtr&, PyObject*, MappingType, Ice::OutputStream*,
                         pair<const Ice::Byte*, const Ice::Byte*>&);
-    PyObject* unmarshalResults(const OperationPtr&, const pair<const Ice::Byte*, const Ice::Byte*>&);
+    PyObject* unmarshalResults(const OperationPtr&, const pair<const Ice::Byte*, const Ice::Byte*>&,
+                               const BufferPtr& = 0);
     PyObject* unmarshalException(const OperationPtr&, const pair<const Ice::Byte*, const Ice::Byte*>&);
     bool validateException(const OperationPtr&, PyObject*) const;
     void checkTwowayOnly(const OperationPtr&, const Ice::ObjectPrx&) const;
@@ -133,6 +138,23 @@ private:
     OperationPtr _op;
 };
 
+//
+// Marshals the in parameters of an operation once, for an Ice.MarshaledArgs object that can be
+// sent to any proxy with the same encoding.
+//
+class MarshaledArgsInvocation : public Invocation
+{
+public:
+
+    MarshaledArgsInvocation(const Ice::ObjectPrx&, const OperationPtr&);
+
+    virtual PyObject* invoke(PyObject*, PyObject* = 0);
+
+private:
+
+    OperationPtr _op;
+};
+
 //
 // Asynchronous typed invocation.
 //
@@ -217,6 +239,50 @@ private:
     OperationPtr _op;
 };
 
+//
+// The cookie that identifies a request of a NewAsyncManyTypedInvocation.
+//
+class RequestIndex : public Ice::LocalObject
+{
+public:
+
+    RequestIndex(Py_ssize_t i) : index(i) {}
+
+    const Py_ssize_t index;
+};
+typedef IceUtil::Handle<RequestIndex> RequestIndexPtr;
+
+//
+// New-style asynchronous typed invocation of an operation with many sets of arguments. All of
+// the requests are marshaled first and then sent with the GIL released; a single future collects
+// the results.
+//
+class NewAsyncManyTypedInvocation : public Invocation
+{
+public:
+
+    NewAsyncManyTypedInvocation(const Ice::ObjectPrx&, const OperationPtr&);
+    ~NewAsyncManyTypedInvocation();
+
+    virtual PyObject* invoke(PyObject*, PyObject* = 0);
+
+    void response(bool, const pair<const Ice::Byte*, const Ice::Byte*>&, const RequestIndexPtr&);
+    void exception(const Ice::Exception&, const RequestIndexPtr&);
+    void sent(bool, const RequestIndexPtr&);
+
+private:
+
+    void completed(Py_ssize_t);
+    void failed(PyObject*);
+
+    OperationPtr _op;
+    bool _twoway;
+    PyObject* _future;
+    PyObject* _results;
+    Py_ssize_t _remaining;
+};
+typedef IceUtil::Handle<NewAsyncManyTypedInvocation> NewAsyncManyTypedInvocationPtr;
+
 //
 // Synchronous blobject invocation.
 //
@@ -287,7 +353,11 @@ public:
 
 protected:
 
-    void dispatchImpl(PyObject*, const string&, PyObject*, const Ice::Current&);
+    void dispatchImpl(PyObject*, const string&, PyObject*, const Ice::Current&, PyObject* = 0);
+
+private:
+
+    void callDispatch(PyObject*, const char*, PyObject*, PyObject*, const string&, const Ice::Current&);
 };
 typedef IceUtil::Handle<Upcall> UpcallPtr;
 
@@ -302,7 +372,8 @@ class TypedUpcall : public Upcall
 {
 public:
 
-    TypedUpcall(const OperationPtr&, const Ice::AMD_Object_ice_invokePtr&, const Ice::CommunicatorPtr&);
+    TypedUpcall(const OperationPtr&, const Ice::AMD_Object_ice_invokePtr&, const Ice::CommunicatorPtr&,
+                PyObject* = 0);
 
     virtual void dispatch(PyObject*, const pair<const Ice::Byte*, const Ice::Byte*>&, const Ice::Current&);
     virtual void response(PyObject*);
@@ -315,6 +386,7 @@ private:
     Ice::AMD_Object_ice_invokePtr _callback;
     Ice::CommunicatorPtr _communicator;
     Ice::EncodingVersion _encoding;
+    PyObject* _method; // Borrowed, only used by dispatch().
 };
 
 //
@@ -336,6 +408,56 @@ private:
     Ice::AMD_Object_ice_invokePtr _callback;
 };
 
+//
+// The dispatch table of a servant type, shared by the wrappers of all the servants of that type. It caches
+// the Operation object of each operation and, if the type doesn't override _iceDispatch or the attribute
+// lookup, the function that implements it. The tables are kept in a registry that holds a weak reference to
+// each type, a table is dropped when its type is destroyed. Tables are only accessed with the GIL held. A
+// table is cleared when the type or one of its base types is modified, which changes the type's version tag.
+//
+class DispatchTable : public IceUtil::Shared
+{
+public:
+
+    struct Entry
+    {
+        Entry() : function(0) {}
+
+        OperationPtr op;
+
+        //
+        // The function of the servant type that implements the operation, nil if the dispatch must
+        // go through the servant's _iceDispatch method. This is a borrowed reference to the function
+        // in the dictionary of the type or one of its base types, like the entries of Python's own
+        // method cache it remains valid as long as the type's version tag doesn't change.
+        //
+        PyObject* function;
+
+        //
+        // The interned name of the method.
+        //
+        PyObjectHandle name;
+    };
+
+    DispatchTable(PyTypeObject*);
+
+    //
+    // Returns false if the type doesn't define the operation.
+    //
+    bool find(const string&, Entry&);
+
+private:
+
+    bool usesDefaultDispatch();
+
+    PyTypeObject* _type; // Borrowed, the table is dropped when the type is destroyed.
+    typedef map<string, Entry> EntryMap;
+    EntryMap _entries;
+    int _defaultDispatch; // -1 until computed.
+    unsigned int _versionTag; // The version tag of the type when the entries were computed.
+};
+typedef IceUtil::Handle<DispatchTable> DispatchTablePtr;
+
 //
 // TypedServantWrapper uses the information in Operation to validate, marshal, and unmarshal
 // parameters and exceptions.
@@ -349,12 +471,6 @@ public:
     virtual void ice_invoke_async(const Ice::AMD_Object_ice_invokePtr&,
                                   const pair<const Ice::Byte*, const Ice::Byte*>&,
                                   const Ice::Current&);
-
-private:
-
-    typedef map<string, OperationPtr> OperationMap;
-    OperationMap _operationMap;
-    OperationMap::iterator _lastOp;
 };
 
 //
@@ -390,6 +506,7 @@ struct DispatchCallbackObject
 {
     PyObject_HEAD
     UpcallPtr* upcall;
+    PyObject* eventLoopAdapter; // None if the communicator isn't bound to an event loop.
 };
 
 struct AsyncResultObject
@@ -410,6 +527,16 @@ struct MarshaledResultObject
 
 extern PyTypeObject MarshaledResultType;
 
+struct MarshaledArgsObject
+{
+    PyObject_HEAD
+    OperationPtr* op;
+    Ice::EncodingVersion encoding;
+    vector<Ice::Byte>* params; // The encapsulation, empty if the operation has no in parameters.
+};
+
+extern PyTypeObject MarshaledArgsType;
+
 extern PyTypeObject OperationType;
 
 class UserExceptionFactory : public Ice::UserExceptionFactory
@@ -475,6 +602,33 @@ callException(PyObject* method, const Ice::Exception& ex)
     callException(method, exh.get());
 }
 
+//
+// Converts the context dictionary of an invocation, reusing the conversion cached by the
+// communicator when the same dictionary is passed again.
+//
+SharedContextPtr
+getContext(const Ice::CommunicatorPtr& communicator, PyObject* dict)
+{
+    if(!PyDict_Check(dict))
+    {
+        PyErr_Format(PyExc_ValueError, STRCAST("context argument must be None or a dictionary"));
+        return 0;
+    }
+
+    ContextCachePtr cache = getCommunicatorContextCache(communicator);
+    if(cache)
+    {
+        return cache->get(dict);
+    }
+
+    SharedContextPtr ctx = new SharedContext;
+    if(!dictionaryToContext(dict, ctx->context))
+    {
+        return 0;
+    }
+    return ctx;
+}
+
 void
 callSent(PyObject* method, bool sentSynchronously, bool passArg)
 {
@@ -587,6 +741,42 @@ operationInvokeAsync(OperationObject* self, PyObject* args)
     return i->invoke(opArgs);
 }
 
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+operationInvokeAsyncMany(OperationObject* self, PyObject* args)
+{
+    PyObject* proxy;
+    PyObject* opArgs;
+    if(!PyArg_ParseTuple(args, STRCAST("O!O!"), &ProxyType, &proxy, &PyTuple_Type, &opArgs))
+    {
+        return 0;
+    }
+
+    Ice::ObjectPrx p = getProxy(proxy);
+    InvocationPtr i = new NewAsyncManyTypedInvocation(p, *self->op);
+    return i->invoke(opArgs);
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+operationMarshal(OperationObject* self, PyObject* args)
+{
+    PyObject* proxy;
+    PyObject* opArgs;
+    if(!PyArg_ParseTuple(args, STRCAST("O!O!"), &ProxyType, &proxy, &PyTuple_Type, &opArgs))
+    {
+        return 0;
+    }
+
+    Ice::ObjectPrx p = getProxy(proxy);
+    InvocationPtr i = new MarshaledArgsInvocation(p, *self->op);
+    return i->invoke(opArgs);
+}
+
 #ifdef WIN32
 extern "C"
 #endif
@@ -742,6 +932,7 @@ dispatchCallbackNew(PyTypeObject* type, PyObject* /*args*/, PyObject* /*kwds*/)
         return 0;
     }
     self->upcall = 0;
+    self->eventLoopAdapter = 0;
     return self;
 }
 
@@ -752,6 +943,7 @@ static void
 dispatchCallbackDealloc(DispatchCallbackObject* self)
 {
     delete self->upcall;
+    Py_XDECREF(self->eventLoopAdapter);
     Py_TYPE(self)->tp_free(reinterpret_cast<PyObject*>(self));
 }
 
@@ -812,6 +1004,15 @@ dispatchCallbackException(DispatchCallbackObject* self, PyObject* args)
     return incRef(Py_None);
 }
 
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+dispatchCallbackEventLoopAdapter(DispatchCallbackObject* self, PyObject* /*args*/)
+{
+    return incRef(self->eventLoopAdapter ? self->eventLoopAdapter : Py_None);
+}
+
 //
 // AsyncResult operations
 //
@@ -1216,6 +1417,31 @@ marshaledResultDealloc(MarshaledResultObject* self)
     Py_TYPE(self)->tp_free(reinterpret_cast<PyObject*>(self));
 }
 
+//
+// MarshaledArgs operations
+//
+
+#ifdef WIN32
+extern "C"
+#endif
+static MarshaledArgsObject*
+marshaledArgsNew(PyTypeObject* /*type*/, PyObject* /*args*/, PyObject* /*kwds*/)
+{
+    PyErr_Format(PyExc_RuntimeError, STRCAST("Marshaled arguments can only be created with Ice.MarshaledArgs"));
+    return 0;
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static void
+marshaledArgsDealloc(MarshaledArgsObject* self)
+{
+    delete self->op;
+    delete self->params;
+    Py_TYPE(self)->tp_free(reinterpret_cast<PyObject*>(self));
+}
+
 //
 // ParamInfo implementation.
 //
@@ -1279,6 +1505,12 @@ IcePy::Operation::Operation(const char* n, PyObject* m, PyObject* sm, int amdFla
     tupleToStringSeq(meta, metaData);
     assert(b);
 
+    //
+    // The servant method of an operation with the python:no-current metadata doesn't take a
+    // trailing Ice.Current argument.
+    //
+    noCurrent = find(metaData.begin(), metaData.end(), "python:no-current") != metaData.end();
+
     //
     // returnType
     //
@@ -1550,6 +1782,10 @@ static PyMethodDef OperationMethods[] =
       PyDoc_STR(STRCAST("internal function")) },
     { STRCAST("invokeAsync"), reinterpret_cast<PyCFunction>(operationInvokeAsync), METH_VARARGS,
       PyDoc_STR(STRCAST("internal function")) },
+    { STRCAST("invokeAsyncMany"), reinterpret_cast<PyCFunction>(operationInvokeAsyncMany), METH_VARARGS,
+      PyDoc_STR(STRCAST("internal function")) },
+    { STRCAST("marshal"), reinterpret_cast<PyCFunction>(operationMarshal), METH_VARARGS,
+      PyDoc_STR(STRCAST("internal function")) },
     { STRCAST("begin"), reinterpret_cast<PyCFunction>(operationBegin), METH_VARARGS,
       PyDoc_STR(STRCAST("internal function")) },
     { STRCAST("end"), reinterpret_cast<PyCFunction>(operationEnd), METH_VARARGS,
@@ -1572,6 +1808,8 @@ static PyMethodDef DispatchCallbackMethods[] =
       PyDoc_STR(STRCAST("internal function")) },
     { STRCAST("exception"), reinterpret_cast<PyCFunction>(dispatchCallbackException), METH_VARARGS,
       PyDoc_STR(STRCAST("internal function")) },
+    { STRCAST("eventLoopAdapter"), reinterpret_cast<PyCFunction>(dispatchCallbackEventLoopAdapter), METH_NOARGS,
+      PyDoc_STR(STRCAST("internal function")) },
     { 0, 0 } /* sentinel */
 };
 
@@ -1842,6 +2080,53 @@ PyTypeObject MarshaledResultType =
     0,                               /* tp_is_gc */
 };
 
+PyTypeObject MarshaledArgsType =
+{
+    /* The ob_type field must be initialized in the module init function
+     * to be portable to Windows without using C++. */
+    PyVarObject_HEAD_INIT(0, 0)
+    STRCAST("IcePy.MarshaledArgs"),  /* tp_name */
+    sizeof(MarshaledArgsObject),     /* tp_basicsize */
+    0,                               /* tp_itemsize */
+    /* methods */
+    reinterpret_cast<destructor>(marshaledArgsDealloc), /* tp_dealloc */
+    0,                               /* tp_print */
+    0,                               /* tp_getattr */
+    0,                               /* tp_setattr */
+    0,                               /* tp_reserved */
+    0,                               /* tp_repr */
+    0,                               /* tp_as_number */
+    0,                               /* tp_as_sequence */
+    0,                               /* tp_as_mapping */
+    0,                               /* tp_hash */
+    0,                               /* tp_call */
+    0,                               /* tp_str */
+    0,                               /* tp_getattro */
+    0,                               /* tp_setattro */
+    0,                               /* tp_as_buffer */
+    Py_TPFLAGS_DEFAULT,              /* tp_flags */
+    0,                               /* tp_doc */
+    0,                               /* tp_traverse */
+    0,                               /* tp_clear */
+    0,                               /* tp_richcompare */
+    0,                               /* tp_weaklistoffset */
+    0,                               /* tp_iter */
+    0,                               /* tp_iternext */
+    0,                               /* tp_methods */
+    0,                               /* tp_members */
+    0,                               /* tp_getset */
+    0,                               /* tp_base */
+    0,                               /* tp_dict */
+    0,                               /* tp_descr_get */
+    0,                               /* tp_descr_set */
+    0,                               /* tp_dictoffset */
+    0,                               /* tp_init */
+    0,                               /* tp_alloc */
+    reinterpret_cast<newfunc>(marshaledArgsNew), /* tp_new */
+    0,                               /* tp_free */
+    0,                               /* tp_is_gc */
+};
+
 }
 
 bool
@@ -1897,6 +2182,16 @@ IcePy::initOperation(PyObject* module)
         return false;
     }
 
+    if(PyType_Ready(&MarshaledArgsType) < 0)
+    {
+        return false;
+    }
+    PyTypeObject* maType = &MarshaledArgsType; // Necessary to prevent GCC's strict-alias warnings.
+    if(PyModule_AddObject(module, STRCAST("MarshaledArgs"), reinterpret_cast<PyObject*>(maType)) < 0)
+    {
+        return false;
+    }
+
     return true;
 }
 
@@ -1912,9 +2207,38 @@ bool
 IcePy::Invocation::prepareRequest(const OperationPtr& op, PyObject* args, MappingType mapping, Ice::OutputStream* os,
                                   pair<const Ice::Byte*, const Ice::Byte*>& params)
 {
-    assert(PyTuple_Check(args));
     params.first = params.second = static_cast<const Ice::Byte*>(0);
 
+    if(PyObject_TypeCheck(args, &MarshaledArgsType))
+    {
+        //
+        // The arguments were already marshaled by Ice.MarshaledArgs, the caller keeps the object
+        // alive for the duration of the request.
+        //
+        MarshaledArgsObject* obj = reinterpret_cast<MarshaledArgsObject*>(args);
+        if(*obj->op != op)
+        {
+            PyErr_Format(PyExc_ValueError, STRCAST("arguments were marshaled for operation `%s', not `%s'"),
+                         (*obj->op)->name.c_str(), op->name.c_str());
+            return false;
+        }
+        if(obj->encoding != _prx->ice_getEncodingVersion())
+        {
+            PyErr_Format(PyExc_ValueError, STRCAST("arguments were marshaled with encoding %s, the proxy uses %s"),
+                         Ice::encodingVersionToString(obj->encoding).c_str(),
+                         Ice::encodingVersionToString(_prx->ice_getEncodingVersion()).c_str());
+            return false;
+        }
+        if(!obj->params->empty())
+        {
+            params.first = &(*obj->params)[0];
+            params.second = params.first + obj->params->size();
+        }
+        return true;
+    }
+
+    assert(PyTuple_Check(args));
+
     //
     // Validate the number of arguments.
     //
@@ -1981,15 +2305,23 @@ IcePy::Invocation::prepareRequest(const OperationPtr& op, PyObject* args, Mappin
             }
 
             //
-            // Marshal the required parameters.
+            // Marshal the required parameters. Large primitive sequences that implement the buffer
+            // protocol are pinned and copied once all the parameters are marshaled, with the GIL
+            // released. This is only safe for the arguments themselves, which the args tuple keeps
+            // alive, and not for nested values.
             //
+            PinnedBufferList buffers;
             for(p = op->inParams.begin(); p != op->inParams.end(); ++p)
             {
                 ParamInfoPtr info = *p;
                 if(!info->optional)
                 {
                     PyObject* arg = PyTuple_GET_ITEM(args, info->pos);
-                    info->type->marshal(arg, os, &objectMap, false, &info->metaData);
+                    SequenceInfoPtr seq = SequenceInfoPtr::dynamicCast(info->type);
+                    if(!seq || !seq->pin(arg, os, buffers))
+                    {
+                        info->type->marshal(arg, os, &objectMap, false, &info->metaData);
+                    }
                 }
             }
 
@@ -2011,6 +2343,11 @@ IcePy::Invocation::prepareRequest(const OperationPtr& op, PyObject* args, Mappin
                 os->writePendingValues();
             }
 
+            if(!buffers.empty())
+            {
+                buffers.copy(os);
+            }
+
             os->endEncapsulation();
             params = os->finished();
         }
@@ -2030,7 +2367,8 @@ IcePy::Invocation::prepareRequest(const OperationPtr& op, PyObject* args, Mappin
 }
 
 PyObject*
-IcePy::Invocation::unmarshalResults(const OperationPtr& op, const pair<const Ice::Byte*, const Ice::Byte*>& bytes)
+IcePy::Invocation::unmarshalResults(const OperationPtr& op, const pair<const Ice::Byte*, const Ice::Byte*>& bytes,
+                                    const BufferPtr& buffer)
 {
     Py_ssize_t numResults = static_cast<Py_ssize_t>(op->outParams.size());
     if(op->returnType)
@@ -2048,6 +2386,8 @@ IcePy::Invocation::unmarshalResults(const OperationPtr& op, const pair<const Ice
         // This is necessary to support object unmarshaling (see ObjectReader).
         //
         StreamUtil util;
+        util.setBuffer(buffer);
+        util.setStringTable(getCommunicatorStringTable(_communicator));
         assert(!is.getClosure());
         is.setClosure(&util);
 
@@ -2118,6 +2458,7 @@ IcePy::Invocation::unmarshalException(const OperationPtr& op, const pair<const I
     // This is necessary to support object unmarshaling (see ObjectReader).
     //
     StreamUtil util;
+    util.setStringTable(getCommunicatorStringTable(_communicator));
     assert(!is.getClosure());
     is.setClosure(&util);
 
@@ -2212,7 +2553,7 @@ IcePy::SyncTypedInvocation::invoke(PyObject* args, PyObject* /* kwds */)
     assert(PyTuple_Check(args));
     assert(PyTuple_GET_SIZE(args) == 2); // Format is ((params...), context|None)
     PyObject* pyparams = PyTuple_GET_ITEM(args, 0);
-    assert(PyTuple_Check(pyparams));
+    assert(PyTuple_Check(pyparams) || PyObject_TypeCheck(pyparams, &MarshaledArgsType));
     PyObject* pyctx = PyTuple_GET_ITEM(args, 1);
 
     //
@@ -2237,21 +2578,14 @@ IcePy::SyncTypedInvocation::invoke(PyObject* args, PyObject* /* kwds */)
         {
             if(pyctx != Py_None)
             {
-                Ice::Context ctx;
-
-                if(!PyDict_Check(pyctx))
-                {
-                    PyErr_Format(PyExc_ValueError, STRCAST("context argument must be None or a dictionary"));
-                    return 0;
-                }
-
-                if(!dictionaryToContext(pyctx, ctx))
+                SharedContextPtr ctx = getContext(_communicator, pyctx);
+                if(!ctx)
                 {
                     return 0;
                 }
 
                 AllowThreads allowThreads; // Release Python's global interpreter lock during remote invocations.
-                status = _prx->ice_invoke(_op->name, _op->sendMode, params, result, ctx);
+                status = _prx->ice_invoke(_op->name, _op->sendMode, params, result, ctx->context);
             }
             else
             {
@@ -2291,14 +2625,18 @@ IcePy::SyncTypedInvocation::invoke(PyObject* args, PyObject* /* kwds */)
                 // Unmarshal the results. If there is more than one value to be returned, then return them
                 // in a tuple of the form (result, outParam1, ...). Otherwise just return the value.
                 //
+                // The reply is moved to a Buffer object without copying, sequences that use the
+                // zero-copy mapping can then reference their data in the reply directly.
+                //
+                BufferPtr buffer = new Buffer(result);
                 pair<const Ice::Byte*, const Ice::Byte*> rb(static_cast<const Ice::Byte*>(0),
                                                             static_cast<const Ice::Byte*>(0));
-                if(!result.empty())
+                if(buffer->size() > 0)
                 {
-                    rb.first = &result[0];
-                    rb.second = &result[0] + result.size();
+                    rb.first = reinterpret_cast<const Ice::Byte*>(buffer->data());
+                    rb.second = rb.first + buffer->size();
                 }
-                PyObjectHandle results = unmarshalResults(_op, rb);
+                PyObjectHandle results = unmarshalResults(_op, rb, buffer);
                 if(!results.get())
                 {
                     return 0;
@@ -2338,34 +2676,66 @@ IcePy::SyncTypedInvocation::invoke(PyObject* args, PyObject* /* kwds */)
 }
 
 //
-// AsyncTypedInvocation
+// MarshaledArgsInvocation
 //
-IcePy::AsyncTypedInvocation::AsyncTypedInvocation(const Ice::ObjectPrx& prx, PyObject* pyProxy,
-                                                  const OperationPtr& op) :
-    Invocation(prx), _op(op), _pyProxy(pyProxy), _response(0), _ex(0), _sent(0)
-{
-    Py_INCREF(_pyProxy);
-}
-
-IcePy::AsyncTypedInvocation::~AsyncTypedInvocation()
+IcePy::MarshaledArgsInvocation::MarshaledArgsInvocation(const Ice::ObjectPrx& prx, const OperationPtr& op) :
+    Invocation(prx), _op(op)
 {
-    AdoptThread adoptThread; // Ensure the current thread is able to call into Python.
-
-    Py_DECREF(_pyProxy);
-    Py_XDECREF(_response);
-    Py_XDECREF(_ex);
-    Py_XDECREF(_sent);
 }
 
 PyObject*
-IcePy::AsyncTypedInvocation::invoke(PyObject* args, PyObject* /* kwds */)
+IcePy::MarshaledArgsInvocation::invoke(PyObject* args, PyObject* /* kwds */)
 {
     assert(PyTuple_Check(args));
-    assert(PyTuple_GET_SIZE(args) == 5); // Format is ((params...), response|None, exception|None, sent|None, ctx|None)
-    PyObject* pyparams = PyTuple_GET_ITEM(args, 0);
-    assert(PyTuple_Check(pyparams));
-
-    PyObject* callable;
+
+    Ice::OutputStream os(_communicator);
+    pair<const Ice::Byte*, const Ice::Byte*> params;
+    if(!prepareRequest(_op, args, SyncMapping, &os, params))
+    {
+        return 0;
+    }
+
+    MarshaledArgsObject* obj =
+        reinterpret_cast<MarshaledArgsObject*>(MarshaledArgsType.tp_alloc(&MarshaledArgsType, 0));
+    if(!obj)
+    {
+        return 0;
+    }
+    obj->op = new OperationPtr(_op);
+    obj->encoding = _prx->ice_getEncodingVersion();
+    obj->params = new vector<Ice::Byte>(params.first, params.second);
+    return reinterpret_cast<PyObject*>(obj);
+}
+
+//
+// AsyncTypedInvocation
+//
+IcePy::AsyncTypedInvocation::AsyncTypedInvocation(const Ice::ObjectPrx& prx, PyObject* pyProxy,
+                                                  const OperationPtr& op) :
+    Invocation(prx), _op(op), _pyProxy(pyProxy), _response(0), _ex(0), _sent(0)
+{
+    Py_INCREF(_pyProxy);
+}
+
+IcePy::AsyncTypedInvocation::~AsyncTypedInvocation()
+{
+    AdoptThread adoptThread; // Ensure the current thread is able to call into Python.
+
+    Py_DECREF(_pyProxy);
+    Py_XDECREF(_response);
+    Py_XDECREF(_ex);
+    Py_XDECREF(_sent);
+}
+
+PyObject*
+IcePy::AsyncTypedInvocation::invoke(PyObject* args, PyObject* /* kwds */)
+{
+    assert(PyTuple_Check(args));
+    assert(PyTuple_GET_SIZE(args) == 5); // Format is ((params...), response|None, exception|None, sent|None, ctx|None)
+    PyObject* pyparams = PyTuple_GET_ITEM(args, 0);
+    assert(PyTuple_Check(pyparams) || PyObject_TypeCheck(pyparams, &MarshaledArgsType));
+
+    PyObject* callable;
 
     callable = PyTuple_GET_ITEM(args, 1);
     if(PyCallable_Check(callable))
@@ -2441,19 +2811,19 @@ IcePy::AsyncTypedInvocation::invoke(PyObject* args, PyObject* /* kwds */)
         //
         if(pyctx != Py_None)
         {
-            Ice::Context ctx;
-            if(!dictionaryToContext(pyctx, ctx))
+            SharedContextPtr ctx = getContext(_communicator, pyctx);
+            if(!ctx)
             {
                 return 0;
             }
 
             if(cb)
             {
-                result = _prx->begin_ice_invoke(_op->name, _op->sendMode, params, ctx, cb);
+                result = _prx->begin_ice_invoke(_op->name, _op->sendMode, params, ctx->context, cb);
             }
             else
             {
-                result = _prx->begin_ice_invoke(_op->name, _op->sendMode, params, ctx);
+                result = _prx->begin_ice_invoke(_op->name, _op->sendMode, params, ctx->context);
             }
         }
         else
@@ -2744,7 +3114,11 @@ IcePy::NewAsyncInvocation::invoke(PyObject* args, PyObject* kwds)
         return 0;
     }
 
-    PyObjectHandle future = createFuture(_operation, asyncResultObj.get()); // Calls into Python code.
+    //
+    // If the communicator is bound to an event loop, create an asyncio future instead of an Ice.Future.
+    //
+    PyObject* eventLoopAdapter = getCommunicatorEventLoopAdapter(_communicator);
+    PyObjectHandle future = createFuture(_operation, asyncResultObj.get(), eventLoopAdapter); // Calls into Python code.
     if(!future.get())
     {
         return 0;
@@ -2956,7 +3330,7 @@ IcePy::NewAsyncTypedInvocation::handleInvoke(PyObject* args, PyObject* /* kwds *
     assert(PyTuple_Check(args));
     assert(PyTuple_GET_SIZE(args) == 2); // Format is ((params...), context|None)
     PyObject* pyparams = PyTuple_GET_ITEM(args, 0);
-    assert(PyTuple_Check(pyparams));
+    assert(PyTuple_Check(pyparams) || PyObject_TypeCheck(pyparams, &MarshaledArgsType));
     PyObject* pyctx = PyTuple_GET_ITEM(args, 1);
 
     //
@@ -2986,26 +3360,19 @@ IcePy::NewAsyncTypedInvocation::handleInvoke(PyObject* args, PyObject* /* kwds *
     //
     if(pyctx != Py_None)
     {
-        Ice::Context ctx;
-
-        if(!PyDict_Check(pyctx))
-        {
-            PyErr_Format(PyExc_ValueError, STRCAST("context argument must be None or a dictionary"));
-            return 0;
-        }
-
-        if(!dictionaryToContext(pyctx, ctx))
+        SharedContextPtr ctx = getContext(_communicator, pyctx);
+        if(!ctx)
         {
             return 0;
         }
 
         if(cb)
         {
-            return _prx->begin_ice_invoke(_op->name, _op->sendMode, params, ctx, cb);
+            return _prx->begin_ice_invoke(_op->name, _op->sendMode, params, ctx->context, cb);
         }
         else
         {
-            return _prx->begin_ice_invoke(_op->name, _op->sendMode, params, ctx);
+            return _prx->begin_ice_invoke(_op->name, _op->sendMode, params, ctx->context);
         }
     }
     else
@@ -3089,6 +3456,350 @@ IcePy::NewAsyncTypedInvocation::handleResponse(PyObject* future, bool ok,
     }
 }
 
+//
+// NewAsyncManyTypedInvocation
+//
+IcePy::NewAsyncManyTypedInvocation::NewAsyncManyTypedInvocation(const Ice::ObjectPrx& prx, const OperationPtr& op)
+    : Invocation(prx), _op(op), _twoway(prx->ice_isTwoway()), _future(0), _results(0), _remaining(0)
+{
+}
+
+IcePy::NewAsyncManyTypedInvocation::~NewAsyncManyTypedInvocation()
+{
+    AdoptThread adoptThread; // Ensure the current thread is able to call into Python.
+
+    Py_XDECREF(_future);
+    Py_XDECREF(_results);
+}
+
+PyObject*
+IcePy::NewAsyncManyTypedInvocation::invoke(PyObject* args, PyObject* /* kwds */)
+{
+    //
+    // Called from Python code, so the GIL is already acquired.
+    //
+
+    assert(PyTuple_Check(args));
+    assert(PyTuple_GET_SIZE(args) == 2); // Format is (iterable of (params...), context|None)
+    PyObject* pyargs = PyTuple_GET_ITEM(args, 0);
+    PyObject* pyctx = PyTuple_GET_ITEM(args, 1);
+
+    const string name = _op->name + "AsyncMany";
+
+    PyObjectHandle fastSeq = PySequence_Fast(pyargs, STRCAST("expected an iterable of argument tuples"));
+    if(!fastSeq.get())
+    {
+        return 0;
+    }
+
+    //
+    // prepareRequest() can release the GIL to copy large arguments, use a tuple as another
+    // thread could modify a list in the meantime.
+    //
+    PyObjectHandle seq = PyList_Check(fastSeq.get()) ? PyList_AsTuple(fastSeq.get()) : incRef(fastSeq.get());
+    if(!seq.get())
+    {
+        return 0;
+    }
+    Py_ssize_t count = PySequence_Fast_GET_SIZE(seq.get());
+
+    SharedContextPtr sharedCtx;
+    if(pyctx != Py_None)
+    {
+        sharedCtx = getContext(_communicator, pyctx);
+        if(!sharedCtx)
+        {
+            return 0;
+        }
+    }
+    //
+    // An explicit empty context would replace the proxy context and the implicit context, requests
+    // sent without a context must use Ice::noExplicitContext.
+    //
+    const Ice::Context& ctx = sharedCtx ? sharedCtx->context : Ice::noExplicitContext;
+
+    try
+    {
+        checkTwowayOnly(_op, _prx);
+    }
+    catch(const Ice::TwowayOnlyException& ex)
+    {
+        setPythonException(ex);
+        return 0;
+    }
+
+    //
+    // Marshal the requests one after the other in the same stream, we only record their offsets
+    // since the stream's buffer can be reallocated while it grows.
+    //
+    Ice::OutputStream os(_communicator);
+    vector<pair<size_t, size_t> > offsets;
+    offsets.reserve(static_cast<size_t>(count));
+    for(Py_ssize_t i = 0; i < count; ++i)
+    {
+        PyObject* item = PySequence_Fast_GET_ITEM(seq.get(), i);
+        if(!PyTuple_Check(item))
+        {
+            PyErr_Format(PyExc_ValueError, STRCAST("invalid value for argument tuple %" PY_FORMAT_SIZE_T "d in `%s'"),
+                         i + 1, const_cast<char*>(name.c_str()));
+            return 0;
+        }
+
+        size_t start = os.b.size();
+        pair<const Ice::Byte*, const Ice::Byte*> params;
+        if(!prepareRequest(_op, item, NewAsyncMapping, &os, params))
+        {
+            return 0;
+        }
+        offsets.push_back(make_pair(start, os.b.size()));
+    }
+
+    _results = PyList_New(count);
+    if(!_results)
+    {
+        return 0;
+    }
+    for(Py_ssize_t i = 0; i < count; ++i)
+    {
+        PyList_SET_ITEM(_results, i, incRef(Py_None));
+    }
+
+    PyObject* eventLoopAdapter = getCommunicatorEventLoopAdapter(_communicator);
+    PyObjectHandle future = eventLoopAdapter ? createFuture(name, 0, eventLoopAdapter) : createFuture();
+    if(!future.get())
+    {
+        return 0;
+    }
+
+    bool batch = _prx->ice_isBatchOneway() || _prx->ice_isBatchDatagram();
+    _future = incRef(future.get());
+    _remaining = batch ? 0 : count;
+
+    NewAsyncManyTypedInvocationPtr self = this;
+    Ice::Callback_Object_ice_invokePtr cb;
+    if(!batch)
+    {
+        cb = Ice::newCallback_Object_ice_invoke(self,
+                                                &NewAsyncManyTypedInvocation::response,
+                                                &NewAsyncManyTypedInvocation::exception,
+                                                &NewAsyncManyTypedInvocation::sent);
+    }
+
+    //
+    // Send the requests without the GIL, the callbacks of the requests already sent can run concurrently
+    // and acquire the GIL themselves.
+    //
+    const Ice::Byte* base = os.b.begin();
+    Py_ssize_t issued = 0;
+    IceInternal::UniquePtr<Ice::Exception> failure;
+    {
+        AllowThreads allowThreads; // Release Python's global interpreter lock during remote invocations.
+
+        try
+        {
+            for(; issued < count; ++issued)
+            {
+                pair<const Ice::Byte*, const Ice::Byte*> params(base + offsets[issued].first,
+                                                                 base + offsets[issued].second);
+                if(batch)
+                {
+                    _prx->begin_ice_invoke(_op->name, _op->sendMode, params, ctx);
+                }
+                else
+                {
+                    _prx->begin_ice_invoke(_op->name, _op->sendMode, params, ctx, cb, new RequestIndex(issued));
+                }
+            }
+        }
+        catch(const Ice::Exception& ex)
+        {
+            failure.reset(ex.ice_clone());
+        }
+    }
+
+    if(failure.get())
+    {
+        if(issued == 0)
+        {
+            //
+            // Nothing was sent, the exception (such as CommunicatorDestroyedException) can propagate directly.
+            //
+            Py_CLEAR(_future);
+            setPythonException(*failure.get());
+            return 0;
+        }
+
+        //
+        // The requests that weren't sent won't complete.
+        //
+        _remaining -= count - issued;
+        PyObjectHandle exh = convertException(*failure.get());
+        failed(exh.get());
+    }
+    else if(_remaining == 0)
+    {
+        //
+        // All the batch requests are queued, or there were no requests at all.
+        //
+        completed(-1);
+    }
+
+    if(PyErr_Occurred())
+    {
+        return 0;
+    }
+
+    return future.release();
+}
+
+void
+IcePy::NewAsyncManyTypedInvocation::response(bool ok, const pair<const Ice::Byte*, const Ice::Byte*>& results,
+                                             const RequestIndexPtr& cookie)
+{
+    AdoptThread adoptThread; // Ensure the current thread is able to call into Python.
+
+    if(!_future)
+    {
+        return; // Already completed with an exception.
+    }
+
+    try
+    {
+        if(ok)
+        {
+            PyObjectHandle args;
+            try
+            {
+                args = unmarshalResults(_op, results);
+            }
+            catch(const Ice::Exception& ex)
+            {
+                PyObjectHandle exh = convertException(ex);
+                failed(exh.get());
+                return;
+            }
+
+            if(!args.get())
+            {
+                PyException ex; // Retrieve it before another Python API call clears it.
+                failed(ex.ex.get());
+                return;
+            }
+
+            //
+            // Each result follows the rules of the future returned by opAsync.
+            //
+            PyObject* r;
+            if(PyTuple_GET_SIZE(args.get()) == 0)
+            {
+                r = incRef(Py_None);
+            }
+            else if(PyTuple_GET_SIZE(args.get()) == 1)
+            {
+                r = incRef(PyTuple_GET_ITEM(args.get(), 0));
+            }
+            else
+            {
+                r = args.release();
+            }
+            PyList_SetItem(_results, cookie->index, r); // Steals a reference.
+
+            completed(cookie->index);
+        }
+        else
+        {
+            PyObjectHandle ex = unmarshalException(_op, results);
+            failed(ex.get());
+        }
+    }
+    catch(const AbortMarshaling&)
+    {
+        PyException ex; // Retrieve it before another Python API call clears it.
+        failed(ex.ex.get());
+    }
+
+    if(PyErr_Occurred())
+    {
+        handleException();
+    }
+}
+
+void
+IcePy::NewAsyncManyTypedInvocation::exception(const Ice::Exception& ex, const RequestIndexPtr&)
+{
+    AdoptThread adoptThread; // Ensure the current thread is able to call into Python.
+
+    if(!_future)
+    {
+        return; // Already completed with an exception.
+    }
+
+    PyObjectHandle exh = convertException(ex); // NOTE: This can release the GIL
+    failed(exh.get());
+    if(PyErr_Occurred())
+    {
+        handleException();
+    }
+}
+
+void
+IcePy::NewAsyncManyTypedInvocation::sent(bool, const RequestIndexPtr& cookie)
+{
+    if(!_twoway)
+    {
+        //
+        // For a oneway/datagram invocation, we consider the request complete when sent.
+        //
+        AdoptThread adoptThread; // Ensure the current thread is able to call into Python.
+        completed(cookie->index);
+        if(PyErr_Occurred())
+        {
+            handleException();
+        }
+    }
+}
+
+void
+IcePy::NewAsyncManyTypedInvocation::completed(Py_ssize_t index)
+{
+    //
+    // Must be called with the GIL acquired, the GIL also protects the invocation's state. The caller
+    // handles any Python error raised by the future.
+    //
+    if(!_future)
+    {
+        return;
+    }
+
+    if(index >= 0 && --_remaining > 0)
+    {
+        return;
+    }
+
+    PyObjectHandle future = _future; // Steals a reference.
+    _future = 0; // Break cyclic dependency.
+
+    PyObjectHandle tmp = callMethod(future.get(), "set_result", _results);
+}
+
+void
+IcePy::NewAsyncManyTypedInvocation::failed(PyObject* ex)
+{
+    //
+    // Must be called with the GIL acquired. The future completes with the first exception, the
+    // replies of the other requests are ignored.
+    //
+    if(!_future)
+    {
+        return;
+    }
+
+    PyObjectHandle future = _future; // Steals a reference.
+    _future = 0; // Break cyclic dependency.
+
+    PyObjectHandle tmp = callMethod(future.get(), "set_exception", ex);
+}
+
 //
 // SyncBlobjectInvocation
 //
@@ -3160,14 +3871,14 @@ IcePy::SyncBlobjectInvocation::invoke(PyObject* args, PyObject* /* kwds */)
         }
         else
         {
-            Ice::Context context;
-            if(!dictionaryToContext(ctx, context))
+            SharedContextPtr context = getContext(_communicator, ctx);
+            if(!context)
             {
                 return 0;
             }
 
             AllowThreads allowThreads; // Release Python's global interpreter lock during remote invocations.
-            ok = _prx->ice_invoke(operation, sendMode, in, out, context);
+            ok = _prx->ice_invoke(operation, sendMode, in, out, context->context);
         }
 
         //
@@ -3380,19 +4091,19 @@ IcePy::AsyncBlobjectInvocation::invoke(PyObject* args, PyObject* kwds)
         }
         else
         {
-            Ice::Context context;
-            if(!dictionaryToContext(pyctx, context))
+            SharedContextPtr context = getContext(_communicator, pyctx);
+            if(!context)
             {
                 return 0;
             }
 
             if(cb)
             {
-                result = _prx->begin_ice_invoke(operation, sendMode, in, context, cb);
+                result = _prx->begin_ice_invoke(operation, sendMode, in, context->context, cb);
             }
             else
             {
-                result = _prx->begin_ice_invoke(operation, sendMode, in, context);
+                result = _prx->begin_ice_invoke(operation, sendMode, in, context->context);
             }
         }
     }
@@ -3678,19 +4389,19 @@ IcePy::NewAsyncBlobjectInvocation::handleInvoke(PyObject* args, PyObject* /* kwd
     }
     else
     {
-        Ice::Context context;
-        if(!dictionaryToContext(ctx, context))
+        SharedContextPtr context = getContext(_communicator, ctx);
+        if(!context)
         {
             return 0;
         }
 
         if(cb)
         {
-            return _prx->begin_ice_invoke(operation, sendMode, in, context, cb);
+            return _prx->begin_ice_invoke(operation, sendMode, in, context->context, cb);
         }
         else
         {
-            return _prx->begin_ice_invoke(operation, sendMode, in, context);
+            return _prx->begin_ice_invoke(operation, sendMode, in, context->context);
         }
     }
 }
@@ -3759,12 +4470,71 @@ IcePy::NewAsyncBlobjectInvocation::handleResponse(PyObject* future, bool ok,
     PyErr_Clear();
 }
 
+//
+// Returns true if the result of a servant method can be marshaled immediately, that is, if
+// it's neither a future nor a coroutine.
+//
+static bool
+isPlainResult(PyObject* result)
+{
+    if(result == Py_None || PyTuple_CheckExact(result) || PyList_CheckExact(result) || PyDict_CheckExact(result) ||
+       PyLong_CheckExact(result) || PyFloat_CheckExact(result) || PyBool_Check(result) ||
+       PyUnicode_CheckExact(result) || PyBytes_CheckExact(result))
+    {
+        return true;
+    }
+
+#if PY_VERSION_HEX >= 0x03050000
+    if(PyCoro_CheckExact(result))
+    {
+        return false;
+    }
+#endif
+
+#if PY_VERSION_HEX < 0x03000000
+    if(PyInt_CheckExact(result))
+    {
+        return true;
+    }
+#endif
+
+    //
+    // Same test as Ice.Object._iceDispatchResult.
+    //
+    PyObjectHandle addDoneCallback = getAttr(result, "add_done_callback", false);
+    return !addDoneCallback.get() || !PyCallable_Check(addDoneCallback.get());
+}
+
 //
 // Upcall
 //
 void
-Upcall::dispatchImpl(PyObject* servant, const string& dispatchName, PyObject* args, const Ice::Current& current)
+Upcall::dispatchImpl(PyObject* servant, const string& dispatchName, PyObject* args, const Ice::Current& current,
+                     PyObject* method)
 {
+    if(method)
+    {
+        //
+        // The servant uses the default _iceDispatch implementation, so we can call the servant method
+        // directly. Only the results that complete later (futures and coroutines) are handed to Python.
+        //
+        PyObjectHandle result = PyObject_Call(method, args, 0);
+        if(!result.get())
+        {
+            PyException ex; // Retrieve it before another Python API call clears it.
+            exception(ex);
+        }
+        else if(isPlainResult(result.get()))
+        {
+            response(result.get());
+        }
+        else
+        {
+            callDispatch(servant, "_iceDispatchResult", result.get(), 0, dispatchName, current);
+        }
+        return;
+    }
+
     Ice::CommunicatorPtr communicator = current.adapter->getCommunicator();
 
     //
@@ -3784,13 +4554,22 @@ Upcall::dispatchImpl(PyObject* servant, const string& dispatchName, PyObject* ar
     }
 
     //
-    // Get the _iceDispatch method. The _iceDispatch method will invoke the servant method and pass it the arguments.
+    // The _iceDispatch method will invoke the servant method and pass it the arguments.
     //
-    PyObjectHandle dispatchMethod = getAttr(servant, "_iceDispatch", false);
+    callDispatch(servant, "_iceDispatch", servantMethod.get(), args, dispatchName, current);
+}
+
+void
+Upcall::callDispatch(PyObject* servant, const char* name, PyObject* arg1, PyObject* arg2, const string& dispatchName,
+                     const Ice::Current& current)
+{
+    Ice::CommunicatorPtr communicator = current.adapter->getCommunicator();
+
+    PyObjectHandle dispatchMethod = getAttr(servant, name, false);
     if(!dispatchMethod.get())
     {
         ostringstream ostr;
-        ostr << "_iceDispatch method not found for identity " << communicator->identityToString(current.id)
+        ostr << name << " method not found for identity " << communicator->identityToString(current.id)
              << " and operation `" << dispatchName << "'";
         string str = ostr.str();
         PyErr_WarnEx(PyExc_RuntimeWarning, const_cast<char*>(str.c_str()), 1);
@@ -3799,7 +4578,8 @@ Upcall::dispatchImpl(PyObject* servant, const string& dispatchName, PyObject* ar
         throw ex;
     }
 
-    PyObjectHandle dispatchArgs = PyTuple_New(3);
+    Py_ssize_t sz = arg2 ? 3 : 2;
+    PyObjectHandle dispatchArgs = PyTuple_New(sz);
     if(!dispatchArgs.get())
     {
         throwPythonException();
@@ -3811,12 +4591,27 @@ Upcall::dispatchImpl(PyObject* servant, const string& dispatchName, PyObject* ar
         throwPythonException();
     }
     callback->upcall = new UpcallPtr(this);
-    PyTuple_SET_ITEM(dispatchArgs.get(), 0, reinterpret_cast<PyObject*>(callback)); // Steals a reference.
-    PyTuple_SET_ITEM(dispatchArgs.get(), 1, servantMethod.release()); // Steals a reference.
-    PyTuple_SET_ITEM(dispatchArgs.get(), 2, incRef(args)); // Steals a reference.
 
     //
-    // Ignore the return value of _iceDispatch -- it will use the dispatch callback.
+    // When the communicator is bound to an event loop, the callback provides the event loop adapter so that
+    // _iceDispatchResult runs coroutines as tasks on that loop.
+    //
+    PyObject* eventLoopAdapter = getCommunicatorEventLoopAdapter(communicator);
+    if(eventLoopAdapter)
+    {
+        callback->eventLoopAdapter = incRef(eventLoopAdapter);
+    }
+
+    Py_ssize_t i = 0;
+    PyTuple_SET_ITEM(dispatchArgs.get(), i++, reinterpret_cast<PyObject*>(callback)); // Steals a reference.
+    PyTuple_SET_ITEM(dispatchArgs.get(), i++, incRef(arg1)); // Steals a reference.
+    if(arg2)
+    {
+        PyTuple_SET_ITEM(dispatchArgs.get(), i++, incRef(arg2)); // Steals a reference.
+    }
+
+    //
+    // Ignore the return value of the dispatch method -- it will use the dispatch callback.
     //
     PyObjectHandle ignored = PyObject_Call(dispatchMethod.get(), dispatchArgs.get(), 0);
 
@@ -3834,8 +4629,8 @@ Upcall::dispatchImpl(PyObject* servant, const string& dispatchName, PyObject* ar
 // TypedUpcall
 //
 IcePy::TypedUpcall::TypedUpcall(const OperationPtr& op, const Ice::AMD_Object_ice_invokePtr& callback,
-                                const Ice::CommunicatorPtr& communicator) :
-    _op(op), _callback(callback), _communicator(communicator)
+                                const Ice::CommunicatorPtr& communicator, PyObject* method) :
+    _op(op), _callback(callback), _communicator(communicator), _method(method)
 {
 }
 
@@ -3847,9 +4642,9 @@ IcePy::TypedUpcall::dispatch(PyObject* servant, const pair<const Ice::Byte*, con
 
     //
     // Unmarshal the in parameters. We have to leave room in the arguments for a trailing
-    // Ice::Current object.
+    // Ice::Current object, unless the operation opted out with python:no-current.
     //
-    Py_ssize_t count = static_cast<Py_ssize_t>(_op->inParams.size()) + 1;
+    Py_ssize_t count = static_cast<Py_ssize_t>(_op->inParams.size()) + (_op->noCurrent ? 0 : 1);
 
     PyObjectHandle args = PyTuple_New(count);
     if(!args.get())
@@ -3866,6 +4661,7 @@ IcePy::TypedUpcall::dispatch(PyObject* servant, const pair<const Ice::Byte*, con
         // This is necessary to support object unmarshaling (see ObjectReader).
         //
         StreamUtil util;
+        util.setStringTable(getCommunicatorStringTable(_communicator));
         assert(!is.getClosure());
         is.setClosure(&util);
 
@@ -3923,11 +4719,14 @@ IcePy::TypedUpcall::dispatch(PyObject* servant, const pair<const Ice::Byte*, con
     //
     // Create an object to represent Ice::Current. We need to append this to the argument tuple.
     //
-    PyObjectHandle curr = createCurrent(current);
-    PyTuple_SET_ITEM(args.get(), PyTuple_GET_SIZE(args.get()) - 1,
-                     curr.release()); // PyTuple_SET_ITEM steals a reference.
+    if(!_op->noCurrent)
+    {
+        PyObjectHandle curr = createCurrent(current);
+        PyTuple_SET_ITEM(args.get(), PyTuple_GET_SIZE(args.get()) - 1,
+                         curr.release()); // PyTuple_SET_ITEM steals a reference.
+    }
 
-    dispatchImpl(servant, _op->dispatchName, args.get(), current);
+    dispatchImpl(servant, _op->dispatchName, args.get(), current, _method);
 }
 
 void
@@ -4626,11 +5425,206 @@ IcePy::ServantWrapper::getObject()
     return _servant;
 }
 
+//
+// DispatchTable implementation.
+//
+IcePy::DispatchTable::DispatchTable(PyTypeObject* type) :
+    _type(type), _defaultDispatch(-1), _versionTag(0)
+{
+}
+
+bool
+IcePy::DispatchTable::find(const string& operation, Entry& result)
+{
+    //
+    // Python assigns a new version tag to a type each time the type or one of its base types is modified,
+    // the entries computed for another tag are stale. A type without a valid tag can't be tracked, its
+    // entries are recomputed for each dispatch.
+    //
+    if(!PyType_HasFeature(_type, Py_TPFLAGS_VALID_VERSION_TAG) || _type->tp_version_tag != _versionTag)
+    {
+        _entries.clear();
+        _defaultDispatch = -1;
+    }
+
+    EntryMap::const_iterator p = _entries.find(operation);
+    if(p != _entries.end())
+    {
+        result = p->second;
+        return true;
+    }
+
+    //
+    // Look for the Operation object in the servant's type.
+    //
+    string attrName = "_op_" + operation;
+    PyObjectHandle h = getAttr(reinterpret_cast<PyObject*>(_type), attrName, false);
+    if(!h.get())
+    {
+        PyErr_Clear();
+        return false;
+    }
+
+    assert(PyObject_IsInstance(h.get(), reinterpret_cast<PyObject*>(&OperationType)) == 1);
+    OperationObject* obj = reinterpret_cast<OperationObject*>(h.get());
+
+    Entry entry;
+    entry.op = *obj->op;
+#if PY_VERSION_HEX >= 0x03000000
+    entry.name = PyUnicode_InternFromString(entry.op->dispatchName.c_str());
+#else
+    entry.name = PyString_InternFromString(entry.op->dispatchName.c_str());
+#endif
+    if(!entry.name.get())
+    {
+        PyErr_Clear();
+        return false;
+    }
+
+    //
+    // If the type doesn't override _iceDispatch, keep the function that implements the operation so that
+    // we can call it directly. The function is looked up in the type's MRO like the attribute lookup does,
+    // and only plain functions are kept so that binding them to the servant behaves the same way. A missing
+    // method is reported by the regular dispatch.
+    //
+    if(usesDefaultDispatch())
+    {
+        PyObject* function = _PyType_Lookup(_type, entry.name.get()); // Borrowed reference.
+        if(function && PyFunction_Check(function))
+        {
+            entry.function = function;
+        }
+    }
+
+    //
+    // The lookups above assign a version tag to the type if it doesn't have one yet.
+    //
+    if(PyType_HasFeature(_type, Py_TPFLAGS_VALID_VERSION_TAG))
+    {
+        if(_type->tp_version_tag != _versionTag)
+        {
+            _entries.clear();
+            _versionTag = _type->tp_version_tag;
+        }
+        _entries.insert(EntryMap::value_type(operation, entry));
+    }
+    result = entry;
+    return true;
+}
+
+bool
+IcePy::DispatchTable::usesDefaultDispatch()
+{
+    if(_defaultDispatch < 0)
+    {
+        _defaultDispatch = 0;
+
+        //
+        // A type that customizes the attribute lookup (__getattribute__ or __getattr__) must go through it.
+        //
+        if(_type->tp_getattro != PyObject_GenericGetAttr)
+        {
+            return false;
+        }
+
+        PyObject* objectType = lookupType("Ice.Object");
+        assert(objectType);
+        PyObjectHandle defaultDispatch = getAttr(objectType, "_iceDispatch", false);
+        PyObjectHandle servantDispatch = getAttr(reinterpret_cast<PyObject*>(_type), "_iceDispatch", false);
+        if(defaultDispatch.get() && servantDispatch.get())
+        {
+            //
+            // With Python 2, each lookup returns a new unbound method, which compare equal when they
+            // wrap the same function.
+            //
+            int r = PyObject_RichCompareBool(defaultDispatch.get(), servantDispatch.get(), Py_EQ);
+            if(r < 0)
+            {
+                PyErr_Clear();
+            }
+            _defaultDispatch = r > 0 ? 1 : 0;
+        }
+    }
+    return _defaultDispatch > 0;
+}
+
+namespace
+{
+
+bool
+hasInstanceAttr(PyObject* obj, PyObject* name)
+{
+    PyObject** dict = _PyObject_GetDictPtr(obj);
+    return dict && *dict && PyDict_GetItem(*dict, name);
+}
+
+//
+// The dispatch tables, each with a weak reference to its type. The callback of the weak reference removes
+// the table when the type is destroyed, the registry doesn't keep the types or their functions alive.
+//
+struct DispatchTableRef
+{
+    PyObjectHandle type; // Weak reference.
+    DispatchTablePtr table;
+};
+typedef map<PyTypeObject*, DispatchTableRef> DispatchTableMap;
+DispatchTableMap _dispatchTables;
+
+#ifdef WIN32
+extern "C"
+#endif
+PyObject*
+dispatchTableTypeDestroyed(PyObject* /*self*/, PyObject* ref)
+{
+    for(DispatchTableMap::iterator p = _dispatchTables.begin(); p != _dispatchTables.end(); ++p)
+    {
+        if(p->second.type.get() == ref)
+        {
+            _dispatchTables.erase(p);
+            break;
+        }
+    }
+    return incRef(Py_None);
+}
+
+PyMethodDef dispatchTableCallbackDef =
+{
+    STRCAST("dispatchTableTypeDestroyed"), reinterpret_cast<PyCFunction>(dispatchTableTypeDestroyed), METH_O,
+    PyDoc_STR(STRCAST("internal function"))
+};
+
+DispatchTablePtr
+getDispatchTable(PyTypeObject* type)
+{
+    DispatchTableMap::const_iterator p = _dispatchTables.find(type);
+    if(p != _dispatchTables.end())
+    {
+        return p->second.table;
+    }
+
+    DispatchTablePtr table = new DispatchTable(type);
+
+    static PyObject* callback = PyCFunction_New(&dispatchTableCallbackDef, 0);
+    PyObjectHandle ref = callback ? PyWeakref_NewRef(reinterpret_cast<PyObject*>(type), callback) : 0;
+    if(!ref.get())
+    {
+        PyErr_Clear(); // The table isn't shared with the other servants of this type.
+        return table;
+    }
+
+    DispatchTableRef& r = _dispatchTables[type];
+    r.type = ref;
+    r.table = table;
+    return table;
+}
+
+}
+
 //
 // TypedServantWrapper implementation.
 //
 IcePy::TypedServantWrapper::TypedServantWrapper(PyObject* servant) :
-    ServantWrapper(servant), _lastOp(_operationMap.end())
+    ServantWrapper(servant)
 {
 }
 
@@ -4644,57 +5638,45 @@ IcePy::TypedServantWrapper::ice_invoke_async(const Ice::AMD_Object_ice_invokePtr
     try
     {
         //
-        // Locate the Operation object. As an optimization we keep a reference
-        // to the most recent operation we've dispatched, so check that first.
+        // Look up the table of the servant's current type, the servant's class can be reassigned. The type
+        // is kept alive until the method is bound, looking up the operation can run Python code.
         //
-        OperationPtr op;
-        if(_lastOp != _operationMap.end() && _lastOp->first == current.operation)
+        PyObjectHandle type = incRef(reinterpret_cast<PyObject*>(Py_TYPE(_servant)));
+        DispatchTablePtr table = getDispatchTable(Py_TYPE(_servant));
+        DispatchTable::Entry entry;
+        if(!table->find(current.operation, entry))
         {
-            op = _lastOp->second;
+            Ice::OperationNotExistException ex(__FILE__, __LINE__);
+            ex.id = current.id;
+            ex.facet = current.facet;
+            ex.operation = current.operation;
+            throw ex;
         }
-        else
-        {
-            //
-            // Next check our cache of operations.
-            //
-            _lastOp = _operationMap.find(current.operation);
-            if(_lastOp == _operationMap.end())
-            {
-                //
-                // Look for the Operation object in the servant's type.
-                //
-                string attrName = "_op_" + current.operation;
-                PyObjectHandle h = getAttr((PyObject*)_servant->ob_type, attrName, false);
-                if(!h.get())
-                {
-                    PyErr_Clear();
-                    Ice::OperationNotExistException ex(__FILE__, __LINE__);
-                    ex.id = current.id;
-                    ex.facet = current.facet;
-                    ex.operation = current.operation;
-                    throw ex;
-                }
 
-                assert(PyObject_IsInstance(h.get(), reinterpret_cast<PyObject*>(&OperationType)) == 1);
-                OperationObject* obj = reinterpret_cast<OperationObject*>(h.get());
-                op = *obj->op;
-                _lastOp = _operationMap.insert(OperationMap::value_type(current.operation, op)).first;
-            }
-            else
-            {
-                op = _lastOp->second;
-            }
+        //
+        // See bug 4976.
+        //
+        if(!entry.op->pseudoOp)
+        {
+            _iceCheckMode(entry.op->mode, current.mode);
         }
 
         //
-        // See bug 4976.
+        // Bind the function to the servant, the same way the attribute lookup does. An instance attribute
+        // with the name of the method hides the function, the regular dispatch looks it up.
         //
-        if(!op->pseudoOp)
+        PyObjectHandle method;
+        PyObjectHandle function = incRef(entry.function);
+        if(function.get() && !hasInstanceAttr(_servant, entry.name.get()))
         {
-            _iceCheckMode(op->mode, current.mode);
+            method = Py_TYPE(function.get())->tp_descr_get(function.get(), _servant, type.get());
+            if(!method.get())
+            {
+                throwPythonException();
+            }
         }
 
-        UpcallPtr up = new TypedUpcall(op, cb, current.adapter->getCommunicator());
+        UpcallPtr up = new TypedUpcall(entry.op, cb, current.adapter->getCommunicator(), method.get());
         up->dispatch(_servant, inParams, current);
     }
     catch(const Ice::Exception& ex)
@@ -4793,3 +5775,24 @@ IcePy::createFuture(const string& operation, PyObject* asyncResult)
     type->tp_init(future, args.get(), 0); // Call the constructor
     return future;
 }
+
+PyObject*
+IcePy::createFuture(const string& operation, PyObject* asyncResult, PyObject* eventLoopAdapter)
+{
+    if(!eventLoopAdapter)
+    {
+        return createFuture(operation, asyncResult);
+    }
+
+    if(!asyncResult) // Can be nil for batch invocations.
+    {
+        asyncResult = Py_None;
+    }
+
+    PyObjectHandle operationObj = createString(operation);
+    if(!operationObj.get())
+    {
+        return 0;
+    }
+    return callMethod(eventLoopAdapter, "createFuture", operationObj.get(), asyncResult);
+}
@@ -153,6 +153,7 @@ ServantWrapperPtr createServantWrapper(PyObject*);
 
 PyObject* createFuture();
 PyObject* createFuture(const std::string&, PyObject*);
+PyObject* createFuture(const std::string&, PyObject*, PyObject*);
 
 }
 
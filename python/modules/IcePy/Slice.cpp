@@ -7,14 +7,18 @@
 #include <Slice/Preprocessor.h>
 #include <Slice/PythonUtil.h>
 #include <Slice/Util.h>
+#include <Slice/MD5.h>
 #include <IceUtil/Options.h>
 #include <IceUtil/ConsoleUtil.h>
+#include <IceUtil/FileUtil.h>
+#include <IceUtil/UUID.h>
 
 //
 // Python headers needed for PyEval_EvalCode.
 //
 #include <compile.h>
 #include <eval.h>
+#include <marshal.h>
 
 using namespace std;
 using namespace IcePy;
@@ -22,6 +26,143 @@ using namespace Slice;
 using namespace Slice::Python;
 using namespace IceUtilInternal;
 
+namespace
+{
+
+//
+// Read the remaining content of a file into a string.
+//
+bool
+readFile(FILE* file, string& data)
+{
+    char buf[4096];
+    size_t n;
+    while((n = ::fread(buf, 1, sizeof(buf), file)) > 0)
+    {
+        data.append(buf, n);
+    }
+    return !::ferror(file);
+}
+
+//
+// Compute the path of the cache entry for a Slice file. The key covers the Ice version, the Python bytecode
+// version, the translator options and the preprocessed Slice source, which includes the content of all the
+// included files. Any change to one of them selects a different entry, so stale entries are never loaded.
+//
+string
+getCacheEntry(const string& cacheDir, const string& file, const vector<string>& options, const string& source)
+{
+    ostringstream key;
+    key << ICE_STRING_VERSION << '\0' << PyImport_GetMagicNumber() << '\0' << file << '\0';
+    for(vector<string>::const_iterator p = options.begin(); p != options.end(); ++p)
+    {
+        key << *p << '\0';
+    }
+    key << source;
+
+    string data = key.str();
+    MD5 md5(reinterpret_cast<const unsigned char*>(data.c_str()), static_cast<int>(data.size()));
+    unsigned char digest[16];
+    md5.getDigest(digest);
+
+    //
+    // Prefix the entry with the base name of the Slice file to make the cache directory easier to inspect.
+    //
+    string name = file;
+    string::size_type pos = name.find_last_of("/\\");
+    if(pos != string::npos)
+    {
+        name.erase(0, pos + 1);
+    }
+    pos = name.rfind('.');
+    if(pos != string::npos)
+    {
+        name.erase(pos);
+    }
+    name += '-';
+
+    static const char* hex = "0123456789abcdef";
+    for(int i = 0; i < 16; ++i)
+    {
+        name += hex[digest[i] >> 4];
+        name += hex[digest[i] & 0x0f];
+    }
+    return cacheDir + "/" + name + ".marshal";
+}
+
+//
+// Load the code object stored in a cache entry. Returns 0 without an exception set if the entry doesn't exist
+// or cannot be read.
+//
+PyObject*
+loadCacheEntry(const string& entry)
+{
+    FILE* file = IceUtilInternal::fopen(entry, "rb");
+    if(!file)
+    {
+        return 0;
+    }
+
+    string data;
+    bool ok = readFile(file, data);
+    ::fclose(file);
+    if(!ok || data.empty())
+    {
+        return 0;
+    }
+
+    PyObject* code = PyMarshal_ReadObjectFromString(const_cast<char*>(data.c_str()),
+                                                    static_cast<Py_ssize_t>(data.size()));
+    if(!code || !PyCode_Check(code))
+    {
+        //
+        // Ignore a corrupted entry, the caller regenerates it.
+        //
+        Py_XDECREF(code);
+        PyErr_Clear();
+        return 0;
+    }
+    return code;
+}
+
+//
+// Store a code object in a cache entry. Failures are ignored since the cache is only an optimization. The entry
+// is written to a temporary file that is then renamed, so concurrent processes never read a partial entry.
+//
+void
+storeCacheEntry(const string& cacheDir, const string& entry, PyObject* code)
+{
+    PyObjectHandle data = PyMarshal_WriteObjectToString(code, Py_MARSHAL_VERSION);
+    if(!data.get())
+    {
+        PyErr_Clear();
+        return;
+    }
+
+    IceUtilInternal::structstat buf;
+    if(IceUtilInternal::stat(cacheDir, &buf) != 0)
+    {
+        IceUtilInternal::mkdir(cacheDir, 0777);
+    }
+
+    string tmp = entry + "." + IceUtil::generateUUID();
+    FILE* file = IceUtilInternal::fopen(tmp, "wb");
+    if(!file)
+    {
+        return;
+    }
+
+    size_t sz = static_cast<size_t>(PyBytes_GET_SIZE(data.get()));
+    bool ok = ::fwrite(PyBytes_AS_STRING(data.get()), 1, sz, file) == sz;
+    ok = ::fclose(file) == 0 && ok;
+    if(!ok || IceUtilInternal::rename(tmp, entry) != 0)
+    {
+        IceUtilInternal::remove(tmp);
+    }
+}
+
+}
+
 extern "C"
 PyObject*
 IcePy_loadSlice(PyObject* /*self*/, PyObject* args)
@@ -66,6 +207,9 @@ IcePy_loadSlice(PyObject* /*self*/, PyObject* args)
     opts.addOpt("", "underscore");
     opts.addOpt("", "checksum");
     opts.addOpt("", "all");
+    opts.addOpt("", "slots");
+    opts.addOpt("", "cache-dir", IceUtilInternal::Options::NeedArg);
+    opts.addOpt("", "no-cache");
 
     vector<string> files;
     try
@@ -96,6 +240,7 @@ IcePy_loadSlice(PyObject* /*self*/, PyObject* args)
     bool underscore = opts.isSet("underscore");
     bool all = false;
     bool checksum = false;
+    bool slots = false;
     if(opts.isSet("D"))
     {
         vector<string> optargs = opts.argVec("D");
@@ -123,6 +268,34 @@ IcePy_loadSlice(PyObject* /*self*/, PyObject* args)
     debug = opts.isSet("d") || opts.isSet("debug");
     all = opts.isSet("all");
     checksum = opts.isSet("checksum");
+    slots = opts.isSet("slots");
+
+    //
+    // The compiled code is cached in the directory given by --cache-dir or by the ICE_PYTHON_SLICE_CACHE_DIR
+    // environment variable. The cache is disabled if neither is set, or with --no-cache.
+    //
+    string cacheDir;
+    if(!opts.isSet("no-cache"))
+    {
+        if(opts.isSet("cache-dir"))
+        {
+            cacheDir = opts.optArg("cache-dir");
+        }
+        else
+        {
+            const char* env = getenv("ICE_PYTHON_SLICE_CACHE_DIR");
+            if(env)
+            {
+                cacheDir = env;
+            }
+        }
+    }
+
+    vector<string> cacheOptions = cppArgs;
+    cacheOptions.push_back(underscore ? "--underscore" : "");
+    cacheOptions.push_back(all ? "--all" : "");
+    cacheOptions.push_back(checksum ? "--checksum" : "");
+    cacheOptions.push_back(slots ? "--slots" : "");
 
     bool ignoreRedefs = false;
     bool keepComments = true;
@@ -139,44 +312,79 @@ IcePy_loadSlice(PyObject* /*self*/, PyObject* args)
             return 0;
         }
 
-        UnitPtr u = Slice::Unit::createUnit(ignoreRedefs, all, ice, underscore);
-        int parseStatus = u->parse(file, cppHandle, debug);
+        //
+        // Look for the compiled code in the cache before parsing the file.
+        //
+        PyObjectHandle src;
+        string cacheEntry;
+        if(!cacheDir.empty())
+        {
+            string source;
+            if(readFile(cppHandle, source))
+            {
+                cacheEntry = getCacheEntry(cacheDir, file, cacheOptions, source);
+                src = loadCacheEntry(cacheEntry);
+            }
+            ::rewind(cppHandle);
+        }
 
-        if(!icecpp->close() || parseStatus == EXIT_FAILURE)
+        if(src.get())
         {
-            PyErr_Format(PyExc_RuntimeError, "Slice parsing failed for `%s'", cmd);
-            u->destroy();
-            return 0;
+            //
+            // The preprocessor can fail after writing its output, the cached code is only used if it succeeds.
+            //
+            if(!icecpp->close())
+            {
+                PyErr_Format(PyExc_RuntimeError, "Slice preprocessing failed for `%s'", cmd);
+                return 0;
+            }
         }
+        else
+        {
+            UnitPtr u = Slice::Unit::createUnit(ignoreRedefs, all, ice, underscore);
+            int parseStatus = u->parse(file, cppHandle, debug);
 
-        //
-        // Generate the Python code into a string stream.
-        //
-        ostringstream codeStream;
-        IceUtilInternal::Output out(codeStream);
-        out.setUseTab(false);
+            if(!icecpp->close() || parseStatus == EXIT_FAILURE)
+            {
+                PyErr_Format(PyExc_RuntimeError, "Slice parsing failed for `%s'", cmd);
+                u->destroy();
+                return 0;
+            }
 
-        //
-        // Emit a Python magic comment to set the file encoding.
-        // It must be the first or second line.
-        //
-        out << "# -*- coding: utf-8 -*-\n";
-        generate(u, all, checksum, includePaths, out);
-        u->destroy();
+            //
+            // Generate the Python code into a string stream.
+            //
+            ostringstream codeStream;
+            IceUtilInternal::Output out(codeStream);
+            out.setUseTab(false);
 
-        string code = codeStream.str();
+            //
+            // Emit a Python magic comment to set the file encoding.
+            // It must be the first or second line.
+            //
+            out << "# -*- coding: utf-8 -*-\n";
+            generate(u, all, checksum, slots, includePaths, out);
+            u->destroy();
 
-        //
-        // We need to invoke Ice.updateModules() so that all of the types we've just generated
-        // are made "public".
-        //
-        code += "\nIce.updateModules()\n";
+            string code = codeStream.str();
 
-        PyObjectHandle src = Py_CompileString(const_cast<char*>(code.c_str()), const_cast<char*>(file.c_str()),
-                                              Py_file_input);
-        if(!src.get())
-        {
-            return 0;
+            //
+            // We need to invoke Ice.updateModules() so that all of the types we've just generated
+            // are made "public".
+            //
+            code += "\nIce.updateModules()\n";
+
+            src = Py_CompileString(const_cast<char*>(code.c_str()), const_cast<char*>(file.c_str()),
+                                   Py_file_input);
+            if(!src.get())
+            {
+                return 0;
+            }
+
+            if(!cacheEntry.empty())
+            {
+                storeCacheEntry(cacheDir, cacheEntry, src.get());
+            }
         }
 
         PyObjectHandle globals = PyDict_New();
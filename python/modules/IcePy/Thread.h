@@ -30,6 +30,31 @@ private:
     PyThreadState* _state;
 };
 
+//
+// Lock a monitor with the GIL released. The threads that call the InvokeThread callbacks lock their
+// monitor before acquiring the GIL, so these monitors must never be waited for while holding the GIL.
+//
+class AllowThreadsLock
+{
+public:
+
+    AllowThreadsLock(const IceUtil::Monitor<IceUtil::Mutex>& monitor) :
+        _monitor(monitor)
+    {
+        AllowThreads allowThreads;
+        _monitor.lock();
+    }
+
+    ~AllowThreadsLock()
+    {
+        _monitor.unlock();
+    }
+
+private:
+
+    const IceUtil::Monitor<IceUtil::Mutex>& _monitor;
+};
+
 //
 // Ensure that the current thread is capable of calling into Python.
 //
@@ -96,9 +121,37 @@ public:
             _ex = ex.ice_clone();
         }
 
-        IceUtil::Monitor<IceUtil::Mutex>::Lock sync(_monitor);
-        _done = true;
-        _monitor.notify();
+        std::vector<PyObject*> callbacks;
+        {
+            IceUtil::Monitor<IceUtil::Mutex>::Lock sync(_monitor);
+            _done = true;
+            _monitor.notify();
+            callbacks.swap(_callbacks);
+        }
+
+        if(!callbacks.empty())
+        {
+            AdoptThread adoptThread; // Ensure the current thread is able to call into Python.
+            for(std::vector<PyObject*>::const_iterator p = callbacks.begin(); p != callbacks.end(); ++p)
+            {
+                PyObjectHandle callback = *p; // Adopts the reference.
+                PyObjectHandle tmp = PyObject_CallObject(callback.get(), 0);
+                if(!tmp.get())
+                {
+                    PyErr_Clear(); // The callbacks are provided by the Ice module and don't raise exceptions.
+                }
+            }
+        }
+    }
+
+    //
+    // Registers a Python callable that is called without arguments once the invocation completes. Must be
+    // called with the GIL and the monitor locked, before the invocation completes.
+    //
+    void addCallback(PyObject* callback)
+    {
+        Py_INCREF(callback);
+        _callbacks.push_back(callback);
     }
 
     Ice::Exception* getException() const
@@ -113,6 +166,7 @@ private:
     IceUtil::Monitor<IceUtil::Mutex>& _monitor;
     bool& _done;
     Ice::Exception* _ex;
+    std::vector<PyObject*> _callbacks;
 };
 
 }
@@ -3,7 +3,9 @@
 //
 
 #include <Types.h>
+#include <structmember.h>
 #include <Current.h>
+#include <Enum.h>
 #include <Proxy.h>
 #include <Thread.h>
 #include <Util.h>
@@ -13,9 +15,11 @@
 #include <Ice/LocalException.h>
 #include <Ice/OutputStream.h>
 #include <Ice/SlicedData.h>
+#include <Ice/UniquePtr.h>
 
 #include <IceUtil/DisableWarnings.h>
 
+#include <algorithm>
 #include <list>
 #include <limits>
 
@@ -24,20 +28,125 @@ using namespace IcePy;
 using namespace IceUtil;
 using namespace IceUtilInternal;
 
-typedef map<string, ClassInfoPtr> ClassInfoMap;
-static ClassInfoMap _classInfoMap;
+namespace
+{
 
-typedef map<string, ValueInfoPtr> ValueInfoMap;
-static ValueInfoMap _valueInfoMap;
+//
+// A hash table of the type information registered by the generated code, keyed by type ID. The
+// tables are filled when the Slice definitions are loaded and then consulted each time a class
+// instance, an exception or a proxy is unmarshaled. Like the rest of the type information, they
+// are only accessed with the GIL held and don't need their own lock.
+//
+template<typename T>
+class TypeInfoTable
+{
+public:
 
-typedef map<Ice::Int, ValueInfoPtr> CompactIdMap;
-static CompactIdMap _compactIdMap;
+    TypeInfoTable() :
+        _buckets(64), _size(0)
+    {
+    }
+
+    T find(const string& id) const
+    {
+        size_t h = hash(id);
+        const Bucket& bucket = _buckets[h & (_buckets.size() - 1)];
+        for(typename Bucket::const_iterator p = bucket.begin(); p != bucket.end(); ++p)
+        {
+            if(p->hash == h && p->id == id)
+            {
+                return p->info;
+            }
+        }
+        return 0;
+    }
+
+    //
+    // Adds the type information for the given ID, replacing any existing entry if replace is true.
+    //
+    void add(const string& id, const T& info, bool replace = true)
+    {
+        size_t h = hash(id);
+        Bucket& bucket = _buckets[h & (_buckets.size() - 1)];
+        for(typename Bucket::iterator p = bucket.begin(); p != bucket.end(); ++p)
+        {
+            if(p->hash == h && p->id == id)
+            {
+                if(replace)
+                {
+                    p->info = info;
+                }
+                return;
+            }
+        }
+
+        Entry entry;
+        entry.hash = h;
+        entry.id = id;
+        entry.info = info;
+        bucket.push_back(entry);
+
+        if(++_size > _buckets.size())
+        {
+            rehash();
+        }
+    }
+
+private:
+
+    struct Entry
+    {
+        size_t hash;
+        string id;
+        T info;
+    };
+    typedef vector<Entry> Bucket;
+
+    static size_t hash(const string& id)
+    {
+        //
+        // FNV-1a
+        //
+        size_t h = 2166136261U;
+        for(string::const_iterator p = id.begin(); p != id.end(); ++p)
+        {
+            h = (h ^ static_cast<unsigned char>(*p)) * 16777619U;
+        }
+        return h;
+    }
+
+    void rehash()
+    {
+        vector<Bucket> buckets(_buckets.size() * 2);
+        for(typename vector<Bucket>::iterator p = _buckets.begin(); p != _buckets.end(); ++p)
+        {
+            for(typename Bucket::iterator q = p->begin(); q != p->end(); ++q)
+            {
+                buckets[q->hash & (buckets.size() - 1)].push_back(*q);
+            }
+        }
+        _buckets.swap(buckets);
+    }
+
+    vector<Bucket> _buckets; // The number of buckets is always a power of two.
+    size_t _size;
+};
 
-typedef map<string, ProxyInfoPtr> ProxyInfoMap;
-static ProxyInfoMap _proxyInfoMap;
+//
+// Compact IDs are usually small integers, they index a vector and only larger IDs use a map.
+//
+const Ice::Int maxCompactIdTableSize = 16384;
+
+}
 
-typedef map<string, ExceptionInfoPtr> ExceptionInfoMap;
-static ExceptionInfoMap _exceptionInfoMap;
+static TypeInfoTable<ClassInfoPtr> _classInfoTable;
+static TypeInfoTable<ValueInfoPtr> _valueInfoTable;
+static TypeInfoTable<ProxyInfoPtr> _proxyInfoTable;
+static TypeInfoTable<ExceptionInfoPtr> _exceptionInfoTable;
+
+static vector<ValueInfoPtr> _compactIdTable;
+typedef map<Ice::Int, ValueInfoPtr> CompactIdMap;
+static CompactIdMap _compactIdMap;
 
 namespace
 {
@@ -73,8 +182,26 @@ struct BufferObject
     IcePy::BufferPtr* buffer;
 };
 
+//
+// A sequence mapped with python:seq:lazy. The encoded elements are retained in data, either a
+// view of the request or reply buffer or a copy of the encoded sequence, and each element is
+// unmarshaled when it is accessed.
+//
+struct LazySequenceObject
+{
+    PyObject_HEAD
+    IcePy::TypeInfoPtr* elementType;
+    Ice::EncodingVersion* encoding;
+    PyObject* data;
+    const Ice::Byte* begin;
+    std::vector<Ice::Int>* offsets; // Element offsets for variable-length elements, nil otherwise.
+    Py_ssize_t stride;
+    Py_ssize_t size;
+};
+
 extern PyTypeObject TypeInfoType;
 extern PyTypeObject ExceptionInfoType;
+extern PyTypeObject LazySequenceType;
 
 #if PY_VERSION_HEX >= 0x03000000
 bool
@@ -84,10 +211,27 @@ writeString(PyObject* p, Ice::OutputStream* os)
     {
         os->write(string(), false); // Bypass string conversion.
     }
+#   if PY_VERSION_HEX >= 0x03030000
+    else if(checkString(p))
+    {
+        //
+        // The UTF-8 representation is cached in the string object, and for ASCII strings it's
+        // the string data itself, so marshaling the same string again doesn't encode it.
+        //
+        Py_ssize_t sz;
+        const char* s = PyUnicode_AsUTF8AndSize(p, &sz);
+        if(!s)
+        {
+            return false;
+        }
+        os->write(s, static_cast<size_t>(sz), false); // Bypass string conversion.
+    }
+#   else
     else if(checkString(p))
     {
         os->write(getString(p), false); // Bypass string conversion.
     }
+#   endif
     else
     {
         assert(false);
@@ -131,6 +275,110 @@ writeString(PyObject* p, Ice::OutputStream* os)
 }
 #endif
 
+//
+// Convert primitive values to new references to Python objects.
+//
+inline PyObject*
+primitiveToPython(bool v)
+{
+    return v ? incTrue() : incFalse();
+}
+
+inline PyObject*
+primitiveToPython(Ice::Byte v)
+{
+    return PyLong_FromLong(v);
+}
+
+inline PyObject*
+primitiveToPython(Ice::Short v)
+{
+    return PyLong_FromLong(v);
+}
+
+inline PyObject*
+primitiveToPython(Ice::Int v)
+{
+    return PyLong_FromLong(v);
+}
+
+inline PyObject*
+primitiveToPython(Ice::Long v)
+{
+    return PyLong_FromLongLong(v);
+}
+
+inline PyObject*
+primitiveToPython(Ice::Float v)
+{
+    return PyFloat_FromDouble(v);
+}
+
+inline PyObject*
+primitiveToPython(Ice::Double v)
+{
+    return PyFloat_FromDouble(v);
+}
+
+//
+// Fill a list or tuple created by SequenceMapping::createContainer with the given values. The
+// new references are stored directly in the container, which owns them even if an error occurs.
+//
+template<typename T> void
+fillPrimitiveContainer(PyObject* cont, const T* values, int sz)
+{
+    const bool isList = PyList_Check(cont) != 0;
+    for(int i = 0; i < sz; ++i)
+    {
+        PyObject* item = primitiveToPython(values[i]);
+        if(!item)
+        {
+            assert(PyErr_Occurred());
+            throw AbortMarshaling();
+        }
+        if(isList)
+        {
+            PyList_SET_ITEM(cont, i, item);
+        }
+        else
+        {
+            PyTuple_SET_ITEM(cont, i, item);
+        }
+    }
+}
+
+//
+// Read a string from the stream and return a new reference to the string object. Short
+// strings are shared through the communicator's string table.
+//
+PyObject*
+readString(Ice::InputStream* is)
+{
+#if PY_VERSION_HEX >= 0x03000000
+    const char* data;
+    size_t sz;
+#   ifdef ICE_CPP11_MAPPING
+    is->read(data, sz, false); // Bypass string conversion.
+#   else
+    is->read(data, sz); // Bypass string conversion.
+#   endif
+#else
+    string val;
+    is->read(val, true);
+    const char* data = val.data();
+    size_t sz = val.size();
+#endif
+
+    StreamUtil* util = reinterpret_cast<StreamUtil*>(is->getClosure());
+    PyObject* str = util ? util->internString(data, sz) : createString(data, sz);
+    if(!str)
+    {
+        assert(PyErr_Occurred());
+        throw AbortMarshaling();
+    }
+    return str;
+}
+
 }
 
 #ifdef WIN32
@@ -287,6 +535,95 @@ bufferGetBuffer(BufferObject* self, Py_buffer* view, int flags)
     return 0;
 }
 
+#ifdef WIN32
+extern "C"
+#endif
+static LazySequenceObject*
+lazySequenceNew(PyTypeObject* type, PyObject* /*args*/, PyObject* /*kwds*/)
+{
+    LazySequenceObject* self = reinterpret_cast<LazySequenceObject*>(type->tp_alloc(type, 0));
+    if(!self)
+    {
+        return 0;
+    }
+    self->elementType = 0;
+    self->encoding = 0;
+    self->data = 0;
+    self->begin = 0;
+    self->offsets = 0;
+    self->stride = 0;
+    self->size = 0;
+    return self;
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static void
+lazySequenceDealloc(LazySequenceObject* self)
+{
+    delete self->elementType;
+    delete self->encoding;
+    delete self->offsets;
+    Py_XDECREF(self->data);
+    Py_TYPE(self)->tp_free(reinterpret_cast<PyObject*>(self));
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static Py_ssize_t
+lazySequenceLength(LazySequenceObject* self)
+{
+    return self->size;
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+lazySequenceItem(LazySequenceObject* self, Py_ssize_t i)
+{
+    if(i < 0 || i >= self->size)
+    {
+        PyErr_Format(PyExc_IndexError, STRCAST("sequence index out of range"));
+        return 0;
+    }
+
+    pair<const Ice::Byte*, const Ice::Byte*> bytes;
+    if(self->offsets)
+    {
+        bytes.first = self->begin + (*self->offsets)[i];
+        bytes.second = self->begin + (*self->offsets)[i + 1];
+    }
+    else
+    {
+        bytes.first = self->begin + i * self->stride;
+        bytes.second = bytes.first + self->stride;
+    }
+
+    try
+    {
+        Ice::InputStream is(*self->encoding, bytes);
+        StreamUtil util;
+        is.setClosure(&util);
+
+        DictionaryInfo::KeyCallbackPtr cb = new DictionaryInfo::KeyCallback;
+        (*self->elementType)->unmarshal(&is, cb, 0, 0, false);
+        return cb->key.release();
+    }
+    catch(const AbortMarshaling&)
+    {
+        assert(PyErr_Occurred());
+        return 0;
+    }
+    catch(const Ice::Exception& ex)
+    {
+        setPythonException(ex);
+        return 0;
+    }
+}
+
 //
 // addClassInfo()
 //
@@ -298,13 +635,8 @@ addClassInfo(const string& id, const ClassInfoPtr& info)
     // translated definitions and then dynamically load
     // duplicate definitions.
     //
-//    assert(_classInfoMap.find(id) == _classInfoMap.end());
-    ClassInfoMap::iterator p = _classInfoMap.find(id);
-    if(p != _classInfoMap.end())
-    {
-        _classInfoMap.erase(p);
-    }
-    _classInfoMap.insert(ClassInfoMap::value_type(id, info));
+//    assert(!_classInfoTable.find(id));
+    _classInfoTable.add(id, info);
 }
 
 //
@@ -318,13 +650,8 @@ addValueInfo(const string& id, const ValueInfoPtr& info)
     // translated definitions and then dynamically load
     // duplicate definitions.
     //
-//    assert(_valueInfoMap.find(id) == _valueInfoMap.end());
-    ValueInfoMap::iterator p = _valueInfoMap.find(id);
-    if(p != _valueInfoMap.end())
-    {
-        _valueInfoMap.erase(p);
-    }
-    _valueInfoMap.insert(ValueInfoMap::value_type(id, info));
+//    assert(!_valueInfoTable.find(id));
+    _valueInfoTable.add(id, info);
 }
 
 //
@@ -338,13 +665,8 @@ addProxyInfo(const string& id, const ProxyInfoPtr& info)
     // translated definitions and then dynamically load
     // duplicate definitions.
     //
-//    assert(_proxyInfoMap.find(id) == _proxyInfoMap.end());
-    ProxyInfoMap::iterator p = _proxyInfoMap.find(id);
-    if(p != _proxyInfoMap.end())
-    {
-        _proxyInfoMap.erase(p);
-    }
-    _proxyInfoMap.insert(ProxyInfoMap::value_type(id, info));
+//    assert(!_proxyInfoTable.find(id));
+    _proxyInfoTable.add(id, info);
 }
 
 //
@@ -353,12 +675,7 @@ addProxyInfo(const string& id, const ProxyInfoPtr& info)
 static IcePy::ProxyInfoPtr
 lookupProxyInfo(const string& id)
 {
-    ProxyInfoMap::iterator p = _proxyInfoMap.find(id);
-    if(p != _proxyInfoMap.end())
-    {
-        return p->second;
-    }
-    return 0;
+    return _proxyInfoTable.find(id);
 }
 
 //
@@ -372,8 +689,76 @@ addExceptionInfo(const string& id, const ExceptionInfoPtr& info)
     // translated definitions and then dynamically load
     // duplicate definitions.
     //
-//    assert(_exceptionInfoMap.find(id) == _exceptionInfoMap.end());
-    _exceptionInfoMap.insert(ExceptionInfoMap::value_type(id, info));
+//    assert(!_exceptionInfoTable.find(id));
+    _exceptionInfoTable.add(id, info, false);
+}
+
+//
+// StringTable implementation
+//
+namespace
+{
+
+//
+// Only strings up to this size are shared, longer strings are less likely to be repeated
+// and comparing them costs more.
+//
+const size_t maxInternedStringSize = 32;
+
+//
+// The table is cleared once it holds this number of strings, the strings unmarshaled
+// afterwards populate it again.
+//
+const size_t maxInternedStrings = 4096;
+
+}
+
+IcePy::StringTable::StringTable()
+{
+}
+
+IcePy::StringTable::~StringTable()
+{
+    clear();
+}
+
+PyObject*
+IcePy::StringTable::get(const char* data, size_t size)
+{
+    if(size > maxInternedStringSize)
+    {
+        return createString(data, size);
+    }
+
+    const string key(data ? data : "", size);
+    StringMap::const_iterator p = _strings.find(key);
+    if(p != _strings.end())
+    {
+        return incRef(p->second);
+    }
+
+    PyObject* str = createString(data, size);
+    if(!str)
+    {
+        return 0;
+    }
+
+    if(_strings.size() >= maxInternedStrings)
+    {
+        clear();
+    }
+    _strings.insert(StringMap::value_type(key, incRef(str)));
+    return str;
+}
+
+void
+IcePy::StringTable::clear()
+{
+    for(StringMap::iterator p = _strings.begin(); p != _strings.end(); ++p)
+    {
+        Py_DECREF(p->second);
+    }
+    _strings.clear();
 }
 
 //
@@ -386,6 +771,55 @@ IcePy::StreamUtil::StreamUtil()
 {
 }
 
+void
+IcePy::StreamUtil::setBuffer(const BufferPtr& buffer)
+{
+    _buffer = buffer;
+    _bufferObject = 0;
+}
+
+PyObject*
+IcePy::StreamUtil::createView(const char* data, Py_ssize_t size)
+{
+    if(!_buffer || data < _buffer->data() || data + size > _buffer->data() + _buffer->size())
+    {
+        return 0;
+    }
+
+    if(!_bufferObject.get())
+    {
+        _bufferObject = createBuffer(_buffer);
+        if(!_bufferObject.get())
+        {
+            return 0;
+        }
+    }
+
+    //
+    // The slice of the memoryview keeps a reference to the buffer object, which keeps
+    // the buffer alive for as long as the view is in use.
+    //
+    PyObjectHandle view = PyMemoryView_FromObject(_bufferObject.get());
+    if(!view.get())
+    {
+        return 0;
+    }
+    Py_ssize_t start = static_cast<Py_ssize_t>(data - _buffer->data());
+    return PySequence_GetSlice(view.get(), start, start + size);
+}
+
+void
+IcePy::StreamUtil::setStringTable(const StringTablePtr& stringTable)
+{
+    _stringTable = stringTable;
+}
+
+PyObject*
+IcePy::StreamUtil::internString(const char* data, size_t size)
+{
+    return _stringTable ? _stringTable->get(data, size) : createString(data, size);
+}
+
 IcePy::StreamUtil::~StreamUtil()
 {
     //
@@ -655,17 +1089,11 @@ IcePy::StreamUtil::getSlicedDataMember(PyObject* obj, ObjectMap* objectMap)
                 {
                     PyObject* o = PyTuple_GET_ITEM(instances.get(), j);
 
-                    Ice::ObjectPtr writer;
-
-                    ObjectMap::iterator k = objectMap->find(o);
-                    if(k == objectMap->end())
+                    Ice::ObjectPtr writer = objectMap->find(o);
+                    if(!writer)
                     {
                         writer = new ObjectWriter(o, objectMap, 0);
-                        objectMap->insert(ObjectMap::value_type(o, writer));
-                    }
-                    else
-                    {
-                        writer = k->second;
+                        objectMap->insert(o, writer);
                     }
 
                     info->instances.push_back(writer);
@@ -715,6 +1143,24 @@ IcePy::TypeInfo::unmarshaled(PyObject*, PyObject*, void*)
     assert(false);
 }
 
+bool
+IcePy::TypeInfo::skip(Ice::InputStream*)
+{
+    return false;
+}
+
+bool
+IcePy::TypeInfo::marshalChecked(PyObject* p, Ice::OutputStream* os, ObjectMap* objectMap, bool optional,
+                                const Ice::StringSeq* metaData)
+{
+    if(!validate(p))
+    {
+        return false;
+    }
+    marshal(p, os, objectMap, optional, metaData);
+    return true;
+}
+
 void
 IcePy::TypeInfo::destroy()
 {
@@ -1029,6 +1475,18 @@ IcePy::PrimitiveInfo::marshal(PyObject* p, Ice::OutputStream* os, ObjectMap*, bo
 void
 IcePy::PrimitiveInfo::unmarshal(Ice::InputStream* is, const UnmarshalCallbackPtr& cb, PyObject* target,
                                 void* closure, bool, const Ice::StringSeq*)
+{
+    PyObjectHandle p = read(is);
+    if(!p.get())
+    {
+        assert(PyErr_Occurred());
+        throw AbortMarshaling();
+    }
+    cb->unmarshaled(p.get(), target, closure);
+}
+
+PyObject*
+IcePy::PrimitiveInfo::read(Ice::InputStream* is) const
 {
     switch(kind)
     {
@@ -1036,77 +1494,185 @@ IcePy::PrimitiveInfo::unmarshal(Ice::InputStream* is, const UnmarshalCallbackPtr
     {
         bool b;
         is->read(b);
-        if(b)
-        {
-            cb->unmarshaled(getTrue(), target, closure);
-        }
-        else
-        {
-            cb->unmarshaled(getFalse(), target, closure);
-        }
-        break;
+        return b ? incTrue() : incFalse();
     }
     case PrimitiveInfo::KindByte:
     {
         Ice::Byte val;
         is->read(val);
-        PyObjectHandle p = PyLong_FromLong(val);
-        cb->unmarshaled(p.get(), target, closure);
-        break;
+        return PyLong_FromLong(val);
     }
     case PrimitiveInfo::KindShort:
     {
         Ice::Short val;
         is->read(val);
-        PyObjectHandle p = PyLong_FromLong(val);
-        cb->unmarshaled(p.get(), target, closure);
-        break;
+        return PyLong_FromLong(val);
     }
     case PrimitiveInfo::KindInt:
     {
         Ice::Int val;
         is->read(val);
-        PyObjectHandle p = PyLong_FromLong(val);
-        cb->unmarshaled(p.get(), target, closure);
-        break;
+        return PyLong_FromLong(val);
     }
     case PrimitiveInfo::KindLong:
     {
         Ice::Long val;
         is->read(val);
-        PyObjectHandle p = PyLong_FromLongLong(val);
-        cb->unmarshaled(p.get(), target, closure);
-        break;
+        return PyLong_FromLongLong(val);
     }
     case PrimitiveInfo::KindFloat:
     {
         Ice::Float val;
         is->read(val);
-        PyObjectHandle p = PyFloat_FromDouble(val);
-        cb->unmarshaled(p.get(), target, closure);
-        break;
+        return PyFloat_FromDouble(val);
     }
     case PrimitiveInfo::KindDouble:
     {
         Ice::Double val;
         is->read(val);
-        PyObjectHandle p = PyFloat_FromDouble(val);
-        cb->unmarshaled(p.get(), target, closure);
-        break;
+        return PyFloat_FromDouble(val);
     }
     case PrimitiveInfo::KindString:
     {
-        string val;
-#if PY_VERSION_HEX >= 0x03000000
-        is->read(val, false); // Bypass string conversion.
+        return readString(is);
+    }
+    }
+
+    assert(false);
+    return 0;
+}
+
+bool
+IcePy::PrimitiveInfo::marshalChecked(PyObject* p, Ice::OutputStream* os, ObjectMap* objectMap, bool optional,
+                                     const Ice::StringSeq* metaData)
+{
+    //
+    // Same checks as validate(), but the value is only converted once.
+    //
+    switch(kind)
+    {
+    case PrimitiveInfo::KindBool:
+    {
+        int isTrue = PyObject_IsTrue(p);
+        if(isTrue < 0)
+        {
+            return false;
+        }
+        os->write(isTrue ? true : false);
+        break;
+    }
+    case PrimitiveInfo::KindByte:
+    {
+        long val = PyLong_AsLong(p);
+        if((val == -1 && PyErr_Occurred()) || val < 0 || val > 255)
+        {
+            return false;
+        }
+        os->write(static_cast<Ice::Byte>(val));
+        break;
+    }
+    case PrimitiveInfo::KindShort:
+    {
+        long val = PyLong_AsLong(p);
+        if((val == -1 && PyErr_Occurred()) || val < SHRT_MIN || val > SHRT_MAX)
+        {
+            return false;
+        }
+        os->write(static_cast<Ice::Short>(val));
+        break;
+    }
+    case PrimitiveInfo::KindInt:
+    {
+        long val = PyLong_AsLong(p);
+        if((val == -1 && PyErr_Occurred()) || val < INT_MIN || val > INT_MAX)
+        {
+            return false;
+        }
+        os->write(static_cast<Ice::Int>(val));
+        break;
+    }
+    case PrimitiveInfo::KindLong:
+    {
+        Ice::Long val = PyLong_AsLongLong(p);
+        if(val == -1 && PyErr_Occurred())
+        {
+            return false;
+        }
+        os->write(val);
+        break;
+    }
+    case PrimitiveInfo::KindFloat:
+    case PrimitiveInfo::KindDouble:
+    {
+        double val;
+        if(PyFloat_Check(p))
+        {
+            val = PyFloat_AS_DOUBLE(p);
+            // Ensure double does not exceed maximum float value before casting
+            if(kind == PrimitiveInfo::KindFloat &&
+               (val > numeric_limits<float>::max() || val < -numeric_limits<float>::max()) &&
+#if defined(_MSC_VER) && (_MSC_VER <= 1700)
+               _finite(val))
 #else
-        is->read(val, true);
+               isfinite(val))
 #endif
-        PyObjectHandle p = createString(val);
-        cb->unmarshaled(p.get(), target, closure);
+            {
+                return false;
+            }
+        }
+#if PY_VERSION_HEX < 0x03000000
+        else if(PyLong_Check(p) || PyInt_Check(p))
+#else
+        else if(PyLong_Check(p))
+#endif
+        {
+            val = PyFloat_AsDouble(p);
+            if(val == -1.0 && PyErr_Occurred())
+            {
+                return false;
+            }
+        }
+        else
+        {
+            return false;
+        }
+
+        if(kind == PrimitiveInfo::KindFloat)
+        {
+            os->write(static_cast<float>(val));
+        }
+        else
+        {
+            os->write(val);
+        }
+        break;
+    }
+    case PrimitiveInfo::KindString:
+    {
+        if(!validate(p))
+        {
+            return false;
+        }
+        marshal(p, os, objectMap, optional, metaData);
         break;
     }
     }
+
+    return true;
+}
+
+bool
+IcePy::PrimitiveInfo::skip(Ice::InputStream* is)
+{
+    if(kind == KindString)
+    {
+        is->skip(static_cast<Ice::InputStream::Container::size_type>(is->readSize()));
+    }
+    else
+    {
+        is->skip(static_cast<Ice::InputStream::Container::size_type>(wireSize()));
+    }
+    return true;
 }
 
 void
@@ -1157,6 +1723,19 @@ IcePy::EnumInfo::EnumInfo(const string& ident, PyObject* t, PyObject* e) :
             const_cast<Ice::Int&>(maxValue) = val;
         }
     }
+
+    //
+    // Enumerator values are usually assigned sequentially, in which case the enumerator
+    // for an unmarshaled value is found with a vector index instead of a map lookup.
+    //
+    if(maxValue < 256 || static_cast<size_t>(maxValue) < 4 * enumerators.size())
+    {
+        _enumeratorTable.resize(static_cast<size_t>(maxValue) + 1, 0);
+        for(EnumeratorMap::const_iterator p = enumerators.begin(); p != enumerators.end(); ++p)
+        {
+            _enumeratorTable[static_cast<size_t>(p->first)] = p->second.get();
+        }
+    }
 }
 
 string
@@ -1223,6 +1802,29 @@ IcePy::EnumInfo::unmarshal(Ice::InputStream* is, const UnmarshalCallbackPtr& cb,
     cb->unmarshaled(p.get(), target, closure);
 }
 
+bool
+IcePy::EnumInfo::marshalChecked(PyObject* p, Ice::OutputStream* os, ObjectMap* objectMap, bool optional,
+                                const Ice::StringSeq* metaData)
+{
+    //
+    // Enumerators are almost always instances of the generated class itself, there's no need
+    // for the more expensive isinstance() check in this case.
+    //
+    if(Py_TYPE(p) != reinterpret_cast<PyTypeObject*>(pythonType) && !validate(p))
+    {
+        return false;
+    }
+    marshal(p, os, objectMap, optional, metaData);
+    return true;
+}
+
+bool
+IcePy::EnumInfo::skip(Ice::InputStream* is)
+{
+    is->readEnum(maxValue);
+    return true;
+}
+
 void
 IcePy::EnumInfo::print(PyObject* value, IceUtilInternal::Output& out, PrintObjectHistory*)
 {
@@ -1243,6 +1845,7 @@ IcePy::EnumInfo::print(PyObject* value, IceUtilInternal::Output& out, PrintObjec
 void
 IcePy::EnumInfo::destroy()
 {
+    _enumeratorTable.clear();
     const_cast<EnumeratorMap&>(enumerators).clear();
 }
 
@@ -1251,23 +1854,44 @@ IcePy::EnumInfo::valueForEnumerator(PyObject* p) const
 {
     assert(PyObject_IsInstance(p, pythonType) == 1);
 
-    PyObjectHandle v = PyObject_GetAttrString(p, STRCAST("_value"));
-    if(!v.get())
+    Ice::Int val;
+    if(PyObject_TypeCheck(p, &EnumBaseType))
     {
-        assert(PyErr_Occurred());
-        return -1;
+        //
+        // The generated enumerations derive from IcePy.EnumBase, read the value directly.
+        //
+        val = static_cast<Ice::Int>(reinterpret_cast<EnumObject*>(p)->value);
     }
+    else
+    {
+        PyObjectHandle v = PyObject_GetAttrString(p, STRCAST("_value"));
+        if(!v.get())
+        {
+            assert(PyErr_Occurred());
+            return -1;
+        }
 #if PY_VERSION_HEX >= 0x03000000
-    if(!PyLong_Check(v.get()))
+        if(!PyLong_Check(v.get()))
 #else
-    if(!PyInt_Check(v.get()))
+        if(!PyInt_Check(v.get()))
 #endif
+        {
+            PyErr_Format(PyExc_ValueError, STRCAST("value for enum %s is not an int"), id.c_str());
+            return -1;
+        }
+        val = static_cast<Ice::Int>(PyLong_AsLong(v.get()));
+    }
+
+    bool found;
+    if(!_enumeratorTable.empty())
     {
-        PyErr_Format(PyExc_ValueError, STRCAST("value for enum %s is not an int"), id.c_str());
-        return -1;
+        found = val >= 0 && static_cast<size_t>(val) < _enumeratorTable.size() && _enumeratorTable[val];
     }
-    const Ice::Int val = static_cast<Ice::Int>(PyLong_AsLong(v.get()));
-    if(enumerators.find(val) == enumerators.end())
+    else
+    {
+        found = enumerators.find(val) != enumerators.end();
+    }
+    if(!found)
     {
         PyErr_Format(PyExc_ValueError, STRCAST("illegal value %d for enum %s"), val, id.c_str());
         return -1;
@@ -1279,12 +1903,24 @@ IcePy::EnumInfo::valueForEnumerator(PyObject* p) const
 PyObject*
 IcePy::EnumInfo::enumeratorForValue(Ice::Int v) const
 {
-    EnumeratorMap::const_iterator p = enumerators.find(v);
-    if(p == enumerators.end())
+    PyObject* r;
+    if(!_enumeratorTable.empty())
     {
-        return 0;
+        if(v < 0 || static_cast<size_t>(v) >= _enumeratorTable.size() || !_enumeratorTable[v])
+        {
+            return 0;
+        }
+        r = _enumeratorTable[v];
+    }
+    else
+    {
+        EnumeratorMap::const_iterator p = enumerators.find(v);
+        if(p == enumerators.end())
+        {
+            return 0;
+        }
+        r = p->second.get();
     }
-    PyObject* r = p->second.get();
     Py_INCREF(r);
     return r;
 }
@@ -1292,16 +1928,104 @@ IcePy::EnumInfo::enumeratorForValue(Ice::Int v) const
 //
 // DataMember implementation.
 //
+IcePy::DataMember::DataMember() :
+    optional(false), tag(0), _slotVersionTag(0), _slotOffset(-1)
+{
+}
+
 void
 IcePy::DataMember::unmarshaled(PyObject* val, PyObject* target, void*)
 {
-    if(PyObject_SetAttrString(target, const_cast<char*>(name.c_str()), val) < 0)
+    if(!setMember(target, val))
     {
         assert(PyErr_Occurred());
         throw AbortMarshaling();
     }
 }
 
+PyObject*
+IcePy::DataMember::getMember(PyObject* obj)
+{
+    PyObject** addr = slotAddress(obj);
+    if(addr)
+    {
+        PyObject* v = *addr;
+        Py_XINCREF(v); // An empty slot is reported as a missing attribute.
+        return v;
+    }
+
+    PyObject* v = PyObject_GetAttr(obj, nameObj.get());
+    if(!v)
+    {
+        PyErr_Clear();
+    }
+    return v;
+}
+
+bool
+IcePy::DataMember::setMember(PyObject* obj, PyObject* val)
+{
+    PyObject** addr = slotAddress(obj);
+    if(addr)
+    {
+        PyObject* old = *addr;
+        Py_INCREF(val);
+        *addr = val;
+        Py_XDECREF(old);
+        return true;
+    }
+
+    return PyObject_SetAttr(obj, nameObj.get(), val) == 0;
+}
+
+PyObject**
+IcePy::DataMember::slotAddress(PyObject* obj)
+{
+    //
+    // Python assigns a distinct version tag to each type, and a new one when the type or
+    // one of its base types is modified. The tag identifies the type of the cached offset
+    // without keeping that type alive, and a stale offset is never used.
+    //
+    PyTypeObject* type = Py_TYPE(obj);
+    if(!PyType_HasFeature(type, Py_TPFLAGS_VALID_VERSION_TAG) || type->tp_version_tag != _slotVersionTag)
+    {
+        //
+        // Classes that declare __slots__ store each slot at a fixed offset in the
+        // instance, described by a member descriptor in the type. We cache the offset
+        // for the most recently seen type and access the slot directly, unless the type
+        // customizes attribute access.
+        //
+        _slotVersionTag = 0;
+        _slotOffset = -1;
+        if(type->tp_getattro == PyObject_GenericGetAttr && type->tp_setattro == PyObject_GenericSetAttr)
+        {
+            PyObject* descr = _PyType_Lookup(type, nameObj.get()); // Borrowed reference.
+            if(descr && Py_TYPE(descr) == &PyMemberDescr_Type)
+            {
+                PyMemberDef* def = reinterpret_cast<PyMemberDescrObject*>(descr)->d_member;
+                if(def->type == T_OBJECT_EX && !(def->flags & READONLY))
+                {
+                    _slotOffset = def->offset;
+                }
+            }
+        }
+
+        //
+        // The lookup assigns a version tag to the type if it doesn't have one yet.
+        //
+        if(PyType_HasFeature(type, Py_TPFLAGS_VALID_VERSION_TAG))
+        {
+            _slotVersionTag = type->tp_version_tag;
+        }
+    }
+
+    if(_slotOffset < 0)
+    {
+        return 0;
+    }
+    return reinterpret_cast<PyObject**>(reinterpret_cast<char*>(obj) + _slotOffset);
+}
+
 static void
 convertDataMembers(PyObject* members, DataMemberList& reqMembers, DataMemberList& optMembers, bool allowOptional)
 {
@@ -1335,6 +2059,11 @@ convertDataMembers(PyObject* members, DataMemberList& reqMembers, DataMemberList
 
         DataMemberPtr member = new DataMember;
         member->name = getString(name);
+#if PY_VERSION_HEX >= 0x03000000
+        member->nameObj = PyUnicode_InternFromString(member->name.c_str());
+#else
+        member->nameObj = PyString_InternFromString(member->name.c_str());
+#endif
 #ifndef NDEBUG
         bool b =
 #endif
@@ -1482,20 +2211,19 @@ IcePy::StructInfo::marshal(PyObject* p, Ice::OutputStream* os, ObjectMap* object
     {
         DataMemberPtr member = *q;
         char* memberName = const_cast<char*>(member->name.c_str());
-        PyObjectHandle attr = getAttr(p, member->name, true);
+        PyObjectHandle attr = member->getMember(p);
         if(!attr.get())
         {
             PyErr_Format(PyExc_AttributeError, STRCAST("no member `%s' found in %s value"), memberName,
                          const_cast<char*>(id.c_str()));
             throw AbortMarshaling();
         }
-        if(!member->type->validate(attr.get()))
+        if(!member->type->marshalChecked(attr.get(), os, objectMap, false, &member->metaData))
         {
             PyErr_Format(PyExc_ValueError, STRCAST("invalid value for %s member `%s'"), const_cast<char*>(id.c_str()),
                          memberName);
             throw AbortMarshaling();
         }
-        member->type->marshal(attr.get(), os, objectMap, false, &member->metaData);
     }
 
     if(optional && _variableLength)
@@ -1536,6 +2264,25 @@ IcePy::StructInfo::unmarshal(Ice::InputStream* is, const UnmarshalCallbackPtr& c
     cb->unmarshaled(p.get(), target, closure);
 }
 
+bool
+IcePy::StructInfo::skip(Ice::InputStream* is)
+{
+    if(!_variableLength)
+    {
+        is->skip(static_cast<Ice::InputStream::Container::size_type>(_wireSize));
+        return true;
+    }
+
+    for(DataMemberList::const_iterator q = members.begin(); q != members.end(); ++q)
+    {
+        if(!(*q)->type->skip(is))
+        {
+            return false;
+        }
+    }
+    return true;
+}
+
 void
 IcePy::StructInfo::print(PyObject* value, IceUtilInternal::Output& out, PrintObjectHistory* history)
 {
@@ -1580,14 +2327,36 @@ IcePy::StructInfo::destroy()
 PyObject*
 IcePy::StructInfo::instantiate(PyObject* pythonType)
 {
-    PyObjectHandle args = PyTuple_New(0);
     PyTypeObject* type = reinterpret_cast<PyTypeObject*>(pythonType);
+
+    //
+    // Instances of a class generated with __slots__ have no dictionary. When such a
+    // class relies on object's allocator we can allocate the instance directly; the
+    // members are assigned by the caller.
+    //
+    if(type->tp_dictoffset == 0 && type->tp_new == PyBaseObject_Type.tp_new)
+    {
+        return type->tp_alloc(type, 0);
+    }
+
+    PyObjectHandle args = PyTuple_New(0);
     return type->tp_new(type, args.get(), 0);
 }
 
 //
 // SequenceInfo implementation.
 //
+//
+// Returns true if the given object is a sized iterable that isn't a sequence, such as a set or
+// an Ice.SizedIterator. These objects are marshaled as Slice sequences by iterating over them.
+//
+static bool
+isSizedIterable(PyObject* p)
+{
+    return PySequence_Check(p) != 1 && !PyDict_Check(p) && PyObject_HasAttrString(p, STRCAST("__iter__")) &&
+        PyObject_HasAttrString(p, STRCAST("__len__"));
+}
+
 IcePy::SequenceInfo::SequenceInfo(const string& ident, PyObject* m, PyObject* t) :
     id(ident)
 {
@@ -1614,7 +2383,7 @@ IcePy::SequenceInfo::getId() const
 bool
 IcePy::SequenceInfo::validate(PyObject* val)
 {
-    return val == Py_None || PySequence_Check(val) == 1;
+    return val == Py_None || PySequence_Check(val) == 1 || isSizedIterable(val);
 }
 
 bool
@@ -1643,10 +2412,16 @@ IcePy::SequenceInfo::usesClasses() const
 
 void
 IcePy::SequenceInfo::marshal(PyObject* p, Ice::OutputStream* os, ObjectMap* objectMap, bool optional,
-                             const Ice::StringSeq* /*metaData*/)
+                             const Ice::StringSeq* metaData)
 {
     PrimitiveInfoPtr pi = PrimitiveInfoPtr::dynamicCast(elementType);
 
+    SequenceMapping::Type type = mapping->type;
+    if(metaData)
+    {
+        SequenceMapping::getType(*metaData, type);
+    }
+
     Ice::OutputStream::size_type sizePos = 0;
     if(optional)
     {
@@ -1660,12 +2435,25 @@ IcePy::SequenceInfo::marshal(PyObject* p, Ice::OutputStream* os, ObjectMap* obje
             // Determine the sequence size.
             //
             Py_ssize_t sz = 0;
-            if(p != Py_None)
+            if(p != Py_None && isSizedIterable(p))
+            {
+                sz = PyObject_Size(p);
+                if(sz < 0)
+                {
+                    assert(PyErr_Occurred());
+                    throw AbortMarshaling();
+                }
+            }
+            else if(p != Py_None)
             {
                 const void* buf = 0;
                 if(PyObject_AsReadBuffer(p, &buf, &sz) == 0)
                 {
-                    if(pi->kind == PrimitiveInfo::KindString)
+                    if(!pi)
+                    {
+                        sz /= elementType->wireSize(); // A record array of fixed-size structures.
+                    }
+                    else if(pi->kind == PrimitiveInfo::KindString)
                     {
                         PyErr_Format(PyExc_ValueError, STRCAST("expected sequence value"));
                         throw AbortMarshaling();
@@ -1702,10 +2490,18 @@ IcePy::SequenceInfo::marshal(PyObject* p, Ice::OutputStream* os, ObjectMap* obje
     {
         os->writeSize(0);
     }
+    else if(isSizedIterable(p))
+    {
+        marshalIterable(p, os, objectMap);
+    }
     else if(pi)
     {
         marshalPrimitiveSequence(pi, p, os);
     }
+    else if(type == SequenceMapping::SEQ_NUMPYRECARRAY && marshalRecArray(p, os))
+    {
+        // Marshaled in one pass from the array buffer.
+    }
     else
     {
         PyObjectHandle fastSeq = PySequence_Fast(p, STRCAST("expected a sequence value"));
@@ -1724,13 +2520,12 @@ IcePy::SequenceInfo::marshal(PyObject* p, Ice::OutputStream* os, ObjectMap* obje
                 assert(PyErr_Occurred());
                 throw AbortMarshaling();
             }
-            if(!elementType->validate(item))
+            if(!elementType->marshalChecked(item, os, objectMap, false))
             {
                 PyErr_Format(PyExc_ValueError, STRCAST("invalid value for element %d of `%s'"), static_cast<int>(i),
                              const_cast<char*>(id.c_str()));
                 throw AbortMarshaling();
             }
-            elementType->marshal(item, os, objectMap, false);
         }
     }
 
@@ -1787,6 +2582,25 @@ IcePy::SequenceInfo::unmarshal(Ice::InputStream* is, const UnmarshalCallbackPtr&
         sm = mapping;
     }
 
+    if(sm->type == SequenceMapping::SEQ_LAZY)
+    {
+        PyObjectHandle result = createLazySequence(is);
+        if(result.get())
+        {
+            cb->unmarshaled(result.get(), target, closure);
+            return;
+        }
+        else if(PyErr_Occurred())
+        {
+            throw AbortMarshaling();
+        }
+
+        //
+        // The elements cannot be unmarshaled lazily, use the default mapping instead.
+        //
+        sm = new SequenceMapping(SequenceMapping::SEQ_DEFAULT);
+    }
+
     PrimitiveInfoPtr pi = PrimitiveInfoPtr::dynamicCast(elementType);
     if(pi)
     {
@@ -1794,6 +2608,12 @@ IcePy::SequenceInfo::unmarshal(Ice::InputStream* is, const UnmarshalCallbackPtr&
         return;
     }
 
+    if(sm->type == SequenceMapping::SEQ_NUMPYRECARRAY)
+    {
+        unmarshalRecArray(is, cb, target, closure, sm);
+        return;
+    }
+
     Ice::Int sz = is->readSize();
     PyObjectHandle result = sm->createContainer(sz);
 
@@ -1812,6 +2632,26 @@ IcePy::SequenceInfo::unmarshal(Ice::InputStream* is, const UnmarshalCallbackPtr&
     cb->unmarshaled(result.get(), target, closure);
 }
 
+bool
+IcePy::SequenceInfo::skip(Ice::InputStream* is)
+{
+    Ice::Int sz = is->readSize();
+    if(!elementType->variableLength())
+    {
+        is->skip(static_cast<Ice::InputStream::Container::size_type>(sz) * elementType->wireSize());
+        return true;
+    }
+
+    for(Ice::Int i = 0; i < sz; ++i)
+    {
+        if(!elementType->skip(is))
+        {
+            return false;
+        }
+    }
+    return true;
+}
+
 void
 IcePy::SequenceInfo::print(PyObject* value, IceUtilInternal::Output& out, PrintObjectHistory* history)
 {
@@ -1825,6 +2665,13 @@ IcePy::SequenceInfo::print(PyObject* value, IceUtilInternal::Output& out, PrintO
     {
         out << "{}";
     }
+    else if(isSizedIterable(value))
+    {
+        //
+        // Don't consume the iterable, it might not be possible to iterate over it a second time.
+        //
+        out << "<iterable>";
+    }
     else
     {
         PyObjectHandle fastSeq = PySequence_Fast(value, STRCAST("expected a sequence value"));
@@ -1854,6 +2701,72 @@ void
 IcePy::SequenceInfo::destroy()
 {
     const_cast<TypeInfoPtr&>(elementType) = 0;
+    _recArrayType = 0;
+}
+
+bool
+IcePy::SequenceInfo::pin(PyObject* p, Ice::OutputStream* os, PinnedBufferList& buffers)
+{
+#if PY_VERSION_HEX >= 0x03000000 && !defined(ICE_BIG_ENDIAN)
+    //
+    // Smaller buffers are copied with the GIL held, releasing the GIL costs more than the copy.
+    //
+    static const Py_ssize_t minPinnedBufferSize = 64 * 1024;
+
+    static const int itemsize[] =
+    {
+        1, // KindBool,
+        1, // KindByte,
+        2, // KindShort,
+        4, // KindInt,
+        8, // KindLong,
+        4, // KindFloat,
+        8, // KindDouble
+    };
+
+    PrimitiveInfoPtr pi = PrimitiveInfoPtr::dynamicCast(elementType);
+    if(!pi || pi->kind == PrimitiveInfo::KindString || p == Py_None || isSizedIterable(p))
+    {
+        return false;
+    }
+
+    Py_buffer pybuf;
+    if(PyObject_GetBuffer(p, &pybuf, PyBUF_SIMPLE | PyBUF_FORMAT) != 0)
+    {
+        PyErr_Clear(); // PyObject_GetBuffer sets an exception on failure.
+        return false;
+    }
+
+    //
+    // Buffers that marshalPrimitiveSequence() would reject are marshaled with marshal(), which
+    // raises the appropriate exception.
+    //
+    if(pybuf.len < minPinnedBufferSize ||
+       (pi->kind != PrimitiveInfo::KindByte &&
+        ((pybuf.format != 0 && (pybuf.format[0] == '>' || pybuf.format[0] == '!')) ||
+         pybuf.itemsize != itemsize[pi->kind])))
+    {
+        PyBuffer_Release(&pybuf);
+        return false;
+    }
+
+    Ice::OutputStream::size_type pos;
+    try
+    {
+        os->writeSize(static_cast<Ice::Int>(pybuf.len / itemsize[pi->kind]));
+        pos = os->pos();
+        os->resize(pos + static_cast<Ice::OutputStream::size_type>(pybuf.len));
+    }
+    catch(...)
+    {
+        PyBuffer_Release(&pybuf);
+        throw;
+    }
+    buffers.add(pybuf, pos);
+    return true;
+#else
+    return false;
+#endif
 }
 
 PyObject*
@@ -1877,16 +2790,76 @@ IcePy::SequenceInfo::getSequence(const PrimitiveInfoPtr& pi, PyObject* p)
         //
         if(!checkString(p))
         {
-            fs = PySequence_Fast(p, STRCAST("expected a string, sequence, or buffer value"));
+            fs = PySequence_Fast(p, STRCAST("expected a string, sequence, or buffer value"));
+        }
+#endif
+    }
+    else
+    {
+        fs = PySequence_Fast(p, STRCAST("expected a sequence or buffer value"));
+    }
+
+    return fs.release();
+}
+
+void
+IcePy::SequenceInfo::marshalIterable(PyObject* p, Ice::OutputStream* os, ObjectMap* objectMap)
+{
+    //
+    // The elements are marshaled as they are produced by the iterator, without creating an
+    // intermediate list. The length of the iterable must be known upfront to marshal the
+    // sequence size.
+    //
+    Py_ssize_t sz = PyObject_Size(p);
+    if(sz < 0)
+    {
+        assert(PyErr_Occurred());
+        throw AbortMarshaling();
+    }
+
+    PyObjectHandle iter = PyObject_GetIter(p);
+    if(!iter.get())
+    {
+        assert(PyErr_Occurred());
+        throw AbortMarshaling();
+    }
+
+    os->writeSize(static_cast<Ice::Int>(sz));
+    Py_ssize_t i = 0;
+    while(true)
+    {
+        PyObjectHandle item = PyIter_Next(iter.get());
+        if(!item.get())
+        {
+            if(PyErr_Occurred())
+            {
+                throw AbortMarshaling();
+            }
+            break;
+        }
+
+        if(i == sz)
+        {
+            PyErr_Format(PyExc_ValueError, STRCAST("iterable for `%s' produced more than %d elements"),
+                         const_cast<char*>(id.c_str()), static_cast<int>(sz));
+            throw AbortMarshaling();
+        }
+
+        if(!elementType->marshalChecked(item.get(), os, objectMap, false))
+        {
+            PyErr_Format(PyExc_ValueError, STRCAST("invalid value for element %d of `%s'"), static_cast<int>(i),
+                         const_cast<char*>(id.c_str()));
+            throw AbortMarshaling();
         }
-#endif
+        ++i;
     }
-    else
+
+    if(i != sz)
     {
-        fs = PySequence_Fast(p, STRCAST("expected a sequence or buffer value"));
+        PyErr_Format(PyExc_ValueError, STRCAST("iterable for `%s' produced %d elements, expected %d"),
+                     const_cast<char*>(id.c_str()), static_cast<int>(i), static_cast<int>(sz));
+        throw AbortMarshaling();
     }
-
-    return fs.release();
 }
 
 void
@@ -2269,14 +3242,36 @@ IcePy::SequenceInfo::marshalPrimitiveSequence(const PrimitiveInfoPtr& pi, PyObje
     }
 }
 
+//
+// Create a read-only memoryview that references the given memory, the caller
+// must ensure the memory remains valid for the lifetime of the view.
+//
+static PyObject*
+createMemoryView(const char* buffer, Py_ssize_t size)
+{
+#if PY_VERSION_HEX >= 0x03030000
+    return PyMemoryView_FromMemory(const_cast<char*>(buffer), size, PyBUF_READ);
+#else
+    Py_buffer pybuffer;
+    if(PyBuffer_FillInfo(&pybuffer, 0, const_cast<char*>(buffer), size, 1, PyBUF_SIMPLE) != 0)
+    {
+        return 0;
+    }
+
+    return PyMemoryView_FromBuffer(&pybuffer);
+#endif
+}
+
 PyObject*
 IcePy::SequenceInfo::createSequenceFromMemory(const SequenceMappingPtr& sm,
+                                              Ice::InputStream* is,
                                               const char* buffer,
                                               Py_ssize_t size,
                                               BuiltinType type,
                                               bool copy)
 {
     PyObjectHandle memoryview;
+    bool shared = false;
     if(copy)
     {
         PyObjectHandle bufferObject = createBuffer(new Buffer(buffer, size, type));
@@ -2290,18 +3285,28 @@ IcePy::SequenceInfo::createSequenceFromMemory(const SequenceMappingPtr& sm,
     }
     else
     {
-#if PY_VERSION_HEX >= 0x03030000
-        memoryview = PyMemoryView_FromMemory(const_cast<char*>(buffer), size, PyBUF_READ);
-#else
-        Py_buffer pybuffer;
-        if(PyBuffer_FillInfo(&pybuffer, 0, const_cast<char*>(buffer), size, 1, PyBUF_SIMPLE) != 0)
+        //
+        // With the zero-copy mapping, the view references the stream buffer directly
+        // when the buffer can be shared with Python.
+        //
+        StreamUtil* util = reinterpret_cast<StreamUtil*>(is->getClosure());
+        if(sm->zeroCopy && util)
         {
-            assert(PyErr_Occurred());
-            throw AbortMarshaling();
+            memoryview = util->createView(buffer, size);
+            if(memoryview.get())
+            {
+                shared = true;
+            }
+            else if(PyErr_Occurred())
+            {
+                throw AbortMarshaling();
+            }
         }
 
-        memoryview = PyMemoryView_FromBuffer(&pybuffer);
-#endif
+        if(!memoryview.get())
+        {
+            memoryview = createMemoryView(buffer, size);
+        }
     }
 
     if(!memoryview.get())
@@ -2323,10 +3328,10 @@ IcePy::SequenceInfo::createSequenceFromMemory(const SequenceMappingPtr& sm,
     PyTuple_SET_ITEM(args.get(), 0, incRef(memoryview.get()));
     PyTuple_SET_ITEM(args.get(), 1, incRef(builtinType.get()));
     //
-    // If we copy the data to a Buffer object we set the copy factory argument to false
-    // to avoid a second copy in the factory.
+    // If we copy the data to a Buffer object, or the view references a shared buffer, we
+    // set the copy factory argument to false to avoid a second copy in the factory.
     //
-    PyTuple_SET_ITEM(args.get(), 2, copy ? incFalse() : incTrue());
+    PyTuple_SET_ITEM(args.get(), 2, copy || shared ? incFalse() : incTrue());
     PyObjectHandle result = PyObject_Call(sm->factory.get(), args.get(), 0);
 
     if(!result.get())
@@ -2359,7 +3364,7 @@ IcePy::SequenceInfo::unmarshalPrimitiveSequence(const PrimitiveInfoPtr& pi, Ice:
         int sz = static_cast<int>(p.second - p.first);
         if(sm->factory.get())
         {
-            result = createSequenceFromMemory(sm,
+            result = createSequenceFromMemory(sm, is,
                                               reinterpret_cast<const char*>(arr.get() != 0 ? arr.release() : p.first),
                                               sz,
                                               BuiltinTypeBool,
@@ -2374,10 +3379,7 @@ IcePy::SequenceInfo::unmarshalPrimitiveSequence(const PrimitiveInfoPtr& pi, Ice:
                 throw AbortMarshaling();
             }
 
-            for(int i = 0; i < sz; ++i)
-            {
-                sm->setItem(result.get(), i, p.first[i] ? getTrue() : getFalse());
-            }
+            fillPrimitiveContainer(result.get(), p.first, sz);
         }
         break;
     }
@@ -2388,7 +3390,8 @@ IcePy::SequenceInfo::unmarshalPrimitiveSequence(const PrimitiveInfoPtr& pi, Ice:
         int sz = static_cast<int>(p.second - p.first);
         if(sm->factory.get())
         {
-            result = createSequenceFromMemory(sm, reinterpret_cast<const char*>(p.first), sz, BuiltinTypeByte, false);
+            result = createSequenceFromMemory(sm, is, reinterpret_cast<const char*>(p.first), sz, BuiltinTypeByte,
+                                              false);
         }
         else if(sm->type == SequenceMapping::SEQ_DEFAULT)
         {
@@ -2412,16 +3415,7 @@ IcePy::SequenceInfo::unmarshalPrimitiveSequence(const PrimitiveInfoPtr& pi, Ice:
                 throw AbortMarshaling();
             }
 
-            for(int i = 0; i < sz; ++i)
-            {
-                PyObjectHandle item = PyLong_FromLong(p.first[i]);
-                if(!item.get())
-                {
-                    assert(PyErr_Occurred());
-                    throw AbortMarshaling();
-                }
-                sm->setItem(result.get(), i, item.get());
-            }
+            fillPrimitiveContainer(result.get(), p.first, sz);
         }
         break;
     }
@@ -2433,7 +3427,7 @@ IcePy::SequenceInfo::unmarshalPrimitiveSequence(const PrimitiveInfoPtr& pi, Ice:
         int sz = static_cast<int>(p.second - p.first);
         if(sm->factory.get())
         {
-            result = createSequenceFromMemory(sm,
+            result = createSequenceFromMemory(sm, is,
                                               reinterpret_cast<const char*>(arr.get() != 0 ? arr.release() : p.first),
                                               sz * 2,
                                               BuiltinTypeShort,
@@ -2448,16 +3442,7 @@ IcePy::SequenceInfo::unmarshalPrimitiveSequence(const PrimitiveInfoPtr& pi, Ice:
                 throw AbortMarshaling();
             }
 
-            for(int i = 0; i < sz; ++i)
-            {
-                PyObjectHandle item = PyLong_FromLong(p.first[i]);
-                if(!item.get())
-                {
-                    assert(PyErr_Occurred());
-                    throw AbortMarshaling();
-                }
-                sm->setItem(result.get(), i, item.get());
-            }
+            fillPrimitiveContainer(result.get(), p.first, sz);
         }
         break;
     }
@@ -2469,7 +3454,7 @@ IcePy::SequenceInfo::unmarshalPrimitiveSequence(const PrimitiveInfoPtr& pi, Ice:
         int sz = static_cast<int>(p.second - p.first);
         if(sm->factory.get())
         {
-            result = createSequenceFromMemory(sm,
+            result = createSequenceFromMemory(sm, is,
                                               reinterpret_cast<const char*>(arr.get() != 0 ? arr.release() : p.first),
                                               sz * 4,
                                               BuiltinTypeInt,
@@ -2483,16 +3468,7 @@ IcePy::SequenceInfo::unmarshalPrimitiveSequence(const PrimitiveInfoPtr& pi, Ice:
                 assert(PyErr_Occurred());
                 throw AbortMarshaling();
             }
-            for(int i = 0; i < sz; ++i)
-            {
-                PyObjectHandle item = PyLong_FromLong(p.first[i]);
-                if(!item.get())
-                {
-                    assert(PyErr_Occurred());
-                    throw AbortMarshaling();
-                }
-                sm->setItem(result.get(), i, item.get());
-            }
+            fillPrimitiveContainer(result.get(), p.first, sz);
         }
         break;
     }
@@ -2504,7 +3480,7 @@ IcePy::SequenceInfo::unmarshalPrimitiveSequence(const PrimitiveInfoPtr& pi, Ice:
         int sz = static_cast<int>(p.second - p.first);
         if(sm->factory.get())
         {
-            result = createSequenceFromMemory(sm,
+            result = createSequenceFromMemory(sm, is,
                                               reinterpret_cast<const char*>(arr.get() != 0 ? arr.release() : p.first),
                                               sz * 8,
                                               BuiltinTypeLong,
@@ -2519,16 +3495,7 @@ IcePy::SequenceInfo::unmarshalPrimitiveSequence(const PrimitiveInfoPtr& pi, Ice:
                 throw AbortMarshaling();
             }
 
-            for(int i = 0; i < sz; ++i)
-            {
-                PyObjectHandle item = PyLong_FromLongLong(p.first[i]);
-                if(!item.get())
-                {
-                    assert(PyErr_Occurred());
-                    throw AbortMarshaling();
-                }
-                sm->setItem(result.get(), i, item.get());
-            }
+            fillPrimitiveContainer(result.get(), p.first, sz);
         }
         break;
     }
@@ -2540,7 +3507,7 @@ IcePy::SequenceInfo::unmarshalPrimitiveSequence(const PrimitiveInfoPtr& pi, Ice:
         int sz = static_cast<int>(p.second - p.first);
         if(sm->factory.get())
         {
-            result = createSequenceFromMemory(sm,
+            result = createSequenceFromMemory(sm, is,
                                               reinterpret_cast<const char*>(arr.get() != 0 ? arr.release() : p.first),
                                               sz * 4,
                                               BuiltinTypeFloat,
@@ -2555,16 +3522,7 @@ IcePy::SequenceInfo::unmarshalPrimitiveSequence(const PrimitiveInfoPtr& pi, Ice:
                 throw AbortMarshaling();
             }
 
-            for(int i = 0; i < sz; ++i)
-            {
-                PyObjectHandle item = PyFloat_FromDouble(p.first[i]);
-                if(!item.get())
-                {
-                    assert(PyErr_Occurred());
-                    throw AbortMarshaling();
-                }
-                sm->setItem(result.get(), i, item.get());
-            }
+            fillPrimitiveContainer(result.get(), p.first, sz);
         }
         break;
     }
@@ -2576,7 +3534,7 @@ IcePy::SequenceInfo::unmarshalPrimitiveSequence(const PrimitiveInfoPtr& pi, Ice:
         int sz = static_cast<int>(p.second - p.first);
         if(sm->factory.get())
         {
-            result = createSequenceFromMemory(sm,
+            result = createSequenceFromMemory(sm, is,
                                               reinterpret_cast<const char*>(arr.get() != 0 ? arr.release() : p.first),
                                               sz * 8,
                                               BuiltinTypeDouble,
@@ -2591,28 +3549,17 @@ IcePy::SequenceInfo::unmarshalPrimitiveSequence(const PrimitiveInfoPtr& pi, Ice:
                 throw AbortMarshaling();
             }
 
-            for(int i = 0; i < sz; ++i)
-            {
-                PyObjectHandle item = PyFloat_FromDouble(p.first[i]);
-                if(!item.get())
-                {
-                    assert(PyErr_Occurred());
-                    throw AbortMarshaling();
-                }
-                sm->setItem(result.get(), i, item.get());
-            }
+            fillPrimitiveContainer(result.get(), p.first, sz);
         }
         break;
     }
     case PrimitiveInfo::KindString:
     {
-        Ice::StringSeq seq;
-#if PY_VERSION_HEX >= 0x03000000
-        is->read(seq, false); // Bypass string conversion.
-#else
-        is->read(seq, true);
-#endif
-        int sz = static_cast<int>(seq.size());
+        //
+        // Create the string objects directly from the stream buffer, without an intermediate
+        // std::string for each element.
+        //
+        int sz = is->readAndCheckSeqSize(1);
         result = sm->createContainer(sz);
         if(!result.get())
         {
@@ -2620,15 +3567,18 @@ IcePy::SequenceInfo::unmarshalPrimitiveSequence(const PrimitiveInfoPtr& pi, Ice:
             throw AbortMarshaling();
         }
 
+        const bool isList = PyList_Check(result.get()) != 0;
         for(int i = 0; i < sz; ++i)
         {
-            PyObjectHandle item = createString(seq[i]);
-            if(!item.get())
+            PyObject* item = readString(is); // The container steals the reference.
+            if(isList)
             {
-                assert(PyErr_Occurred());
-                throw AbortMarshaling();
+                PyList_SET_ITEM(result.get(), i, item);
+            }
+            else
+            {
+                PyTuple_SET_ITEM(result.get(), i, item);
             }
-            sm->setItem(result.get(), i, item.get());
         }
         break;
     }
@@ -2636,6 +3586,315 @@ IcePy::SequenceInfo::unmarshalPrimitiveSequence(const PrimitiveInfoPtr& pi, Ice:
     cb->unmarshaled(result.get(), target, closure);
 }
 
+//
+// Describe the layout of a fixed-size structure as a tuple of (name, field) pairs, where
+// field is either a BuiltinType value or a nested tuple for a structure member. Returns
+// nil if a member cannot be represented in a NumPy record array.
+//
+static PyObject*
+createRecArrayFields(const StructInfoPtr& info)
+{
+    PyObjectHandle fields = PyTuple_New(static_cast<Py_ssize_t>(info->members.size()));
+    if(!fields.get())
+    {
+        return 0;
+    }
+
+    Py_ssize_t i = 0;
+    for(DataMemberList::const_iterator q = info->members.begin(); q != info->members.end(); ++q, ++i)
+    {
+        PyObjectHandle field;
+        PrimitiveInfoPtr pi = PrimitiveInfoPtr::dynamicCast((*q)->type);
+        StructInfoPtr si = StructInfoPtr::dynamicCast((*q)->type);
+        if(pi && pi->kind != PrimitiveInfo::KindString)
+        {
+            //
+            // The primitive kinds have the same values as the BuiltinType enumerators.
+            //
+            field = PyLong_FromLong(static_cast<long>(pi->kind));
+        }
+        else if(si && !si->variableLength())
+        {
+            field = createRecArrayFields(si);
+        }
+        else
+        {
+            PyErr_Format(PyExc_ValueError, STRCAST("member `%s' of `%s' cannot be mapped to a record array field"),
+                         const_cast<char*>((*q)->name.c_str()), const_cast<char*>(info->id.c_str()));
+            return 0;
+        }
+
+        if(!field.get())
+        {
+            return 0;
+        }
+
+        PyObject* item = Py_BuildValue(STRCAST("(OO)"), (*q)->nameObj.get(), field.get());
+        if(!item)
+        {
+            return 0;
+        }
+        PyTuple_SET_ITEM(fields.get(), i, item); // PyTuple_SET_ITEM steals a reference.
+    }
+    return fields.release();
+}
+
+PyObject*
+IcePy::SequenceInfo::createLazySequence(Ice::InputStream* is)
+{
+    const Ice::InputStream::Container::size_type start = is->pos();
+    const Ice::Int sz = is->readSize();
+    const Ice::InputStream::Container::size_type begin = is->pos();
+
+    //
+    // Find the position of each element, fixed-size elements are located with the element size
+    // and variable-length elements are skipped over. This doesn't create any Python objects.
+    //
+    IceInternal::UniquePtr<vector<Ice::Int> > offsets;
+    Py_ssize_t stride = 0;
+    if(elementType->variableLength())
+    {
+        offsets.reset(new vector<Ice::Int>());
+        offsets->reserve(static_cast<size_t>(sz) + 1);
+        for(Ice::Int i = 0; i < sz; ++i)
+        {
+            offsets->push_back(static_cast<Ice::Int>(is->pos() - begin));
+            if(!elementType->skip(is))
+            {
+                is->pos(start);
+                return 0;
+            }
+        }
+        offsets->push_back(static_cast<Ice::Int>(is->pos() - begin));
+    }
+    else
+    {
+        stride = elementType->wireSize();
+        is->skip(static_cast<Ice::InputStream::Container::size_type>(sz) * stride);
+    }
+    const Ice::InputStream::Container::size_type length = is->pos() - begin;
+
+    is->pos(begin);
+    const Ice::Byte* data;
+    is->readBlob(data, length);
+
+    //
+    // Keep a view of the stream buffer if it can be shared with Python objects, otherwise
+    // copy the encoded elements as the stream buffer is released once unmarshaling completes.
+    //
+    PyObjectHandle view;
+    StreamUtil* util = reinterpret_cast<StreamUtil*>(is->getClosure());
+    if(util)
+    {
+        view = util->createView(reinterpret_cast<const char*>(data), static_cast<Py_ssize_t>(length));
+        if(!view.get())
+        {
+            PyErr_Clear();
+        }
+    }
+
+    const Ice::Byte* viewBegin = data;
+    if(!view.get())
+    {
+        view = PyBytes_FromStringAndSize(reinterpret_cast<const char*>(data), static_cast<Py_ssize_t>(length));
+        if(!view.get())
+        {
+            assert(PyErr_Occurred());
+            throw AbortMarshaling();
+        }
+        viewBegin = reinterpret_cast<const Ice::Byte*>(PyBytes_AS_STRING(view.get()));
+    }
+
+    LazySequenceObject* obj = lazySequenceNew(&LazySequenceType, 0, 0);
+    if(!obj)
+    {
+        assert(PyErr_Occurred());
+        throw AbortMarshaling();
+    }
+    obj->elementType = new TypeInfoPtr(elementType);
+    obj->encoding = new Ice::EncodingVersion(is->getEncoding());
+    obj->data = view.release();
+    obj->begin = viewBegin;
+    obj->offsets = offsets.release();
+    obj->stride = stride;
+    obj->size = sz;
+    return reinterpret_cast<PyObject*>(obj);
+}
+
+PyObject*
+IcePy::SequenceInfo::getRecArrayType()
+{
+    if(!_recArrayType.get())
+    {
+        StructInfoPtr si = StructInfoPtr::dynamicCast(elementType);
+        if(!si || si->variableLength())
+        {
+            PyErr_Format(PyExc_ValueError, STRCAST("`%s' is not a sequence of fixed-size structures"),
+                         const_cast<char*>(id.c_str()));
+            return 0;
+        }
+
+        PyObjectHandle fields = createRecArrayFields(si);
+        if(!fields.get())
+        {
+            return 0;
+        }
+
+        PyObject* factory = lookupType("Ice.createNumPyRecArrayType"); // Borrowed reference.
+        if(!factory)
+        {
+            PyErr_Format(PyExc_ImportError, STRCAST("factory type not found `Ice.createNumPyRecArrayType'"));
+            return 0;
+        }
+
+        PyObjectHandle args = PyTuple_New(1);
+        PyTuple_SET_ITEM(args.get(), 0, fields.release());
+        _recArrayType = PyObject_Call(factory, args.get(), 0);
+    }
+    Py_XINCREF(_recArrayType.get());
+    return _recArrayType.get();
+}
+
+bool
+IcePy::SequenceInfo::marshalRecArray(PyObject* p, Ice::OutputStream* os)
+{
+    PyObjectHandle dtype = getAttr(p, "dtype", false);
+    if(!dtype.get())
+    {
+        return false; // Not an array, marshal each element.
+    }
+
+    PyObjectHandle recArrayType = getRecArrayType();
+    if(!recArrayType.get())
+    {
+        assert(PyErr_Occurred());
+        throw AbortMarshaling();
+    }
+
+    int eq = PyObject_RichCompareBool(dtype.get(), recArrayType.get(), Py_EQ);
+    if(eq < 0)
+    {
+        throw AbortMarshaling();
+    }
+    else if(eq == 0)
+    {
+        PyErr_Format(PyExc_ValueError, STRCAST("array dtype doesn't match the layout of `%s'"),
+                     const_cast<char*>(elementType->getId().c_str()));
+        throw AbortMarshaling();
+    }
+
+    //
+    // The array elements are packed little-endian records, which is also the
+    // encoding of the structures so the buffer is written as is.
+    //
+    const int elementSize = elementType->wireSize();
+#if PY_VERSION_HEX >= 0x03000000
+    Py_buffer pybuf;
+    if(PyObject_GetBuffer(p, &pybuf, PyBUF_C_CONTIGUOUS) != 0)
+    {
+        PyErr_Clear();
+        marshalStridedRecArray(p, os);
+        return true;
+    }
+    const Ice::Byte* b = reinterpret_cast<const Ice::Byte*>(pybuf.buf);
+    Py_ssize_t sz = pybuf.len;
+#else
+    const void* buf = 0;
+    Py_ssize_t sz;
+    if(PyObject_AsReadBuffer(p, &buf, &sz) != 0)
+    {
+        PyErr_Clear();
+        marshalStridedRecArray(p, os);
+        return true;
+    }
+    const Ice::Byte* b = reinterpret_cast<const Ice::Byte*>(buf);
+#endif
+    os->writeSize(static_cast<Ice::Int>(sz / elementSize));
+    os->writeBlob(b, static_cast<Ice::OutputStream::Container::size_type>(sz));
+#if PY_VERSION_HEX >= 0x03000000
+    PyBuffer_Release(&pybuf);
+#endif
+    return true;
+}
+
+void
+IcePy::SequenceInfo::marshalStridedRecArray(PyObject* p, Ice::OutputStream* os)
+{
+    //
+    // An array that isn't C-contiguous, such as a slice with a step, exports a strided
+    // buffer. Its records are gathered into the stream in C order.
+    //
+    Py_buffer pybuf;
+    if(PyObject_GetBuffer(p, &pybuf, PyBUF_RECORDS_RO) != 0)
+    {
+        assert(PyErr_Occurred());
+        throw AbortMarshaling();
+    }
+
+    try
+    {
+        os->writeSize(static_cast<Ice::Int>(pybuf.len / elementType->wireSize()));
+        Ice::OutputStream::size_type pos = os->pos();
+        os->resize(pos + static_cast<Ice::OutputStream::size_type>(pybuf.len));
+        if(PyBuffer_ToContiguous(os->b.begin() + pos, &pybuf, pybuf.len, 'C') < 0)
+        {
+            assert(PyErr_Occurred());
+            throw AbortMarshaling();
+        }
+    }
+    catch(...)
+    {
+        PyBuffer_Release(&pybuf);
+        throw;
+    }
+    PyBuffer_Release(&pybuf);
+}
+
+void
+IcePy::SequenceInfo::unmarshalRecArray(Ice::InputStream* is, const UnmarshalCallbackPtr& cb, PyObject* target,
+                                       void* closure, const SequenceMappingPtr& sm)
+{
+    PyObjectHandle recArrayType = getRecArrayType();
+    if(!recArrayType.get())
+    {
+        assert(PyErr_Occurred());
+        throw AbortMarshaling();
+    }
+
+    //
+    // The sequence elements are encoded back to back without padding, we read
+    // the whole sequence as a single blob and let the factory create the array.
+    //
+    const int elementSize = elementType->wireSize();
+    Ice::Int sz = is->readAndCheckSeqSize(elementSize);
+    const Ice::Byte* data = 0;
+    is->readBlob(data, static_cast<Ice::InputStream::Container::size_type>(sz) * elementSize);
+
+    PyObjectHandle memoryview = createMemoryView(reinterpret_cast<const char*>(data),
+                                                 static_cast<Py_ssize_t>(sz) * elementSize);
+    if(!memoryview.get())
+    {
+        assert(PyErr_Occurred());
+        throw AbortMarshaling();
+    }
+
+    //
+    // The view references the stream buffer so the factory must copy the data.
+    //
+    PyObjectHandle args = PyTuple_New(3);
+    PyTuple_SET_ITEM(args.get(), 0, incRef(memoryview.get()));
+    PyTuple_SET_ITEM(args.get(), 1, incRef(recArrayType.get()));
+    PyTuple_SET_ITEM(args.get(), 2, incTrue());
+    PyObjectHandle result = PyObject_Call(sm->factory.get(), args.get(), 0);
+    if(!result.get())
+    {
+        assert(PyErr_Occurred());
+        throw AbortMarshaling();
+    }
+
+    cb->unmarshaled(result.get(), target, closure);
+}
+
 bool
 IcePy::SequenceInfo::SequenceMapping::getType(const Ice::StringSeq& metaData, Type& t)
 {
@@ -2651,9 +3910,14 @@ IcePy::SequenceInfo::SequenceMapping::getType(const Ice::StringSeq& metaData, Ty
             t = SEQ_TUPLE;
             return true;
         }
-        else if((*p) == "python:seq:list" || (*p) == "python:list")
+        else if((*p) == "python:seq:list" || (*p) == "python:list")
+        {
+            t = SEQ_LIST;
+            return true;
+        }
+        else if((*p) == "python:seq:lazy")
         {
-            t = SEQ_LIST;
+            t = SEQ_LAZY;
             return true;
         }
         else if((*p) == "python:array.array")
@@ -2666,6 +3930,11 @@ IcePy::SequenceInfo::SequenceMapping::getType(const Ice::StringSeq& metaData, Ty
             t = SEQ_NUMPYARRAY;
             return true;
         }
+        else if((*p) == "python:numpy.recarray")
+        {
+            t = SEQ_NUMPYRECARRAY;
+            return true;
+        }
         else if(p->find("python:memoryview:") == 0)
         {
             t = SEQ_MEMORYVIEW;
@@ -2676,11 +3945,12 @@ IcePy::SequenceInfo::SequenceMapping::getType(const Ice::StringSeq& metaData, Ty
 }
 
 IcePy::SequenceInfo::SequenceMapping::SequenceMapping(Type t) :
-    type(t)
+    type(t), zeroCopy(false)
 {
 }
 
-IcePy::SequenceInfo::SequenceMapping::SequenceMapping(const Ice::StringSeq& meta)
+IcePy::SequenceInfo::SequenceMapping::SequenceMapping(const Ice::StringSeq& meta) :
+    zeroCopy(false)
 {
     if(!getType(meta, type))
     {
@@ -2691,6 +3961,8 @@ IcePy::SequenceInfo::SequenceMapping::SequenceMapping(const Ice::StringSeq& meta
 void
 IcePy::SequenceInfo::SequenceMapping::init(const Ice::StringSeq& meta)
 {
+    zeroCopy = find(meta.begin(), meta.end(), "python:zero-copy") != meta.end();
+
     if(type == SEQ_ARRAY)
     {
         factory = lookupType("Ice.createArray");
@@ -2709,6 +3981,15 @@ IcePy::SequenceInfo::SequenceMapping::init(const Ice::StringSeq& meta)
             throw InvalidSequenceFactoryException();
         }
     }
+    else if(type == SEQ_NUMPYRECARRAY)
+    {
+        factory = lookupType("Ice.createNumPyRecArray");
+        if(!factory.get())
+        {
+            PyErr_Format(PyExc_ImportError, STRCAST("factory type not found `Ice.createNumPyRecArray'"));
+            throw InvalidSequenceFactoryException();
+        }
+    }
     else if(type == SEQ_MEMORYVIEW)
     {
         const string prefix = "python:memoryview:";
@@ -2790,6 +4071,50 @@ IcePy::SequenceInfo::SequenceMapping::setItem(PyObject* cont, int i, PyObject* v
     }
 }
 
+//
+// PinnedBufferList implementation
+//
+IcePy::PinnedBufferList::PinnedBufferList()
+{
+}
+
+IcePy::PinnedBufferList::~PinnedBufferList()
+{
+    for(vector<PinnedBuffer>::iterator p = _buffers.begin(); p != _buffers.end(); ++p)
+    {
+        PyBuffer_Release(&p->view);
+    }
+}
+
+void
+IcePy::PinnedBufferList::add(const Py_buffer& view, Ice::OutputStream::size_type pos)
+{
+    PinnedBuffer buffer;
+    buffer.view = view;
+    buffer.pos = pos;
+    _buffers.push_back(buffer);
+}
+
+bool
+IcePy::PinnedBufferList::empty() const
+{
+    return _buffers.empty();
+}
+
+void
+IcePy::PinnedBufferList::copy(Ice::OutputStream* os)
+{
+    //
+    // The stream and the pinned buffers are not accessed by other threads, and the
+    // exporting objects are kept alive by the buffers.
+    //
+    AllowThreads allowThreads;
+    for(vector<PinnedBuffer>::const_iterator p = _buffers.begin(); p != _buffers.end(); ++p)
+    {
+        memcpy(os->b.begin() + p->pos, p->view.buf, static_cast<size_t>(p->view.len));
+    }
+}
+
 //
 // Buffer implementation
 //
@@ -2800,9 +4125,25 @@ IcePy::Buffer::Buffer(const char* data, Py_ssize_t size, SequenceInfo::BuiltinTy
 {
 }
 
+IcePy::Buffer::Buffer(vector<Ice::Byte>& bytes) :
+    _data(0),
+    _size(static_cast<Py_ssize_t>(bytes.size())),
+    _type(SequenceInfo::BuiltinTypeByte)
+{
+    _bytes.swap(bytes);
+    if(!_bytes.empty())
+    {
+        _data = reinterpret_cast<const char*>(&_bytes[0]);
+    }
+}
+
 IcePy::Buffer::~Buffer()
 {
-    assert(_data != 0);
+    if(_data == 0 || !_bytes.empty())
+    {
+        return; // Empty or owned by the byte vector.
+    }
+
     switch(_type)
     {
         case SequenceInfo::BuiltinTypeBool:
@@ -3036,6 +4377,9 @@ IcePy::DictionaryInfo::DictionaryInfo(const string& ident, PyObject* kt, PyObjec
 
     _variableLength = keyType->variableLength() || valueType->variableLength();
     _wireSize = keyType->wireSize() + valueType->wireSize();
+
+    _primitiveKey = PrimitiveInfoPtr::dynamicCast(keyType);
+    _primitiveValue = PrimitiveInfoPtr::dynamicCast(valueType);
 }
 
 string
@@ -3112,19 +4456,17 @@ IcePy::DictionaryInfo::marshal(PyObject* p, Ice::OutputStream* os, ObjectMap* ob
         PyObject* value;
         while(PyDict_Next(p, &pos, &key, &value))
         {
-            if(!keyType->validate(key))
+            if(!keyType->marshalChecked(key, os, objectMap, false))
             {
                 PyErr_Format(PyExc_ValueError, STRCAST("invalid key in `%s' element"), const_cast<char*>(id.c_str()));
                 throw AbortMarshaling();
             }
-            keyType->marshal(key, os, objectMap, false);
 
-            if(!valueType->validate(value))
+            if(!valueType->marshalChecked(value, os, objectMap, false))
             {
                 PyErr_Format(PyExc_ValueError, STRCAST("invalid value in `%s' element"), const_cast<char*>(id.c_str()));
                 throw AbortMarshaling();
             }
-            valueType->marshal(value, os, objectMap, false);
         }
     }
 
@@ -3157,10 +4499,47 @@ IcePy::DictionaryInfo::unmarshal(Ice::InputStream* is, const UnmarshalCallbackPt
         throw AbortMarshaling();
     }
 
+    Ice::Int sz = is->readSize();
+
+    if(_primitiveValue)
+    {
+        //
+        // Read the entries directly and insert each of them once. The keys of dictionaries with
+        // primitive values, such as enumerators or structures, are still read with a callback.
+        //
+        KeyCallbackPtr keyCB;
+        if(!_primitiveKey)
+        {
+            keyCB = new KeyCallback;
+        }
+
+        for(Ice::Int i = 0; i < sz; ++i)
+        {
+            PyObjectHandle key;
+            if(_primitiveKey)
+            {
+                key = _primitiveKey->read(is);
+            }
+            else
+            {
+                keyType->unmarshal(is, keyCB, 0, 0, false);
+                key = keyCB->key;
+            }
+            PyObjectHandle value = key.get() ? _primitiveValue->read(is) : 0;
+            if(!value.get() || PyDict_SetItem(p.get(), key.get(), value.get()) < 0)
+            {
+                assert(PyErr_Occurred());
+                throw AbortMarshaling();
+            }
+        }
+
+        cb->unmarshaled(p.get(), target, closure);
+        return;
+    }
+
     KeyCallbackPtr keyCB = new KeyCallback;
     keyCB->key = 0;
 
-    Ice::Int sz = is->readSize();
     for(Ice::Int i = 0; i < sz; ++i)
     {
         //
@@ -3203,6 +4582,20 @@ IcePy::DictionaryInfo::unmarshaled(PyObject* val, PyObject* target, void* closur
     }
 }
 
+bool
+IcePy::DictionaryInfo::skip(Ice::InputStream* is)
+{
+    Ice::Int sz = is->readSize();
+    for(Ice::Int i = 0; i < sz; ++i)
+    {
+        if(!keyType->skip(is) || !valueType->skip(is))
+        {
+            return false;
+        }
+    }
+    return true;
+}
+
 void
 IcePy::DictionaryInfo::print(PyObject* value, IceUtilInternal::Output& out, PrintObjectHistory* history)
 {
@@ -3254,6 +4647,8 @@ IcePy::DictionaryInfo::destroy()
 {
     keyType = 0;
     valueType = 0;
+    _primitiveKey = 0;
+    _primitiveValue = 0;
 }
 
 //
@@ -3495,17 +4890,12 @@ IcePy::ValueInfo::marshal(PyObject* p, Ice::OutputStream* os, ObjectMap* objectM
     // check the object map to see if this object is present. If so, we use the existing ObjectWriter,
     // otherwise we create a new one.
     //
-    Ice::ObjectPtr writer;
     assert(objectMap);
-    ObjectMap::iterator q = objectMap->find(p);
-    if(q == objectMap->end())
+    Ice::ObjectPtr writer = objectMap->find(p);
+    if(!writer)
     {
         writer = new ObjectWriter(p, objectMap, this);
-        objectMap->insert(ObjectMap::value_type(p, writer));
-    }
-    else
-    {
-        writer = q->second;
+        objectMap->insert(p, writer);
     }
 
     //
@@ -3775,9 +5165,169 @@ IcePy::ProxyInfo::print(PyObject* value, IceUtilInternal::Output& out, PrintObje
     }
 }
 
+//
+// ObjectMap implementation.
+//
+IcePy::ObjectMap::ObjectMap() :
+    _size(0)
+{
+}
+
+Ice::ObjectPtr
+IcePy::ObjectMap::find(PyObject* object) const
+{
+    if(_table.empty())
+    {
+        return 0;
+    }
+
+    size_t mask = _table.size() - 1;
+    for(size_t i = hash(object) & mask; _table[i].object; i = (i + 1) & mask)
+    {
+        if(_table[i].object == object)
+        {
+            return _table[i].writer;
+        }
+    }
+    return 0;
+}
+
+void
+IcePy::ObjectMap::insert(PyObject* object, const Ice::ObjectPtr& writer)
+{
+    assert(object);
+
+    //
+    // Keep the load factor below 1/2.
+    //
+    if(2 * (_size + 1) > _table.size())
+    {
+        rehash();
+    }
+
+    size_t mask = _table.size() - 1;
+    size_t i = hash(object) & mask;
+    while(_table[i].object && _table[i].object != object)
+    {
+        i = (i + 1) & mask;
+    }
+    if(!_table[i].object)
+    {
+        _table[i].object = object;
+        ++_size;
+    }
+    _table[i].writer = writer;
+}
+
+size_t
+IcePy::ObjectMap::hash(PyObject* object)
+{
+    //
+    // The low bits of the address are the same for all the objects because of their alignment.
+    //
+    size_t h = reinterpret_cast<size_t>(object) >> 4;
+    return h ^ (h >> 16);
+}
+
+void
+IcePy::ObjectMap::rehash()
+{
+    vector<Entry> table(_table.empty() ? 16 : _table.size() * 2);
+    size_t mask = table.size() - 1;
+    for(vector<Entry>::const_iterator p = _table.begin(); p != _table.end(); ++p)
+    {
+        if(p->object)
+        {
+            size_t i = hash(p->object) & mask;
+            while(table[i].object)
+            {
+                i = (i + 1) & mask;
+            }
+            table[i] = *p;
+        }
+    }
+    _table.swap(table);
+}
+
+namespace
+{
+
+//
+// Marshaling or unmarshaling a graph of class instances creates an ObjectWriter or an ObjectReader
+// for each instance. WrapperPool keeps the memory of the wrappers released by a request in a free
+// list so that the next requests reuse it instead of going through the allocator for each instance.
+// The wrappers are created and destroyed with the GIL held, which also protects the pools.
+//
+struct FreeBlock
+{
+    FreeBlock* next;
+};
+
+const size_t maxPooledWrappers = 16384;
+
+//
+// A POD type, the pools are zero-initialized and don't depend on the order of static destruction.
+//
+struct WrapperPool
+{
+    FreeBlock* head;
+    size_t count;
+
+    void* allocate(size_t sz)
+    {
+        if(head)
+        {
+            FreeBlock* block = head;
+            head = block->next;
+            --count;
+            return block;
+        }
+        return ::operator new(sz);
+    }
+
+    void deallocate(void* p)
+    {
+        if(count < maxPooledWrappers)
+        {
+            FreeBlock* block = static_cast<FreeBlock*>(p);
+            block->next = head;
+            head = block;
+            ++count;
+        }
+        else
+        {
+            ::operator delete(p);
+        }
+    }
+};
+
+WrapperPool objectWriterPool;
+WrapperPool objectReaderPool;
+
+}
+
 //
 // ObjectWriter implementation.
 //
+void*
+IcePy::ObjectWriter::operator new(size_t sz)
+{
+    return sz == sizeof(ObjectWriter) ? objectWriterPool.allocate(sz) : ::operator new(sz);
+}
+
+void
+IcePy::ObjectWriter::operator delete(void* p, size_t sz)
+{
+    if(sz == sizeof(ObjectWriter))
+    {
+        objectWriterPool.deallocate(p);
+    }
+    else
+    {
+        ::operator delete(p);
+    }
+}
+
 IcePy::ObjectWriter::ObjectWriter(PyObject* object, ObjectMap* objectMap, const ValueInfoPtr& formal) :
     _object(object), _map(objectMap), _formal(formal)
 {
@@ -3878,7 +5428,7 @@ IcePy::ObjectWriter::writeMembers(Ice::OutputStream* os, const DataMemberList& m
 
         char* memberName = const_cast<char*>(member->name.c_str());
 
-        PyObjectHandle val = getAttr(_object, member->name, true);
+        PyObjectHandle val = member->getMember(_object);
         if(!val.get())
         {
             if(member->optional)
@@ -3899,20 +5449,37 @@ IcePy::ObjectWriter::writeMembers(Ice::OutputStream* os, const DataMemberList& m
             continue;
         }
 
-        if(!member->type->validate(val.get()))
+        if(!member->type->marshalChecked(val.get(), os, _map, member->optional, &member->metaData))
         {
             PyErr_Format(PyExc_ValueError, STRCAST("invalid value for %s member `%s'"),
                          const_cast<char*>(_info->id.c_str()), memberName);
             throw AbortMarshaling();
         }
-
-        member->type->marshal(val.get(), os, _map, member->optional, &member->metaData);
     }
 }
 
 //
 // ObjectReader implementation.
 //
+void*
+IcePy::ObjectReader::operator new(size_t sz)
+{
+    return sz == sizeof(ObjectReader) ? objectReaderPool.allocate(sz) : ::operator new(sz);
+}
+
+void
+IcePy::ObjectReader::operator delete(void* p, size_t sz)
+{
+    if(sz == sizeof(ObjectReader))
+    {
+        objectReaderPool.deallocate(p);
+    }
+    else
+    {
+        ::operator delete(p);
+    }
+}
+
 IcePy::ObjectReader::ObjectReader(PyObject* object, const ValueInfoPtr& info) :
     _object(object), _info(info)
 {
@@ -3979,7 +5546,7 @@ IcePy::ObjectReader::_iceRead(Ice::InputStream* is)
                 {
                     member->type->unmarshal(is, member, _object, 0, true, &member->metaData);
                 }
-                else if(PyObject_SetAttrString(_object, const_cast<char*>(member->name.c_str()), Unset) < 0)
+                else if(!member->setMember(_object, Unset))
                 {
                     assert(PyErr_Occurred());
                     throw AbortMarshaling();
@@ -4129,7 +5696,7 @@ IcePy::ExceptionInfo::writeMembers(PyObject* p, Ice::OutputStream* os, const Dat
 
         char* memberName = const_cast<char*>(member->name.c_str());
 
-        PyObjectHandle val = getAttr(p, member->name, true);
+        PyObjectHandle val = member->getMember(p);
         if(!val.get())
         {
             if(member->optional)
@@ -4150,14 +5717,12 @@ IcePy::ExceptionInfo::writeMembers(PyObject* p, Ice::OutputStream* os, const Dat
             continue;
         }
 
-        if(!member->type->validate(val.get()))
+        if(!member->type->marshalChecked(val.get(), os, objectMap, member->optional, &member->metaData))
         {
             PyErr_Format(PyExc_ValueError, STRCAST("invalid value for %s member `%s'"),
                          const_cast<char*>(id.c_str()), memberName);
             throw AbortMarshaling();
         }
-
-        member->type->marshal(val.get(), os, objectMap, member->optional, &member->metaData);
     }
 }
 
@@ -4194,7 +5759,7 @@ IcePy::ExceptionInfo::unmarshal(Ice::InputStream* is)
             {
                 member->type->unmarshal(is, member, p.get(), 0, true, &member->metaData);
             }
-            else if(PyObject_SetAttrString(p.get(), const_cast<char*>(member->name.c_str()), Unset) < 0)
+            else if(!member->setMember(p.get(), Unset))
             {
                 assert(PyErr_Occurred());
                 throw AbortMarshaling();
@@ -4411,6 +5976,12 @@ IcePy::ExceptionReader::getSlicedData() const
 string
 IcePy::IdResolver::resolve(Ice::Int id) const
 {
+    if(id >= 0 && static_cast<size_t>(id) < _compactIdTable.size())
+    {
+        ValueInfoPtr info = _compactIdTable[static_cast<size_t>(id)];
+        return info ? info->id : string();
+    }
+
     CompactIdMap::iterator p = _compactIdMap.find(id);
     if(p != _compactIdMap.end())
     {
@@ -4425,12 +5996,7 @@ IcePy::IdResolver::resolve(Ice::Int id) const
 IcePy::ClassInfoPtr
 IcePy::lookupClassInfo(const string& id)
 {
-    ClassInfoMap::iterator p = _classInfoMap.find(id);
-    if(p != _classInfoMap.end())
-    {
-        return p->second;
-    }
-    return 0;
+    return _classInfoTable.find(id);
 }
 
 //
@@ -4439,12 +6005,7 @@ IcePy::lookupClassInfo(const string& id)
 IcePy::ValueInfoPtr
 IcePy::lookupValueInfo(const string& id)
 {
-    ValueInfoMap::iterator p = _valueInfoMap.find(id);
-    if(p != _valueInfoMap.end())
-    {
-        return p->second;
-    }
-    return 0;
+    return _valueInfoTable.find(id);
 }
 
 //
@@ -4453,12 +6014,7 @@ IcePy::lookupValueInfo(const string& id)
 IcePy::ExceptionInfoPtr
 IcePy::lookupExceptionInfo(const string& id)
 {
-    ExceptionInfoMap::iterator p = _exceptionInfoMap.find(id);
-    if(p != _exceptionInfoMap.end())
-    {
-        return p->second;
-    }
-    return 0;
+    return _exceptionInfoTable.find(id);
 }
 
 namespace IcePy
@@ -4696,6 +6252,61 @@ PyTypeObject BufferType =
     0,                               /* tp_is_gc */
 };
 
+static PySequenceMethods LazySequenceMethods =
+{
+    reinterpret_cast<lenfunc>(lazySequenceLength), /* sq_length */
+    0,                               /* sq_concat */
+    0,                               /* sq_repeat */
+    reinterpret_cast<ssizeargfunc>(lazySequenceItem), /* sq_item */
+};
+
+PyTypeObject LazySequenceType =
+{
+    /* The ob_type field must be initialized in the module init function
+     * to be portable to Windows without using C++. */
+    PyVarObject_HEAD_INIT(&PyType_Type, 0)
+    STRCAST("IcePy.LazySequence"),   /* tp_name */
+    sizeof(LazySequenceObject),      /* tp_basicsize */
+    0,                               /* tp_itemsize */
+    /* methods */
+    reinterpret_cast<destructor>(lazySequenceDealloc), /* tp_dealloc */
+    0,                               /* tp_print */
+    0,                               /* tp_getattr */
+    0,                               /* tp_setattr */
+    0,                               /* tp_reserved */
+    0,                               /* tp_repr */
+    0,                               /* tp_as_number */
+    &LazySequenceMethods,            /* tp_as_sequence */
+    0,                               /* tp_as_mapping */
+    0,                               /* tp_hash */
+    0,                               /* tp_call */
+    0,                               /* tp_str */
+    0,                               /* tp_getattro */
+    0,                               /* tp_setattro */
+    0,                               /* tp_as_buffer */
+    Py_TPFLAGS_DEFAULT,              /* tp_flags */
+    0,                               /* tp_doc */
+    0,                               /* tp_traverse */
+    0,                               /* tp_clear */
+    0,                               /* tp_richcompare */
+    0,                               /* tp_weaklistoffset */
+    0,                               /* tp_iter */
+    0,                               /* tp_iternext */
+    0,                               /* tp_methods */
+    0,                               /* tp_members */
+    0,                               /* tp_getset */
+    0,                               /* tp_base */
+    0,                               /* tp_dict */
+    0,                               /* tp_descr_get */
+    0,                               /* tp_descr_set */
+    0,                               /* tp_dictoffset */
+    0,                               /* tp_init */
+    0,                               /* tp_alloc */
+    reinterpret_cast<newfunc>(lazySequenceNew), /* tp_new */
+    0,                               /* tp_free */
+    0,                               /* tp_is_gc */
+};
+
 }
 
 bool
@@ -4731,6 +6342,16 @@ IcePy::initTypes(PyObject* module)
         return false;
     }
 
+    if(PyType_Ready(&LazySequenceType) < 0)
+    {
+        return false;
+    }
+    PyTypeObject* lazySequenceType = &LazySequenceType; // Necessary to prevent GCC's strict-alias warnings.
+    if(PyModule_AddObject(module, STRCAST("LazySequence"), reinterpret_cast<PyObject*>(lazySequenceType)) < 0)
+    {
+        return false;
+    }
+
     PrimitiveInfoPtr boolType = new PrimitiveInfo(PrimitiveInfo::KindBool);
     PyObjectHandle boolTypeObj = createType(boolType);
     if(PyModule_AddObject(module, STRCAST("_t_bool"), boolTypeObj.get()) < 0)
@@ -5141,7 +6762,16 @@ IcePy_defineValue(PyObject*, PyObject* args)
 
     info->define(type, compactId, preserve ? true : false, interface ? true : false, base, members);
 
-    if(info->compactId != -1)
+    if(info->compactId >= 0 && info->compactId < maxCompactIdTableSize)
+    {
+        size_t index = static_cast<size_t>(info->compactId);
+        if(index >= _compactIdTable.size())
+        {
+            _compactIdTable.resize(index + 1);
+        }
+        _compactIdTable[index] = info;
+    }
+    else if(info->compactId != -1)
     {
         CompactIdMap::iterator q = _compactIdMap.find(info->compactId);
         if(q != _compactIdMap.end())
@@ -9,6 +9,7 @@
 #include <Util.h>
 #include <Ice/FactoryTable.h>
 #include <Ice/Object.h>
+#include <Ice/OutputStream.h>
 #include <Ice/SlicedDataF.h>
 #include <IceUtil/OutputUtil.h>
 
@@ -38,7 +39,36 @@ class AbortMarshaling
 {
 };
 
-typedef std::map<PyObject*, Ice::ObjectPtr> ObjectMap;
+//
+// ObjectMap associates the Python objects being marshaled with the ObjectWriter that wraps them, so
+// that an object referenced several times in a graph is only marshaled once. It is a hash table of
+// the object addresses, which doesn't allocate anything until the first class instance is added.
+//
+class ObjectMap
+{
+public:
+
+    ObjectMap();
+
+    Ice::ObjectPtr find(PyObject*) const;
+    void insert(PyObject*, const Ice::ObjectPtr&);
+
+private:
+
+    struct Entry
+    {
+        Entry() : object(0) {}
+
+        PyObject* object;
+        Ice::ObjectPtr writer;
+    };
+
+    static size_t hash(PyObject*);
+    void rehash();
+
+    std::vector<Entry> _table; // Open addressing, the size of the table is always a power of two.
+    size_t _size;
+};
 
 class ObjectReader;
 typedef IceUtil::Handle<ObjectReader> ObjectReaderPtr;
@@ -88,6 +118,33 @@ private:
 };
 typedef IceUtil::Handle<ReadObjectCallback> ReadObjectCallbackPtr;
 
+//
+// A bounded table of string objects, used to share the string objects created for short
+// strings that are unmarshaled repeatedly, such as enumerator-like values and dictionary
+// keys. Each communicator has its own table. It must only be used with the GIL held.
+//
+class StringTable : public IceUtil::Shared
+{
+public:
+
+    StringTable();
+    ~StringTable();
+
+    //
+    // Returns a new reference to a string object with the given UTF-8 contents, or nil
+    // if an error occurs.
+    //
+    PyObject* get(const char*, size_t);
+
+    void clear();
+
+private:
+
+    typedef std::map<std::string, PyObject*> StringMap;
+    StringMap _strings;
+};
+typedef IceUtil::Handle<StringTable> StringTablePtr;
+
 //
 // This class assists during unmarshaling of Slice classes and exceptions.
 // We attach an instance to a stream.
@@ -117,10 +174,37 @@ public:
     static void setSlicedDataMember(PyObject*, const Ice::SlicedDataPtr&);
     static Ice::SlicedDataPtr getSlicedDataMember(PyObject*, ObjectMap*);
 
+    //
+    // Set the buffer that holds the data of the stream, if the buffer can be
+    // shared with Python objects.
+    //
+    void setBuffer(const BufferPtr&);
+
+    //
+    // Create a read-only memoryview that references the given range of the
+    // stream buffer. Returns nil if the stream has no buffer or the range is
+    // not within the buffer.
+    //
+    PyObject* createView(const char*, Py_ssize_t);
+
+    //
+    // Set the string table used to share the string objects created for short strings.
+    //
+    void setStringTable(const StringTablePtr&);
+
+    //
+    // Create a string object with the given UTF-8 contents, the string object is shared
+    // through the string table if the stream has one. Returns nil if an error occurs.
+    //
+    PyObject* internString(const char*, size_t);
+
 private:
 
     std::vector<ReadObjectCallbackPtr> _callbacks;
     std::set<ObjectReaderPtr> _readers;
+    BufferPtr _buffer;
+    PyObjectHandle _bufferObject;
+    StringTablePtr _stringTable;
     static PyObject* _slicedDataType;
     static PyObject* _sliceInfoType;
 };
@@ -150,6 +234,12 @@ public:
 
     virtual void unmarshaled(PyObject*, PyObject*, void*); // Default implementation is assert(false).
 
+    //
+    // Skip over a value of this type in the stream without unmarshaling it. Returns false if
+    // values of this type cannot be skipped, the stream position is undefined in this case.
+    //
+    virtual bool skip(Ice::InputStream*); // Default implementation returns false.
+
     virtual void destroy();
 
 protected:
@@ -166,6 +256,13 @@ public:
     virtual void unmarshal(Ice::InputStream*, const UnmarshalCallbackPtr&, PyObject*, void*, bool,
                            const Ice::StringSeq* = 0) = 0;
 
+    //
+    // Validates and marshals a value in a single pass. Returns false if the value is not valid, in
+    // which case nothing is written and the caller raises the error. The default implementation
+    // calls validate() and marshal().
+    //
+    virtual bool marshalChecked(PyObject*, Ice::OutputStream*, ObjectMap*, bool, const Ice::StringSeq* = 0);
+
     virtual void print(PyObject*, IceUtilInternal::Output&, PrintObjectHistory*) = 0;
 };
 typedef IceUtil::Handle<TypeInfo> TypeInfoPtr;
@@ -202,9 +299,16 @@ public:
     virtual void marshal(PyObject*, Ice::OutputStream*, ObjectMap*, bool, const Ice::StringSeq* = 0);
     virtual void unmarshal(Ice::InputStream*, const UnmarshalCallbackPtr&, PyObject*, void*, bool,
                            const Ice::StringSeq* = 0);
+    virtual bool marshalChecked(PyObject*, Ice::OutputStream*, ObjectMap*, bool, const Ice::StringSeq* = 0);
+    virtual bool skip(Ice::InputStream*);
 
     virtual void print(PyObject*, IceUtilInternal::Output&, PrintObjectHistory*);
 
+    //
+    // Returns a new reference to a value read from the stream, or nil if a Python error occurs.
+    //
+    PyObject* read(Ice::InputStream*) const;
+
     const Kind kind;
 };
 typedef IceUtil::Handle<PrimitiveInfo> PrimitiveInfoPtr;
@@ -231,6 +335,8 @@ public:
     virtual void marshal(PyObject*, Ice::OutputStream*, ObjectMap*, bool, const Ice::StringSeq* = 0);
     virtual void unmarshal(Ice::InputStream*, const UnmarshalCallbackPtr&, PyObject*, void*, bool,
                            const Ice::StringSeq* = 0);
+    virtual bool marshalChecked(PyObject*, Ice::OutputStream*, ObjectMap*, bool, const Ice::StringSeq* = 0);
+    virtual bool skip(Ice::InputStream*);
 
     virtual void print(PyObject*, IceUtilInternal::Output&, PrintObjectHistory*);
 
@@ -243,6 +349,14 @@ public:
     PyObject* pythonType; // Borrowed reference - the enclosing Python module owns the reference.
     const Ice::Int maxValue;
     const EnumeratorMap enumerators;
+
+private:
+
+    //
+    // Enumerators indexed by value, only used when the values are dense enough. The
+    // references are borrowed from the enumerators map.
+    //
+    std::vector<PyObject*> _enumeratorTable;
 };
 typedef IceUtil::Handle<EnumInfo> EnumInfoPtr;
 
@@ -250,13 +364,35 @@ class DataMember : public UnmarshalCallback
 {
 public:
 
+    DataMember();
+
     virtual void unmarshaled(PyObject*, PyObject*, void*);
 
+    //
+    // Get the value of this member in the given object. Returns a new reference,
+    // or nil (with no Python exception set) if the attribute is not defined.
+    //
+    PyObject* getMember(PyObject*);
+
+    //
+    // Set the value of this member in the given object. Returns false and sets a
+    // Python exception on failure.
+    //
+    bool setMember(PyObject*, PyObject*);
+
     std::string name;
+    PyObjectHandle nameObj; // Interned attribute name.
     std::vector<std::string> metaData;
     TypeInfoPtr type;
     bool optional;
     int tag;
+
+private:
+
+    PyObject** slotAddress(PyObject*);
+
+    unsigned int _slotVersionTag; // The version tag of the type of _slotOffset, 0 if none.
+    Py_ssize_t _slotOffset;
 };
 typedef IceUtil::Handle<DataMember> DataMemberPtr;
 typedef std::vector<DataMemberPtr> DataMemberList;
@@ -283,6 +419,7 @@ public:
     virtual void marshal(PyObject*, Ice::OutputStream*, ObjectMap*, bool, const Ice::StringSeq* = 0);
     virtual void unmarshal(Ice::InputStream*, const UnmarshalCallbackPtr&, PyObject*, void*, bool,
                            const Ice::StringSeq* = 0);
+    virtual bool skip(Ice::InputStream*);
 
     virtual void print(PyObject*, IceUtilInternal::Output&, PrintObjectHistory*);
 
@@ -302,6 +439,8 @@ private:
 };
 typedef IceUtil::Handle<StructInfo> StructInfoPtr;
 
+class PinnedBufferList;
+
 //
 // Sequence information.
 //
@@ -324,11 +463,20 @@ public:
     virtual void marshal(PyObject*, Ice::OutputStream*, ObjectMap*, bool, const Ice::StringSeq* = 0);
     virtual void unmarshal(Ice::InputStream*, const UnmarshalCallbackPtr&, PyObject*, void*, bool,
                            const Ice::StringSeq* = 0);
+    virtual bool skip(Ice::InputStream*);
 
     virtual void print(PyObject*, IceUtilInternal::Output&, PrintObjectHistory*);
 
     virtual void destroy();
 
+    //
+    // Marshal the size of a large primitive sequence that implements the buffer protocol and
+    // reserve room for its elements in the stream. The buffer is added to the given list, which
+    // copies the elements once all the arguments are marshaled. Returns false if the value
+    // must be marshaled with marshal() instead.
+    //
+    bool pin(PyObject*, Ice::OutputStream*, PinnedBufferList&);
+
     enum BuiltinType
     {
         BuiltinTypeBool = 0,
@@ -344,7 +492,8 @@ private:
 
     struct SequenceMapping : public UnmarshalCallback
     {
-        enum Type { SEQ_DEFAULT, SEQ_TUPLE, SEQ_LIST, SEQ_ARRAY, SEQ_NUMPYARRAY, SEQ_MEMORYVIEW };
+        enum Type { SEQ_DEFAULT, SEQ_TUPLE, SEQ_LIST, SEQ_ARRAY, SEQ_NUMPYARRAY, SEQ_NUMPYRECARRAY, SEQ_MEMORYVIEW,
+                    SEQ_LAZY };
 
         SequenceMapping(Type);
         SequenceMapping(const Ice::StringSeq&);
@@ -360,15 +509,34 @@ private:
 
         Type type;
         PyObjectHandle factory;
+        bool zeroCopy;
     };
     typedef IceUtil::Handle<SequenceMapping> SequenceMappingPtr;
 
     PyObject* getSequence(const PrimitiveInfoPtr&, PyObject*);
+    void marshalIterable(PyObject*, Ice::OutputStream*, ObjectMap*);
     void marshalPrimitiveSequence(const PrimitiveInfoPtr&, PyObject*, Ice::OutputStream*);
     void unmarshalPrimitiveSequence(const PrimitiveInfoPtr&, Ice::InputStream*, const UnmarshalCallbackPtr&,
                                     PyObject*, void*, const SequenceMappingPtr&);
 
-    PyObject* createSequenceFromMemory(const SequenceMappingPtr&, const char*, Py_ssize_t, BuiltinType, bool);
+    PyObject* createSequenceFromMemory(const SequenceMappingPtr&, Ice::InputStream*, const char*, Py_ssize_t,
+                                       BuiltinType, bool);
+
+    //
+    // Support for lazy sequences, the elements are unmarshaled when they are accessed.
+    //
+    PyObject* createLazySequence(Ice::InputStream*);
+
+    //
+    // Support for mapping sequences of fixed-size structures to NumPy record arrays.
+    //
+    PyObject* getRecArrayType();
+    bool marshalRecArray(PyObject*, Ice::OutputStream*);
+    void marshalStridedRecArray(PyObject*, Ice::OutputStream*);
+    void unmarshalRecArray(Ice::InputStream*, const UnmarshalCallbackPtr&, PyObject*, void*,
+                           const SequenceMappingPtr&);
+
+    PyObjectHandle _recArrayType;
 
 public:
 
@@ -378,11 +546,48 @@ public:
 };
 typedef IceUtil::Handle<SequenceInfo> SequenceInfoPtr;
 
+//
+// The buffers of the primitive sequences pinned with SequenceInfo::pin(). The buffers
+// are copied to the stream with the GIL released, so other Python threads can run while
+// large arguments are marshaled. The exporting objects cannot be resized while their
+// buffers are pinned.
+//
+class PinnedBufferList
+{
+public:
+
+    PinnedBufferList();
+    ~PinnedBufferList(); // Releases the buffers, must be called with the GIL held.
+
+    void add(const Py_buffer&, Ice::OutputStream::size_type);
+    bool empty() const;
+
+    //
+    // Copy the buffers to the reserved space in the stream, must be called with the GIL held.
+    //
+    void copy(Ice::OutputStream*);
+
+private:
+
+    struct PinnedBuffer
+    {
+        Py_buffer view;
+        Ice::OutputStream::size_type pos;
+    };
+    std::vector<PinnedBuffer> _buffers;
+};
+
 class Buffer : public IceUtil::Shared
 {
 public:
 
     Buffer(const char*, Py_ssize_t, SequenceInfo::BuiltinType);
+
+    //
+    // Take ownership of the contents of the given byte vector.
+    //
+    Buffer(std::vector<Ice::Byte>&);
+
     ~Buffer();
     const char* data() const;
     Py_ssize_t size() const;
@@ -393,6 +598,7 @@ private:
     const char* _data;
     const Py_ssize_t _size;
     const SequenceInfo::BuiltinType _type;
+    std::vector<Ice::Byte> _bytes;
 };
 
 //
@@ -447,6 +653,7 @@ public:
     virtual void marshal(PyObject*, Ice::OutputStream*, ObjectMap*, bool, const Ice::StringSeq* = 0);
     virtual void unmarshal(Ice::InputStream*, const UnmarshalCallbackPtr&, PyObject*, void*, bool,
                            const Ice::StringSeq* = 0);
+    virtual bool skip(Ice::InputStream*);
     virtual void unmarshaled(PyObject*, PyObject*, void*);
 
     virtual void print(PyObject*, IceUtilInternal::Output&, PrintObjectHistory*);
@@ -471,6 +678,13 @@ private:
 
     bool _variableLength;
     int _wireSize;
+
+    //
+    // Set if the key or value type is a primitive type, the entries are then read directly
+    // from the stream instead of through callbacks.
+    //
+    PrimitiveInfoPtr _primitiveKey;
+    PrimitiveInfoPtr _primitiveValue;
 };
 typedef IceUtil::Handle<DictionaryInfo> DictionaryInfoPtr;
 
@@ -621,6 +835,12 @@ public:
     ObjectWriter(PyObject*, ObjectMap*, const ValueInfoPtr&);
     ~ObjectWriter();
 
+    //
+    // The memory of the writers is recycled, see WrapperPool in Types.cpp.
+    //
+    static void* operator new(size_t);
+    static void operator delete(void*, size_t);
+
     virtual void ice_preMarshal();
 
     virtual void _iceWrite(Ice::OutputStream*) const;
@@ -646,6 +866,12 @@ public:
     ObjectReader(PyObject*, const ValueInfoPtr&);
     ~ObjectReader();
 
+    //
+    // The memory of the readers is recycled, see WrapperPool in Types.cpp.
+    //
+    static void* operator new(size_t);
+    static void operator delete(void*, size_t);
+
     virtual void ice_postUnmarshal();
 
     virtual void _iceWrite(Ice::OutputStream*) const;
@@ -682,6 +682,128 @@ IcePy::contextToDictionary(const Ice::Context& ctx, PyObject* dict)
     return true;
 }
 
+namespace
+{
+
+//
+// The number of context dictionaries cached by a communicator, and the size of the largest
+// dictionary that is cached.
+//
+const size_t maxCachedContexts = 8;
+const Py_ssize_t maxCachedContextSize = 32;
+
+}
+
+IcePy::ContextCache::ContextCache() :
+    _next(0)
+{
+}
+
+IcePy::ContextCache::~ContextCache()
+{
+    clear();
+}
+
+IcePy::SharedContextPtr
+IcePy::ContextCache::get(PyObject* dict)
+{
+    assert(PyDict_Check(dict));
+
+    for(vector<Entry>::const_iterator p = _entries.begin(); p != _entries.end(); ++p)
+    {
+        if(p->dict == dict && matches(*p, dict))
+        {
+            return p->context;
+        }
+    }
+
+    SharedContextPtr context = new SharedContext;
+    if(!dictionaryToContext(dict, context->context))
+    {
+        return 0;
+    }
+    add(dict, context);
+    return context;
+}
+
+void
+IcePy::ContextCache::add(PyObject* dict, const SharedContextPtr& context)
+{
+    assert(PyDict_Check(dict));
+
+    const Py_ssize_t sz = PyDict_Size(dict);
+    if(sz > maxCachedContextSize)
+    {
+        return;
+    }
+
+    vector<Entry>::iterator slot = _entries.begin();
+    while(slot != _entries.end() && slot->dict != dict)
+    {
+        ++slot;
+    }
+    if(slot == _entries.end())
+    {
+        if(_entries.size() < maxCachedContexts)
+        {
+            _entries.push_back(Entry());
+            slot = _entries.end() - 1;
+        }
+        else
+        {
+            slot = _entries.begin() + _next;
+            _next = (_next + 1) % maxCachedContexts;
+        }
+    }
+
+    //
+    // Keep a reference to the keys and values, so that they can be compared by identity.
+    //
+    slot->dict = dict;
+    slot->items.clear();
+    slot->items.reserve(static_cast<size_t>(sz));
+    Py_ssize_t pos = 0;
+    PyObject* key;
+    PyObject* value;
+    while(PyDict_Next(dict, &pos, &key, &value))
+    {
+        slot->items.push_back(make_pair(PyObjectHandle(incRef(key)), PyObjectHandle(incRef(value))));
+    }
+    slot->context = context;
+}
+
+void
+IcePy::ContextCache::clear()
+{
+    _entries.clear();
+    _next = 0;
+}
+
+bool
+IcePy::ContextCache::matches(const Entry& entry, PyObject* dict) const
+{
+    //
+    // The dictionary may have been modified, or the entry may refer to a dictionary that was
+    // destroyed and whose address is now used by another dictionary. The cached context can be
+    // used if the dictionary holds the same key and value objects. The keys and values are
+    // strings which are immutable.
+    //
+    if(PyDict_Size(dict) != static_cast<Py_ssize_t>(entry.items.size()))
+    {
+        return false;
+    }
+
+    for(vector<pair<PyObjectHandle, PyObjectHandle> >::const_iterator p = entry.items.begin();
+        p != entry.items.end(); ++p)
+    {
+        if(PyDict_GetItem(dict, p->first.get()) != p->second.get())
+        {
+            return false;
+        }
+    }
+    return true;
+}
+
 PyObject*
 IcePy::lookupType(const string& typeName)
 {
@@ -924,23 +1046,60 @@ convertLocalException(const Ice::LocalException& ex, PyObject* p)
     }
 }
 
+namespace
+{
+
+//
+// Maps the type ID of a local exception to its Python type. It's only accessed with the GIL held.
+//
+typedef map<string, PyObject*> ExceptionTypeMap;
+ExceptionTypeMap _localExceptionTypes;
+
+PyObject*
+lookupLocalExceptionType(const string& id)
+{
+    ExceptionTypeMap::const_iterator p = _localExceptionTypes.find(id);
+    if(p != _localExceptionTypes.end())
+    {
+        return p->second;
+    }
+
+    PyObject* type = IcePy::lookupType(scopedToName(id));
+    if(type)
+    {
+        //
+        // Keep a reference, the map outlives the module that defines the type.
+        //
+        Py_INCREF(type);
+        _localExceptionTypes.insert(ExceptionTypeMap::value_type(id, type));
+    }
+    return type;
+}
+
+void
+setUnknown(PyObject* p, const Ice::Exception& ex)
+{
+    ostringstream ostr;
+    ostr << ex;
+    IcePy::PyObjectHandle s = IcePy::createString(ostr.str());
+    PyObject_SetAttrString(p, STRCAST("unknown"), s.get());
+}
+
+}
+
 PyObject*
 IcePy::convertException(const Ice::Exception& ex)
 {
     PyObjectHandle p;
     PyObject* type;
 
-    ostringstream ostr;
-    ostr << ex;
-    string str = ostr.str();
-
     try
     {
         ex.ice_throw();
     }
     catch(const Ice::LocalException& e)
     {
-        type = lookupType(scopedToName(e.ice_id()));
+        type = lookupLocalExceptionType(e.ice_id());
         if(type)
         {
             p = createExceptionInstance(type);
@@ -956,8 +1115,7 @@ IcePy::convertException(const Ice::Exception& ex)
             p = createExceptionInstance(type);
             if(p.get())
             {
-                PyObjectHandle s = createString(str);
-                PyObject_SetAttrString(p.get(), STRCAST("unknown"), s.get());
+                setUnknown(p.get(), ex);
             }
         }
     }
@@ -968,8 +1126,7 @@ IcePy::convertException(const Ice::Exception& ex)
         p = createExceptionInstance(type);
         if(p.get())
         {
-            PyObjectHandle s = createString(str);
-            PyObject_SetAttrString(p.get(), STRCAST("unknown"), s.get());
+            setUnknown(p.get(), ex);
         }
     }
     catch(const Ice::Exception&)
@@ -979,8 +1136,7 @@ IcePy::convertException(const Ice::Exception& ex)
         p = createExceptionInstance(type);
         if(p.get())
         {
-            PyObjectHandle s = createString(str);
-            PyObject_SetAttrString(p.get(), STRCAST("unknown"), s.get());
+            setUnknown(p.get(), ex);
         }
     }
 
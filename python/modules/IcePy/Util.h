@@ -9,6 +9,8 @@
 #include <Ice/BuiltinSequences.h>
 #include <Ice/Current.h>
 #include <Ice/Exception.h>
+#include <IceUtil/Handle.h>
+#include <IceUtil/Shared.h>
 
 //
 // These macros replace Py_RETURN_FALSE and Py_RETURN_TRUE. We use these
@@ -70,18 +72,23 @@ inline PyObject* incTrue()
 //
 // Create a string object.
 //
-inline PyObject* createString(const std::string& str)
+inline PyObject* createString(const char* data, size_t size)
 {
 #if PY_VERSION_HEX >= 0x03000000
     //
     // PyUnicode_FromStringAndSize interprets the argument as UTF-8.
     //
-    return PyUnicode_FromStringAndSize(str.c_str(), static_cast<Py_ssize_t>(str.size()));
+    return PyUnicode_FromStringAndSize(data ? data : "", static_cast<Py_ssize_t>(size));
 #else
-    return PyString_FromStringAndSize(str.c_str(), static_cast<Py_ssize_t>(str.size()));
+    return PyString_FromStringAndSize(data ? data : "", static_cast<Py_ssize_t>(size));
 #endif
 }
 
+inline PyObject* createString(const std::string& str)
+{
+    return createString(str.c_str(), str.size());
+}
+
 //
 // Obtain a string from a string object; None is also legal.
 //
@@ -199,6 +206,59 @@ bool tupleToStringSeq(PyObject*, Ice::StringSeq&);
 bool dictionaryToContext(PyObject*, Ice::Context&);
 bool contextToDictionary(const Ice::Context&, PyObject*);
 
+//
+// A converted context that can be shared by several invocations.
+//
+class SharedContext : public IceUtil::Shared
+{
+public:
+
+    Ice::Context context;
+};
+typedef IceUtil::Handle<SharedContext> SharedContextPtr;
+
+//
+// Caches the conversion of the context dictionaries passed to invocations. A dictionary that
+// is passed to many invocations, such as a tracing context, is only converted once: the cached
+// context is reused as long as the dictionary holds the same key and value objects. Each
+// communicator has its own cache. It must only be used with the GIL held.
+//
+class ContextCache : public IceUtil::Shared
+{
+public:
+
+    ContextCache();
+    ~ContextCache();
+
+    //
+    // Returns the context for the given dictionary, or nil if the dictionary is not a valid
+    // context in which case a Python exception is set.
+    //
+    SharedContextPtr get(PyObject*);
+
+    //
+    // Adds a dictionary whose conversion is already known.
+    //
+    void add(PyObject*, const SharedContextPtr&);
+
+    void clear();
+
+private:
+
+    struct Entry
+    {
+        PyObject* dict; // Not a reference, only used to find the entry.
+        std::vector<std::pair<PyObjectHandle, PyObjectHandle> > items;
+        SharedContextPtr context;
+    };
+
+    bool matches(const Entry&, PyObject*) const;
+
+    std::vector<Entry> _entries;
+    size_t _next;
+};
+typedef IceUtil::Handle<ContextCache> ContextCachePtr;
+
 //
 // Returns a borrowed reference to the Python type object corresponding
 // to the given Python type name.
@@ -6,7 +6,7 @@
 # This file should only be used in Python >= 3.5.
 #
 
-import asyncio
+import asyncio, collections, logging, sys, threading, weakref
 
 #
 # This class defines an __await__ method so that coroutines can call 'await <future>'.
@@ -29,9 +29,11 @@ def wrap_future(future, *, loop=None):
     if loop is None:
         loop = asyncio.get_event_loop()
 
-    af = asyncio.Future()
+    af = loop.create_future()
 
     def callback():
+        if af.done():
+            return
         if future.cancelled():
             af.cancel()
         elif future.exception():
@@ -39,5 +41,149 @@ def wrap_future(future, *, loop=None):
         else:
             af.set_result(future.result())
 
-    future.add_done_callback(lambda f: loop.call_soon_threadsafe(callback))
+    #
+    # Completions for the same loop are batched so that a burst of replies only wakes up the loop once.
+    #
+    adapter = _getEventLoopAdapter(loop)
+    future.add_done_callback(lambda f: adapter.call_soon(callback))
     return af
+
+class EventLoopAdapter(object):
+    '''Binds a communicator to an asyncio event loop. Completions posted from Ice threads are queued and
+processed in batches on the event loop, so only the first completion of a batch needs to wake up the loop.
+The adapter only keeps a weak reference to the loop, which must be kept alive by the application.'''
+
+    def __init__(self, loop):
+        self._loop = weakref.ref(loop)
+        self._lock = threading.Lock()
+        self._pending = collections.deque()
+        self._scheduled = False
+
+    def getEventLoop(self):
+        return self._loop()
+
+    def call_soon(self, fn, *args):
+        '''Schedule fn(*args) on the event loop. This method can be called from any thread.'''
+        self._pending.append((fn, args))
+        with self._lock:
+            if self._scheduled:
+                return
+            self._scheduled = True
+        loop = self._loop()
+        if loop is not None: # Nothing can run the callbacks once the loop is gone.
+            loop.call_soon_threadsafe(self._run)
+
+    def createFuture(self, operation, asyncResult):
+        return InvocationFuture(self, operation, asyncResult)
+
+    def dispatch(self, cb, coro):
+        self.call_soon(self._dispatch, cb, coro)
+
+    def _run(self):
+        with self._lock:
+            self._scheduled = False
+        #
+        # Anything appended after the flag is cleared either gets processed by this loop or schedules another run.
+        #
+        pending = self._pending
+        while pending:
+            fn, args = pending.popleft()
+            try:
+                fn(*args)
+            except:
+                logging.getLogger("Ice.EventLoopAdapter").exception('callback raised exception')
+
+    def _dispatch(self, cb, coro):
+        def handler(task):
+            try:
+                cb.response(task.result())
+            except:
+                cb.exception(sys.exc_info()[1])
+        self._loop().create_task(coro).add_done_callback(handler)
+
+class InvocationFuture(asyncio.Future):
+    '''The asyncio counterpart of Ice.InvocationFuture, returned by asynchronous proxy invocations when the
+communicator is configured with an event loop. The Ice run time completes it from its own threads, so
+set_result and set_exception are queued on the event loop rather than applied immediately.'''
+
+    def __init__(self, adapter, operation, asyncResult):
+        asyncio.Future.__init__(self, loop=adapter.getEventLoop())
+        self._adapter = adapter
+        self._operation = operation
+        self._asyncResult = asyncResult # May be None for a batch invocation.
+        self._sent = False
+        self._sentSynchronously = False
+        self._sentCallbacks = []
+
+    def cancel(self):
+        if self._asyncResult:
+            self._asyncResult.cancel()
+        return asyncio.Future.cancel(self)
+
+    def set_result(self, result):
+        self._adapter.call_soon(self._setResult, result)
+
+    def set_exception(self, ex):
+        self._adapter.call_soon(self._setException, ex)
+
+    def set_sent(self, sentSynchronously):
+        self._adapter.call_soon(self._setSent, sentSynchronously)
+
+    def is_sent(self):
+        return self._sent
+
+    def is_sent_synchronously(self):
+        return self._sentSynchronously
+
+    def add_sent_callback(self, fn):
+        if not self._sent:
+            self._sentCallbacks.append(fn)
+        else:
+            self.get_loop().call_soon(fn, self, self._sentSynchronously)
+
+    def operation(self):
+        return self._operation
+
+    def proxy(self):
+        return self._asyncResult.getProxy()
+
+    def connection(self):
+        return self._asyncResult.getConnection()
+
+    def communicator(self):
+        return self._asyncResult.getCommunicator()
+
+    def get_loop(self):
+        return self._adapter.getEventLoop()
+
+    def _setResult(self, result):
+        if not self.done():
+            asyncio.Future.set_result(self, result)
+
+    def _setException(self, ex):
+        if not self.done():
+            asyncio.Future.set_exception(self, ex)
+
+    def _setSent(self, sentSynchronously):
+        if self._sent:
+            return
+        self._sent = True
+        self._sentSynchronously = sentSynchronously
+        callbacks = self._sentCallbacks
+        self._sentCallbacks = []
+        for callback in callbacks:
+            try:
+                callback(self, sentSynchronously)
+            except:
+                logging.getLogger("Ice.Future").exception('sent callback raised exception')
+
+_adapters = weakref.WeakKeyDictionary()
+_adaptersLock = threading.Lock()
+
+def _getEventLoopAdapter(loop):
+    with _adaptersLock:
+        adapter = _adapters.get(loop)
+        if adapter is None:
+            adapter = EventLoopAdapter(loop)
+            _adapters[loop] = adapter
+        return adapter
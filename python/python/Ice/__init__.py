@@ -6,7 +6,8 @@
 Ice module
 """
 
-import sys, string, os, threading, warnings, datetime, logging, time, inspect, traceback, types, array
+import sys, string, os, threading, warnings, datetime, logging, time, inspect, traceback, types, array, collections
+import errno, select, signal, socket
 
 #
 # RTTI problems can occur in C++ code unless we modify Python's dlopen flags.
@@ -75,100 +76,101 @@ def Python35():
     return sys.version_info[:2] >= (3, 5)
 
 if Python35():
-    from Ice.Py3.IceFuture import FutureBase, wrap_future
+    from Ice.Py3.IceFuture import FutureBase, wrap_future, EventLoopAdapter
 else:
     FutureBase = object
 
+#
+# Futures don't use locks to protect their state. We rely instead on the global interpreter lock: reading
+# or assigning an attribute, and appending to or popping from a deque, are atomic operations.
+#
+# - A future can be completed only once: the thread completing the future must first pop the single
+#   token from the _completion list.
+# - The result or exception is assigned before the state, so a reader that sees a completed state also
+#   sees the result.
+# - A callback is appended to its deque before the state is checked again, while the completing thread
+#   updates the state before draining the deque. Each callback is popped, and therefore called, once
+#   by whichever thread gets to it first.
+# - Threads waiting for the future register a callback that sets a threading.Event.
+#
+# Completing a future that has no callbacks and no waiters, or reading the result of a completed
+# future, therefore never acquires a lock.
+#
 class Future(FutureBase):
     def __init__(self):
         self._result = None
         self._exception = None
-        self._condition = threading.Condition()
-        self._doneCallbacks = []
+        self._completion = [None]
+        self._doneCallbacks = collections.deque()
         self._state = Future.StateRunning
 
     def cancel(self):
-        callbacks = []
-        with self._condition:
-            if self._state == Future.StateDone:
-                return False
-
-            if self._state == Future.StateCancelled:
-                return True
-
-            self._state = Future.StateCancelled
-            callbacks = self._doneCallbacks
-            self._doneCallbacks = []
-            self._condition.notify_all()
+        try:
+            self._completion.pop()
+        except IndexError:
+            return self._state == Future.StateCancelled
 
-        self._callCallbacks(callbacks)
+        self._state = Future.StateCancelled
+        self._callCallbacks(self._doneCallbacks)
 
         return True
 
     def cancelled(self):
-        with self._condition:
-            return self._state == Future.StateCancelled
+        return self._state == Future.StateCancelled
 
     def running(self):
-        with self._condition:
-            return self._state == Future.StateRunning
+        return self._state == Future.StateRunning
 
     def done(self):
-        with self._condition:
-            return self._state in [Future.StateCancelled, Future.StateDone]
+        return self._state != Future.StateRunning
 
     def add_done_callback(self, fn):
-        with self._condition:
+        if self._state == Future.StateRunning:
+            self._doneCallbacks.append(fn)
             if self._state == Future.StateRunning:
-                self._doneCallbacks.append(fn)
                 return
-        fn(self)
+            # The future completed concurrently, make sure the callback isn't missed.
+            self._callCallbacks(self._doneCallbacks)
+        else:
+            fn(self)
 
     def result(self, timeout=None):
-        with self._condition:
-            if not self._wait(timeout, lambda: self._state == Future.StateRunning):
-                raise TimeoutException()
-            if self._state == Future.StateCancelled:
-                raise InvocationCanceledException()
-            elif self._exception:
-                raise self._exception
-            else:
-                return self._result
+        if self._state == Future.StateRunning and not self._wait(timeout, Future.running, self._doneCallbacks):
+            raise TimeoutException()
+        if self._state == Future.StateCancelled:
+            raise InvocationCanceledException()
+        elif self._exception:
+            raise self._exception
+        else:
+            return self._result
 
     def exception(self, timeout=None):
-        with self._condition:
-            if not self._wait(timeout, lambda: self._state == Future.StateRunning):
-                raise TimeoutException()
-            if self._state == Future.StateCancelled:
-                raise InvocationCanceledException()
-            else:
-                return self._exception
+        if self._state == Future.StateRunning and not self._wait(timeout, Future.running, self._doneCallbacks):
+            raise TimeoutException()
+        if self._state == Future.StateCancelled:
+            raise InvocationCanceledException()
+        else:
+            return self._exception
 
     def set_result(self, result):
-        callbacks = []
-        with self._condition:
-            if self._state != Future.StateRunning:
-                return
-            self._result = result
-            self._state = Future.StateDone
-            callbacks = self._doneCallbacks
-            self._doneCallbacks = []
-            self._condition.notify_all()
-
-        self._callCallbacks(callbacks)
+        try:
+            self._completion.pop()
+        except IndexError:
+            return
+        self._result = result
+        self._state = Future.StateDone
+        if self._doneCallbacks:
+            self._callCallbacks(self._doneCallbacks)
 
     def set_exception(self, ex):
-        callbacks = []
-        with self._condition:
-            if self._state != Future.StateRunning:
-                return
-            self._exception = ex
-            self._state = Future.StateDone
-            callbacks = self._doneCallbacks
-            self._doneCallbacks = []
-            self._condition.notify_all()
-
-        self._callCallbacks(callbacks)
+        try:
+            self._completion.pop()
+        except IndexError:
+            return
+        self._exception = ex
+        self._state = Future.StateDone
+        if self._doneCallbacks:
+            self._callCallbacks(self._doneCallbacks)
 
     @staticmethod
     def completed(result):
@@ -176,24 +178,42 @@ class Future(FutureBase):
         f.set_result(result)
         return f
 
-    def _wait(self, timeout, testFn=None):
-        # Must be called with _condition acquired
+    def _wait(self, timeout, testFn, *callbacks):
+        # Wait until testFn returns False or the timeout expires. The event is set by a callback registered
+        # with each of the given callback deques; testFn is checked again after registering it, so a
+        # concurrent completion can't be missed.
+        event = threading.Event()
+        setter = lambda *args: event.set()
+        for c in callbacks:
+            c.append(setter)
 
-        while testFn():
+        try:
             if timeout:
-                start = time.time()
-                self._condition.wait(timeout)
-                # Subtract the elapsed time so far from the timeout
-                timeout -= (time.time() - start)
-                if timeout <= 0:
-                    return False
+                deadline = time.time() + timeout
+                while testFn(self):
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        return False
+                    event.wait(remaining)
             else:
-                self._condition.wait()
+                while testFn(self):
+                    event.wait()
 
-        return True
+            return True
+        finally:
+            # Remove the setter if it wasn't called, otherwise repeated waits that time out would grow the deques.
+            for c in callbacks:
+                try:
+                    c.remove(setter)
+                except ValueError:
+                    pass
 
     def _callCallbacks(self, callbacks):
-        for callback in callbacks:
+        while True:
+            try:
+                callback = callbacks.popleft()
+            except IndexError:
+                return
             try:
                 callback(self)
             except:
@@ -214,7 +234,8 @@ class InvocationFuture(Future):
         self._asyncResult = asyncResult # May be None for a batch invocation.
         self._sent = False
         self._sentSynchronously = False
-        self._sentCallbacks = []
+        self._sentCompletion = [None]
+        self._sentCallbacks = collections.deque()
 
     def cancel(self):
         self._asyncResult.cancel()
@@ -227,26 +248,28 @@ class InvocationFuture(Future):
             except:
                 self._warn('done callback raised exception')
 
-        with self._condition:
+        if self._state == Future.StateRunning:
+            self._doneCallbacks.append(fn)
             if self._state == Future.StateRunning:
-                self._doneCallbacks.append(fn)
                 return
+            self._callCallbacks(self._doneCallbacks)
+            return
         self._asyncResult.callLater(callback)
 
     def is_sent(self):
-        with self._condition:
-            return self._sent
+        return self._sent
 
     def is_sent_synchronously(self):
-        with self._condition:
-            return self._sentSynchronously
+        return self._sentSynchronously
 
     def add_sent_callback(self, fn):
-        with self._condition:
+        if not self._sent:
+            self._sentCallbacks.append(fn)
             if not self._sent:
-                self._sentCallbacks.append(fn)
                 return
-        fn(self, self._sentSynchronously)
+            self._callSentCallbacks()
+        else:
+            fn(self, self._sentSynchronously)
 
     def add_sent_callback_async(self, fn):
         def callback():
@@ -255,40 +278,35 @@ class InvocationFuture(Future):
             except:
                 self._warn('sent callback raised exception')
 
-        with self._condition:
+        if not self._sent:
+            self._sentCallbacks.append(fn)
             if not self._sent:
-                self._sentCallbacks.append(fn)
                 return
+            self._callSentCallbacks()
+            return
         self._asyncResult.callLater(callback)
 
     def sent(self, timeout=None):
-        with self._condition:
-            if not self._wait(timeout, lambda: not self._sent):
-                raise TimeoutException()
-            if self._state == Future.StateCancelled:
-                raise InvocationCanceledException()
-            elif self._exception:
-                raise self._exception
-            else:
-                return self._sentSynchronously
+        if self._waitingForSent() and \
+           not self._wait(timeout, InvocationFuture._waitingForSent, self._sentCallbacks, self._doneCallbacks):
+            raise TimeoutException()
+        if self._state == Future.StateCancelled:
+            raise InvocationCanceledException()
+        elif self._exception:
+            raise self._exception
+        else:
+            return self._sentSynchronously
 
     def set_sent(self, sentSynchronously):
-        callbacks = []
-        with self._condition:
-            if self._sent:
-                return
+        try:
+            self._sentCompletion.pop()
+        except IndexError:
+            return
 
-            self._sent = True
-            self._sentSynchronously = sentSynchronously
-            callbacks = self._sentCallbacks
-            self._sentCallbacks = []
-            self._condition.notify_all()
-
-        for callback in callbacks:
-            try:
-                callback(self, sentSynchronously)
-            except Exception:
-                self._warn('sent callback raised exception')
+        self._sentSynchronously = sentSynchronously
+        self._sent = True
+        if self._sentCallbacks:
+            self._callSentCallbacks()
 
     def operation(self):
         return self._operation
@@ -302,6 +320,22 @@ class InvocationFuture(Future):
     def communicator(self):
         return self._asyncResult.getCommunicator()
 
+    def _waitingForSent(self):
+        # The future can complete with an exception without being sent.
+        return not self._sent and self._state == Future.StateRunning
+
+    def _callSentCallbacks(self):
+        callbacks = self._sentCallbacks
+        while True:
+            try:
+                callback = callbacks.popleft()
+            except IndexError:
+                return
+            try:
+                callback(self, self._sentSynchronously)
+            except Exception:
+                self._warn('sent callback raised exception')
+
     def _warn(self, msg):
         communicator = self.communicator()
         if communicator:
@@ -322,6 +356,12 @@ _struct_marker = object()
 #
 class Value(object):
 
+    #
+    # No instance dictionary is necessary here, this allows subclasses generated
+    # with __slots__ to be allocated without one.
+    #
+    __slots__ = ()
+
     def ice_id(self):
         '''Obtains the type id corresponding to the most-derived Slice
 interface supported by the target object.
@@ -405,7 +445,11 @@ Returns:
 
     def _iceDispatch(self, cb, method, args):
         # Invoke the given servant method. Exceptions can propagate to the caller.
-        result = method(*args)
+        self._iceDispatchResult(cb, method(*args))
+
+    def _iceDispatchResult(self, cb, result):
+        # IcePy calls the servant method directly when the servant doesn't override _iceDispatch, and only
+        # calls this method for results that aren't plain values.
 
         # Check for a future.
         if isinstance(result, Future) or callable(getattr(result, "add_done_callback", None)):
@@ -416,7 +460,12 @@ Returns:
                     cb.exception(sys.exc_info()[1])
             result.add_done_callback(handler)
         elif Python35() and inspect.iscoroutine(result): # The iscoroutine() function was added in Python 3.5.
-            self._iceDispatchCoroutine(cb, result)
+            eventLoopAdapter = cb.eventLoopAdapter()
+            if eventLoopAdapter:
+                # Run the coroutine as a task on the communicator's event loop.
+                eventLoopAdapter.dispatch(cb, result)
+            else:
+                self._iceDispatchCoroutine(cb, result)
         else:
             cb.response(result)
 
@@ -506,69 +555,11 @@ Returns:
 '''
         return getattr(self, "_ice_slicedData", None);
 
-class EnumBase(object):
-    def __init__(self, _n, _v):
-        self._name = _n
-        self._value = _v
-
-    def __str__(self):
-        return self._name
-
-    __repr__ = __str__
-
-    def __hash__(self):
-        return self._value
-
-    def __lt__(self, other):
-        if isinstance(other, self.__class__):
-            return self._value < other._value;
-        elif other == None:
-            return False
-        return NotImplemented
-
-    def __le__(self, other):
-        if isinstance(other, self.__class__):
-            return self._value <= other._value;
-        elif other == None:
-            return False
-        return NotImplemented
-
-    def __eq__(self, other):
-        if isinstance(other, self.__class__):
-            return self._value == other._value;
-        elif other == None:
-            return False
-        return NotImplemented
-
-    def __ne__(self, other):
-        if isinstance(other, self.__class__):
-            return self._value != other._value;
-        elif other == None:
-            return False
-        return NotImplemented
-
-    def __gt__(self, other):
-        if isinstance(other, self.__class__):
-            return self._value > other._value;
-        elif other == None:
-            return False
-        return NotImplemented
-
-    def __ge__(self, other):
-        if isinstance(other, self.__class__):
-            return self._value >= other._value;
-        elif other == None:
-            return False
-        return NotImplemented
-
-    def _getName(self):
-        return self._name
-
-    def _getValue(self):
-        return self._value
-
-    name = property(_getName)
-    value = property(_getValue)
+#
+# The base class of the generated enumerations. The name and value of an enumerator
+# are stored in the IcePy type so that the marshaling code can read them directly.
+#
+EnumBase = IcePy.EnumBase
 
 class SlicedData(object):
     #
@@ -611,6 +602,27 @@ class UnknownSlicedValue(Value):
     def ice_id(self):
         return self.unknownTypeId
 
+class SizedIterator(object):
+    '''Wraps an iterator or generator and its length so that it can be passed
+where a Slice sequence is expected. The elements are marshaled as they are
+produced by the iterator, without creating an intermediate list. The iterator
+must produce exactly length elements.'''
+
+    def __init__(self, iterable, length):
+        self._iterable = iterable
+        self._length = length
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        return iter(self._iterable)
+
+#
+# Elements of sequences mapped with the python:seq:lazy metadata are unmarshaled on demand.
+#
+LazySequence = IcePy.LazySequence
+
 def getSliceDir():
     '''Convenience function for locating the directory containing the Slice files.'''
 
@@ -853,6 +865,39 @@ define the enqueue method.'''
         '''Invoked when a request is batched.'''
         pass
 
+class MarshaledArgs(object):
+    '''The in parameters of an operation, marshaled once with the encoding
+of the given proxy. The arguments can then be sent to any proxy of an
+interface that provides this operation and that uses the same encoding,
+without marshaling them again.'''
+
+    def __init__(self, proxy, operation, args=()):
+        self._op = MarshaledArgs._findOperation(type(proxy), operation)
+        self._args = self._op.marshal(proxy, tuple(args))
+
+    def invoke(self, proxy, context=None):
+        '''Invokes the operation on the given proxy with the marshaled
+arguments and returns the operation's results.'''
+        return self._op.invoke(proxy, (self._args, context))
+
+    def invokeAsync(self, proxy, context=None):
+        '''Invokes the operation on the given proxy with the marshaled
+arguments and returns a future for the operation's results.'''
+        return self._op.invokeAsync(proxy, (self._args, context))
+
+    @staticmethod
+    def _findOperation(prxType, operation):
+        #
+        # The operations are defined by the skeleton class that corresponds to each proxy class.
+        #
+        for cls in prxType.__mro__:
+            if cls.__name__.endswith('Prx'):
+                skel = getattr(sys.modules.get(cls.__module__), cls.__name__[:-3], None)
+                op = getattr(skel, '_op_' + operation, None)
+                if op:
+                    return op
+        raise ValueError("`{0}' is not an operation of `{1}'".format(operation, prxType.__name__))
+
 #
 # Initialization data.
 #
@@ -880,6 +925,17 @@ batchRequestInterceptor: A callable that will be invoked when a batch request is
     enqueue method on the BatchRequest object.
 
 valueFactoryManager: An object that implements ValueFactoryManager.
+
+eventLoop: An asyncio event loop (Python 3.5 or later). When set, asynchronous proxy invocations
+    return asyncio futures bound to this loop, and servant coroutines are run as tasks on this loop.
+
+observer: An object that implements Ice.Instrumentation.CommunicatorObserver. Methods that are not
+    overridden or that return None don't attach an observer.
+
+observerSampleRate: Invocation and dispatch observers are only requested for one out of every
+    observerSampleRate requests (default 1). Requests that are not sampled don't call into Python.
+    The bytes sent and received by connections and the state changes of threads are accumulated
+    and reported once every observerSampleRate calls, and when the observer is detached.
 '''
     def __init__(self):
         self.properties = None
@@ -890,6 +946,107 @@ valueFactoryManager: An object that implements ValueFactoryManager.
         self.dispatcher = None
         self.batchRequestInterceptor = None
         self.valueFactoryManager = None
+        self.eventLoop = None
+        self.observer = None
+        self.observerSampleRate = 1
+
+#
+# Helpers for waitForShutdown, waitForHold and waitForDeactivate.
+#
+
+class _WakeUp(object):
+    '''Wakes up the main thread blocked in wait() when set() is called by another thread. While it is in
+use, it is also installed as the wakeup fd of the signal module so that a signal received by the process
+wakes up the main thread, which then runs the Python signal handlers immediately.'''
+
+    def __init__(self):
+        self._r, self._w = socket.socketpair()
+        self._r.setblocking(False)
+        self._w.setblocking(False)
+        self._lock = threading.Lock()
+        self._set = False
+        self._closed = False
+        self._oldWakeupFd = None
+
+    def __enter__(self):
+        try:
+            self._oldWakeupFd = signal.set_wakeup_fd(self._w.fileno())
+        except ValueError:
+            pass # The platform doesn't support a socket as the wakeup fd, signals are still delivered on EINTR.
+        return self
+
+    def __exit__(self, type, value, traceback):
+        if self._oldWakeupFd is not None:
+            signal.set_wakeup_fd(self._oldWakeupFd)
+        with self._lock:
+            self._closed = True
+            self._r.close()
+            self._w.close()
+
+    def set(self):
+        with self._lock:
+            self._set = True
+            if not self._closed:
+                try:
+                    self._w.send(b"\0")
+                except socket.error:
+                    pass # The socket buffer is full, the main thread is already woken up.
+
+    def isSet(self):
+        return self._set
+
+    def wait(self):
+        try:
+            select.select([self._r], [], [])
+        except select.error as ex:
+            #
+            # With Python 2, select isn't retried after the signal handlers ran.
+            #
+            if ex.args[0] != errno.EINTR:
+                raise
+        try:
+            while self._r.recv(512):
+                pass
+        except socket.error:
+            pass
+
+    @staticmethod
+    def create():
+        #
+        # Only the main thread runs the Python signal handlers, other threads can block in the Ice run time.
+        #
+        if not isinstance(threading.current_thread(), threading._MainThread) or not hasattr(socket, "socketpair"):
+            return None
+        return _WakeUp()
+
+def _waitFor(wait, notify):
+    #
+    # wait(timeout) returns True once the event occurred and raises the exception of the wait, if any. On the
+    # main thread it returns False if the event didn't occur before the timeout, other threads block until the
+    # event occurs. notify(callback) calls callback from an Ice thread once the event occurred, or returns False
+    # if it already occurred.
+    #
+    wakeUp = _WakeUp.create()
+    if wakeUp:
+        with wakeUp:
+            if notify(wakeUp.set):
+                while not wakeUp.isSet():
+                    wakeUp.wait()
+    while not wait(1000):
+        pass
+
+def _waitForAsync(wait, notify):
+    future = Future()
+    def done():
+        try:
+            while not wait(1000): # Doesn't block, the event already occurred.
+                pass
+            future.set_result(None)
+        except:
+            future.set_exception(sys.exc_info()[1])
+    if not notify(done):
+        done()
+    return future
 
 #
 # Communicator wrapper.
@@ -916,12 +1073,15 @@ class CommunicatorI(Communicator):
 
     def waitForShutdown(self):
         #
-        # If invoked by the main thread, waitForShutdown only blocks for
-        # the specified timeout in order to give us a chance to handle
-        # signals.
+        # If invoked by the main thread, waitForShutdown waits on a socket
+        # that is written to on shutdown or when a signal is received, in
+        # order to give us a chance to handle signals.
         #
-        while not self._impl.waitForShutdown(500):
-            pass
+        _waitFor(self._impl.waitForShutdown, self._impl._notifyShutdown)
+
+    def waitForShutdownAsync(self):
+        '''Returns a future that completes once the communicator is shut down.'''
+        return _waitForAsync(self._impl.waitForShutdown, self._impl._notifyShutdown)
 
     def isShutdown(self):
         return self._impl.isShutdown()
@@ -1085,24 +1245,30 @@ class ObjectAdapterI(ObjectAdapter):
 
     def waitForHold(self):
         #
-        # If invoked by the main thread, waitForHold only blocks for
-        # the specified timeout in order to give us a chance to handle
-        # signals.
+        # If invoked by the main thread, waitForHold waits on a socket that
+        # is written to once the adapter is on hold or when a signal is
+        # received, in order to give us a chance to handle signals.
         #
-        while not self._impl.waitForHold(1000):
-            pass
+        _waitFor(self._impl.waitForHold, self._impl._notifyHold)
+
+    def waitForHoldAsync(self):
+        '''Returns a future that completes once the adapter is on hold.'''
+        return _waitForAsync(self._impl.waitForHold, self._impl._notifyHold)
 
     def deactivate(self):
         self._impl.deactivate()
 
     def waitForDeactivate(self):
         #
-        # If invoked by the main thread, waitForDeactivate only blocks for
-        # the specified timeout in order to give us a chance to handle
-        # signals.
+        # If invoked by the main thread, waitForDeactivate waits on a socket
+        # that is written to once the adapter is deactivated or when a signal
+        # is received, in order to give us a chance to handle signals.
         #
-        while not self._impl.waitForDeactivate(1000):
-            pass
+        _waitFor(self._impl.waitForDeactivate, self._impl._notifyDeactivate)
+
+    def waitForDeactivateAsync(self):
+        '''Returns a future that completes once the adapter is deactivated.'''
+        return _waitForAsync(self._impl.waitForDeactivate, self._impl._notifyDeactivate)
 
     def isDeactivated(self):
         self._impl.isDeactivated()
@@ -2022,5 +2188,23 @@ try:
                 raise ValueError("`{0}' is not an array builtin type".format(t))
             return numpy.frombuffer(view.tobytes(), BuiltinNumpyTypes[t])
 
+    #
+    # Record arrays are used for sequences of fixed-size structures. The fields are packed
+    # and little-endian, like the encoding of the structure members.
+    #
+    BuiltinNumpyRecTypes = ['?', 'i1', '<i2', '<i4', '<i8', '<f4', '<f8']
+
+    def createNumPyRecArrayType(fields):
+        def toDType(fields):
+            return [(str(name), toDType(t) if isinstance(t, tuple) else BuiltinNumpyRecTypes[t]) for (name, t) in fields]
+        return numpy.dtype(toDType(fields))
+
+    if sys.version_info[0] >= 3:
+        def createNumPyRecArray(view, dtype, copy):
+            return numpy.frombuffer(view.tobytes() if copy else view, dtype).view(numpy.recarray)
+    else:
+        def createNumPyRecArray(view, dtype, copy):
+            return numpy.frombuffer(view.tobytes(), dtype).view(numpy.recarray)
+
 except ImportError:
     pass
@@ -2,7 +2,7 @@
 # Copyright (c) ZeroC, Inc. All rights reserved.
 #
 
-import sys, Ice, Test
+import sys, threading, Ice, Test
 
 def test(b):
     if not b:
@@ -121,6 +121,40 @@ def allTests(helper, communicator):
         pass
     print("ok")
 
+    sys.stdout.write("testing waitForHold and waitForDeactivate... ")
+    sys.stdout.flush()
+    adapter = communicator.createObjectAdapterWithEndpoints("WaitAdapter", "default")
+    adapter.activate()
+    f = adapter.waitForHoldAsync()
+    test(isinstance(f, Ice.Future))
+    test(not f.done())
+    threading.Timer(0.1, adapter.hold).start()
+    adapter.waitForHold()
+    f.result()
+    adapter.waitForHold()
+    test(adapter.waitForHoldAsync().done())
+
+    f = adapter.waitForDeactivateAsync()
+    test(not f.done())
+    threading.Timer(0.1, adapter.deactivate).start()
+    adapter.waitForDeactivate()
+    f.result()
+    adapter.waitForDeactivate()
+    test(adapter.waitForDeactivateAsync().done())
+    adapter.destroy()
+
+    initData = Ice.InitializationData()
+    initData.properties = communicator.getProperties().clone()
+    with Ice.initialize(initData) as comm:
+        f = comm.waitForShutdownAsync()
+        test(not f.done())
+        threading.Timer(0.1, comm.shutdown).start()
+        comm.waitForShutdown()
+        f.result()
+        comm.waitForShutdown()
+        test(comm.waitForShutdownAsync().done())
+    print("ok")
+
     sys.stdout.write("deactivating object adapter in the server... ")
     sys.stdout.flush()
     obj.deactivate()
@@ -1593,6 +1593,61 @@ def allTestsFuture(helper, communicator, collocated):
 
     print("ok")
 
+    sys.stdout.write("testing future timeouts... ")
+    sys.stdout.flush()
+    f = Ice.Future()
+    for i in range(0, 10):
+        try:
+            f.result(0.001)
+            test(False)
+        except Ice.TimeoutException:
+            pass
+    # The waits that timed out don't leave callbacks behind.
+    test(len(f._doneCallbacks) == 0)
+    f.set_result(5)
+    test(f.result(0.001) == 5)
+    print("ok")
+
+    sys.stdout.write("testing AsyncMany invocations... ")
+    sys.stdout.flush()
+
+    seq = b'\x00' * 10
+    test(p.opAsyncMany([]).result() == [])
+    test(p.opWithResultAsyncMany([()] * 100).result() == [15] * 100)
+    test(p.opWithResultAsyncMany([()] * 100, {"foo": "bar"}).result() == [15] * 100)
+    test(p.opWithPayloadAsyncMany((seq,) for i in range(0, 10)).result() == [None] * 10)
+
+    i2 = Test.Outer.Inner.TestIntfPrx.uncheckedCast(p.ice_identity(Ice.stringToIdentity("test2")))
+    test(i2.opAsyncMany([(i,) for i in range(0, 50)]).result() == [(i, i) for i in range(0, 50)])
+
+    try:
+        p.opWithUEAsyncMany([(), ()]).result()
+        test(False)
+    except Test.TestIntfException:
+        pass
+
+    try:
+        p.opWithPayloadAsyncMany([seq])
+        test(False)
+    except ValueError:
+        pass
+
+    try:
+        p.ice_oneway().opWithResultAsyncMany([()])
+        test(False)
+    except Ice.TwowayOnlyException:
+        pass
+
+    test(p.ice_oneway().opAsyncMany([()] * 10).result() == [None] * 10)
+
+    test(p.opBatchCount() == 0)
+    b1 = p.ice_batchOneway()
+    test(b1.opBatchAsyncMany([(), ()]).result() == [None, None])
+    b1.ice_flushBatchRequests()
+    test(p.waitForBatch(2))
+
+    print("ok")
+
     if p.ice_getConnection(): # No collocation optimization
         sys.stdout.write("testing batch requests with connection... ")
         sys.stdout.flush()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+#
+# Copyright (c) ZeroC, Inc. All rights reserved.
+#
+
+#
+# Micro-benchmark comparing Ice.Future and Ice.InvocationFuture with their previous implementation,
+# which protected the future state with a threading.Condition. This is not part of the test suite,
+# run it manually with:
+#
+#   python FutureBenchmark.py [--count=<invocations>] [--repeat=<runs>]
+#
+
+import sys, time, threading, getopt
+import Ice
+
+class LockedFuture(Ice.FutureBase):
+    def __init__(self):
+        self._result = None
+        self._exception = None
+        self._condition = threading.Condition()
+        self._doneCallbacks = []
+        self._state = Ice.Future.StateRunning
+
+    def done(self):
+        with self._condition:
+            return self._state in [Ice.Future.StateCancelled, Ice.Future.StateDone]
+
+    def add_done_callback(self, fn):
+        with self._condition:
+            if self._state == Ice.Future.StateRunning:
+                self._doneCallbacks.append(fn)
+                return
+        fn(self)
+
+    def result(self, timeout=None):
+        with self._condition:
+            while self._state == Ice.Future.StateRunning:
+                self._condition.wait()
+            if self._exception:
+                raise self._exception
+            else:
+                return self._result
+
+    def set_result(self, result):
+        with self._condition:
+            if self._state != Ice.Future.StateRunning:
+                return
+            self._result = result
+            self._state = Ice.Future.StateDone
+            callbacks = self._doneCallbacks
+            self._doneCallbacks = []
+            self._condition.notify_all()
+        for callback in callbacks:
+            callback(self)
+
+    def set_exception(self, ex):
+        with self._condition:
+            if self._state != Ice.Future.StateRunning:
+                return
+            self._exception = ex
+            self._state = Ice.Future.StateDone
+            callbacks = self._doneCallbacks
+            self._doneCallbacks = []
+            self._condition.notify_all()
+        for callback in callbacks:
+            callback(self)
+
+class LockedInvocationFuture(LockedFuture):
+    def __init__(self, operation, asyncResult):
+        LockedFuture.__init__(self)
+        self._operation = operation
+        self._asyncResult = asyncResult
+        self._sent = False
+        self._sentSynchronously = False
+        self._sentCallbacks = []
+
+    def set_sent(self, sentSynchronously):
+        with self._condition:
+            if self._sent:
+                return
+            self._sent = True
+            self._sentSynchronously = sentSynchronously
+            callbacks = self._sentCallbacks
+            self._sentCallbacks = []
+            self._condition.notify_all()
+        for callback in callbacks:
+            callback(self, sentSynchronously)
+
+class PingI(Ice.Object):
+    pass
+
+def measure(fn, repeat):
+    best = None
+    for i in range(0, repeat):
+        start = time.time()
+        fn()
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def completeNoWaiters(futureType, count):
+    def run():
+        for i in range(0, count):
+            f = futureType()
+            f.set_result(i)
+            f.result()
+    return run
+
+def invokeAsync(proxy, count, callback):
+    def run():
+        futures = [proxy.ice_pingAsync() for i in range(0, count)]
+        if callback:
+            done = threading.Event()
+            remaining = [count]
+            lock = threading.Lock()
+            def cb(f):
+                with lock:
+                    remaining[0] -= 1
+                    if remaining[0] == 0:
+                        done.set()
+            for f in futures:
+                f.add_done_callback(cb)
+            done.wait()
+        else:
+            for f in futures:
+                f.result()
+    return run
+
+def report(name, count, baseline, current):
+    print("{0:<40} {1:>10.2f} {2:>10.2f} {3:>8.2f}x".format(name, count / baseline, count / current,
+                                                            baseline / current))
+
+def main(argv):
+    count = 20000
+    repeat = 5
+    opts, args = getopt.getopt(argv[1:], "", ["count=", "repeat="])
+    for o, a in opts:
+        if o == "--count":
+            count = int(a)
+        elif o == "--repeat":
+            repeat = int(a)
+
+    print("{0:<40} {1:>10} {2:>10} {3:>9}".format("benchmark (ops/s)", "locked", "current", "speedup"))
+
+    report("complete without waiters", count,
+           measure(completeNoWaiters(LockedFuture, count), repeat),
+           measure(completeNoWaiters(Ice.Future, count), repeat))
+
+    with Ice.initialize(argv) as communicator:
+        adapter = communicator.createObjectAdapterWithEndpoints("FutureBenchmark", "tcp -h 127.0.0.1")
+        proxy = adapter.addWithUUID(PingI())
+        adapter.activate()
+
+        #
+        # IcePy looks up Ice.InvocationFuture for every invocation, so replacing it is enough to run
+        # the invocations with the previous implementation.
+        #
+        invocationFuture = Ice.InvocationFuture
+        for (name, callback) in [("invokeAsync + result()", False), ("invokeAsync + add_done_callback()", True)]:
+            Ice.InvocationFuture = LockedInvocationFuture
+            try:
+                baseline = measure(invokeAsync(proxy, count, callback), repeat)
+            finally:
+                Ice.InvocationFuture = invocationFuture
+            report(name, count, baseline, measure(invokeAsync(proxy, count, callback), repeat))
+
+if __name__ == "__main__":
+    main(sys.argv)
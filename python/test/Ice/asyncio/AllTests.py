@@ -0,0 +1,105 @@
+#
+# Copyright (c) ZeroC, Inc. All rights reserved.
+#
+
+import Ice, Test, asyncio, gc, sys, weakref
+
+def test(b):
+    if not b:
+        raise RuntimeError('test assertion failed')
+
+def allTests(helper, communicator, loop):
+    sref = "test:{0}".format(helper.getTestEndpoint())
+    obj = communicator.stringToProxy(sref)
+    test(obj)
+
+    p = Test.TestIntfPrx.uncheckedCast(obj)
+
+    sys.stdout.write("testing asyncio futures... ")
+    sys.stdout.flush()
+
+    f = p.opIntAsync(5)
+    test(isinstance(f, asyncio.Future))
+    test(f.operation() == "opInt")
+    test(f.communicator() == communicator)
+    test(loop.run_until_complete(f) == 5)
+    test(f.is_sent())
+
+    sent = []
+    f = p.opVoidAsync()
+    f.add_sent_callback(lambda future, sentSynchronously: sent.append(sentSynchronously))
+    loop.run_until_complete(f)
+    test(len(sent) == 1)
+
+    async def run():
+        test(await p.opIntAsync(3) == 3)
+
+        results = await asyncio.gather(*[p.opIntAsync(i) for i in range(0, 200)])
+        test(results == list(range(0, 200)))
+
+        try:
+            await p.opExceptionAsync()
+            test(False)
+        except Test.TestIntfException:
+            pass
+
+        try:
+            await p.ice_adapterId("dummy").opVoidAsync()
+            test(False)
+        except Ice.NoEndpointException:
+            pass
+
+        test(await p.ice_oneway().opVoidAsync() is None)
+
+    loop.run_until_complete(run())
+
+    #
+    # A servant that overrides _iceDispatch also runs its coroutines on the event loop.
+    #
+    d = Test.TestIntfPrx.uncheckedCast(communicator.stringToProxy("dispatch:{0}".format(helper.getTestEndpoint())))
+    test(loop.run_until_complete(d.opIntAsync(7)) == 7)
+    print("ok")
+
+    sys.stdout.write("testing wrap_future... ")
+    sys.stdout.flush()
+
+    #
+    # Futures of another communicator are bridged to the loop.
+    #
+    initData = Ice.InitializationData()
+    initData.properties = communicator.getProperties().clone()
+    with Ice.initialize(initData) as other:
+        op = Test.TestIntfPrx.uncheckedCast(other.stringToProxy(sref))
+        f = op.opIntAsync(7)
+        test(isinstance(f, Ice.Future))
+        test(loop.run_until_complete(Ice.wrap_future(f, loop=loop)) == 7)
+        test(loop.run_until_complete(asyncio.gather(*[Ice.wrap_future(op.opIntAsync(i), loop=loop)
+                                                      for i in range(0, 200)])) == list(range(0, 200)))
+
+    #
+    # The adapter of a loop used by wrap_future doesn't keep the loop alive.
+    #
+    otherLoop = asyncio.new_event_loop()
+    f = Ice.Future()
+    af = Ice.wrap_future(f, loop=otherLoop)
+    f.set_result(0)
+    test(otherLoop.run_until_complete(af) == 0)
+    del af
+    ref = weakref.ref(otherLoop)
+    otherLoop.close()
+    del otherLoop
+    gc.collect()
+    test(ref() is None)
+    print("ok")
+
+    sys.stdout.write("testing waitForShutdownAsync... ")
+    sys.stdout.flush()
+    with Ice.initialize(initData) as other:
+        async def waitForShutdown():
+            await Ice.wrap_future(other.waitForShutdownAsync(), loop=loop)
+            test(other.isShutdown())
+        loop.call_later(0.1, other.shutdown)
+        loop.run_until_complete(waitForShutdown())
+    print("ok")
+
+    p.shutdown()
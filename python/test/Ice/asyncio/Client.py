@@ -0,0 +1,36 @@
+#!/usr/bin/env python
+#
+# Copyright (c) ZeroC, Inc. All rights reserved.
+#
+
+import sys
+from TestHelper import TestHelper
+TestHelper.loadSlice("Test.ice")
+import Ice
+import Test
+
+
+class Client(TestHelper):
+
+    def run(self, args):
+        if sys.version_info < (3, 5):
+            with self.initialize(args=args) as communicator:
+                sys.stdout.write("testing asyncio event loop... ")
+                sys.stdout.flush()
+                Test.TestIntfPrx.uncheckedCast(communicator.stringToProxy("test:{0}".format(
+                    self.getTestEndpoint()))).shutdown()
+                print("skipped (requires Python 3.5)")
+            return
+
+        import asyncio
+        import AllTests
+
+        loop = asyncio.new_event_loop()
+        initData = Ice.InitializationData()
+        initData.properties = self.createTestProperties(args)
+        initData.eventLoop = loop
+
+        with self.initialize(initData=initData) as communicator:
+            AllTests.allTests(self, communicator, loop)
+
+        loop.close()
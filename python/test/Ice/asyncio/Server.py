@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+#
+# Copyright (c) ZeroC, Inc. All rights reserved.
+#
+
+import sys
+from TestHelper import TestHelper
+TestHelper.loadSlice("Test.ice")
+import Ice
+import Test
+
+
+#
+# The event loop integration requires Python 3.5 or later, older versions
+# only provide a servant to shut down the server.
+#
+class ShutdownI(Test.TestIntf):
+    def shutdown(self, current=None):
+        current.adapter.getCommunicator().shutdown()
+
+
+class Server(TestHelper):
+
+    def run(self, args):
+        if sys.version_info < (3, 5):
+            with self.initialize(args=args) as communicator:
+                communicator.getProperties().setProperty("TestAdapter.Endpoints", self.getTestEndpoint())
+                adapter = communicator.createObjectAdapter("TestAdapter")
+                adapter.add(ShutdownI(), Ice.stringToIdentity("test"))
+                adapter.activate()
+                communicator.waitForShutdown()
+            return
+
+        import asyncio
+        import TestI
+
+        loop = asyncio.new_event_loop()
+        initData = Ice.InitializationData()
+        initData.properties = self.createTestProperties(args)
+        initData.eventLoop = loop
+
+        with self.initialize(initData=initData) as communicator:
+            communicator.getProperties().setProperty("TestAdapter.Endpoints", self.getTestEndpoint())
+            adapter = communicator.createObjectAdapter("TestAdapter")
+            servant = TestI.TestIntfI(loop)
+            adapter.add(servant, Ice.stringToIdentity("test"))
+            adapter.add(TestI.DispatchI(loop), Ice.stringToIdentity("dispatch"))
+            adapter.activate()
+            loop.run_until_complete(servant.waitForShutdown())
+
+        loop.close()
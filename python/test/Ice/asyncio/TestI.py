@@ -0,0 +1,38 @@
+#
+# Copyright (c) ZeroC, Inc. All rights reserved.
+#
+
+import Test, asyncio
+
+def test(b):
+    if not b:
+        raise RuntimeError('test assertion failed')
+
+class TestIntfI(Test.TestIntf):
+    def __init__(self, loop):
+        self._loop = loop
+        self._shutdown = loop.create_future()
+
+    async def opVoid(self, current):
+        test(asyncio.get_event_loop() is self._loop)
+
+    async def opInt(self, v, current):
+        test(asyncio.get_event_loop() is self._loop)
+        await asyncio.sleep(0)
+        return v
+
+    async def opException(self, current):
+        test(asyncio.get_event_loop() is self._loop)
+        await asyncio.sleep(0)
+        raise Test.TestIntfException()
+
+    def shutdown(self, current):
+        self._loop.call_soon_threadsafe(self._shutdown.set_result, None)
+
+    def waitForShutdown(self):
+        return self._shutdown
+
+class DispatchI(TestIntfI):
+    # Overrides _iceDispatch with the signature of the previous Ice versions.
+    def _iceDispatch(self, cb, method, args):
+        Test.TestIntf._iceDispatch(self, cb, method, args)
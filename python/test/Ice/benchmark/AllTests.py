@@ -0,0 +1,246 @@
+#
+# Copyright (c) ZeroC, Inc. All rights reserved.
+#
+
+#
+# Throughput and latency benchmarks for the Python mapping. The defaults keep the run short enough for the
+# test suite, the following client properties tune it:
+#
+# Benchmark.Iterations      Number of invocations for the latency and throughput benchmarks (default 1000).
+#                           The sequence benchmarks use a tenth of it.
+# Benchmark.SeqSize         Number of elements of the sequences (default 1000).
+# Benchmark.BatchSize       Number of batch oneway requests per flush (default 100).
+# Benchmark.Output          File to write the results to, in JSON format.
+# Benchmark.Baseline        File with the results of a previous run to compare the results with.
+# Benchmark.MaxRegression   Fail if a benchmark is slower than the baseline by more than the given
+#                           percentage (default 0, disabled).
+#
+# The {protocol} and {mode} fields in the Output and Baseline file names are replaced with the protocol and
+# with "remote" or "collocated", so a single set of properties can be used for all the configurations.
+#
+
+import Ice, Test, sys, threading, time, json, platform, array
+
+try:
+    import numpy
+    hasNumPy = True
+except ImportError:
+    hasNumPy = False
+
+timer = getattr(time, "perf_counter", time.time)
+
+def test(b):
+    if not b:
+        raise RuntimeError('test assertion failed')
+
+class Results:
+    def __init__(self):
+        self.results = []
+
+    def measure(self, name, iterations, fn, elements=0):
+        start = timer()
+        fn(iterations)
+        seconds = timer() - start
+        r = { "name": name,
+              "iterations": iterations,
+              "seconds": seconds,
+              "opsPerSecond": iterations / seconds if seconds > 0 else 0.0,
+              "usPerOp": seconds * 1000000.0 / iterations }
+        if elements:
+            r["elementsPerSecond"] = elements * iterations / seconds if seconds > 0 else 0.0
+        self.results.append(r)
+
+def syncLatency(p):
+    def run(count):
+        for i in range(0, count):
+            p.ping()
+    return run
+
+def asyncLatency(p):
+    def run(count):
+        done = threading.Event()
+        exceptions = []
+        def response():
+            done.set()
+        def exception(ex):
+            exceptions.append(ex)
+            done.set()
+        for i in range(0, count):
+            done.clear()
+            p.begin_ping(response, exception)
+            done.wait()
+            if exceptions:
+                raise exceptions[0]
+    return run
+
+def futureLatency(p):
+    def run(count):
+        for i in range(0, count):
+            p.pingAsync().result()
+    return run
+
+def onewayThroughput(p):
+    def run(count):
+        oneway = p.ice_oneway()
+        for i in range(0, count):
+            oneway.ping()
+        p.ping() # Wait for the server to dispatch the oneway requests.
+    return run
+
+def batchOnewayThroughput(p, batchSize):
+    def run(count):
+        batch = p.ice_batchOneway()
+        for i in range(0, count):
+            batch.ping()
+            if (i + 1) % batchSize == 0:
+                batch.ice_flushBatchRequests()
+        batch.ice_flushBatchRequests()
+        p.ping() # Wait for the server to dispatch the batch requests.
+    return run
+
+def echo(op, value):
+    def run(count):
+        for i in range(0, count):
+            op(value)
+    return run
+
+def sequences(p, size):
+    byteValues = [i % 100 for i in range(0, size)]
+    intValues = list(range(0, size))
+    doubleValues = [i * 0.5 for i in range(0, size)]
+    stringValues = ["string-{0}".format(i) for i in range(0, size)]
+    fixedValues = [Test.Fixed(i, i * 0.5) for i in range(0, size)]
+    nodeValues = [Test.Node(i, "node") for i in range(0, size)]
+
+    return [("byte.default", p.echoByteSeq, bytes(bytearray(byteValues))),
+            ("byte.list", p.echoByteList, byteValues),
+            ("byte.tuple", p.echoByteTuple, tuple(byteValues)),
+            ("byte.array.array", p.echoByteArray, array.array("b", byteValues)),
+            ("int.default", p.echoIntSeq, intValues),
+            ("int.list", p.echoIntList, intValues),
+            ("int.tuple", p.echoIntTuple, tuple(intValues)),
+            ("int.array.array", p.echoIntArray, array.array("i", intValues)),
+            ("double.default", p.echoDoubleSeq, doubleValues),
+            ("double.list", p.echoDoubleList, doubleValues),
+            ("double.tuple", p.echoDoubleTuple, tuple(doubleValues)),
+            ("double.array.array", p.echoDoubleArray, array.array("d", doubleValues)),
+            ("string.default", p.echoStringSeq, stringValues),
+            ("string.list", p.echoStringList, stringValues),
+            ("string.tuple", p.echoStringTuple, tuple(stringValues)),
+            ("struct.default", p.echoFixedSeq, fixedValues),
+            ("struct.list", p.echoFixedList, fixedValues),
+            ("struct.tuple", p.echoFixedTuple, tuple(fixedValues)),
+            ("class.default", p.echoNodeSeq, nodeValues),
+            ("class.list", p.echoNodeList, nodeValues),
+            ("class.tuple", p.echoNodeTuple, tuple(nodeValues))]
+
+def memoryViewSequences(p, size):
+    byteValues = memoryview(array.array("b", [i % 100 for i in range(0, size)]))
+    intValues = memoryview(array.array("i", range(0, size)))
+    doubleValues = memoryview(array.array("d", [i * 0.5 for i in range(0, size)]))
+    return [("byte.memoryview", p.echoByteView, byteValues),
+            ("int.memoryview", p.echoIntView, intValues),
+            ("double.memoryview", p.echoDoubleView, doubleValues),
+            ("double.memoryview.zero-copy", p.echoDoubleZeroCopyView, doubleValues)]
+
+def numPySequences(p, size):
+    fixedValues = numpy.zeros(size, [("i", numpy.int32), ("d", numpy.float64)]).view(numpy.recarray)
+    fixedValues.i = numpy.arange(size)
+    fixedValues.d = numpy.arange(size) * 0.5
+    return [("byte.numpy.ndarray", p.echoByteSeq, numpy.arange(size, dtype=numpy.int8)),
+            ("int.numpy.ndarray", p.echoIntSeq, numpy.arange(size, dtype=numpy.int32)),
+            ("double.numpy.ndarray", p.echoDoubleSeq, numpy.arange(size, dtype=numpy.float64)),
+            ("struct.numpy.recarray", p.echoFixedSeq, fixedValues)]
+
+def fileName(pattern, protocol, collocated):
+    return pattern.format(protocol=protocol, mode="collocated" if collocated else "remote")
+
+def report(results, baseline):
+    baselineResults = {}
+    if baseline:
+        for r in baseline["results"]:
+            baselineResults[r["name"]] = r
+
+    regressions = []
+    print("{0:<40} {1:>12} {2:>12} {3:>10}".format("benchmark", "ops/s", "us/op", "baseline"))
+    for r in results:
+        line = "{0:<40} {1:>12.1f} {2:>12.2f}".format(r["name"], r["opsPerSecond"], r["usPerOp"])
+        b = baselineResults.get(r["name"])
+        if b and b["opsPerSecond"] > 0:
+            change = (r["opsPerSecond"] / b["opsPerSecond"] - 1.0) * 100.0
+            line += " {0:>+9.1f}%".format(change)
+            regressions.append((r["name"], -change))
+        print(line)
+    return regressions
+
+def allTests(helper, communicator, collocated):
+    properties = communicator.getProperties()
+    iterations = properties.getPropertyAsIntWithDefault("Benchmark.Iterations", 1000)
+    seqSize = properties.getPropertyAsIntWithDefault("Benchmark.SeqSize", 1000)
+    batchSize = properties.getPropertyAsIntWithDefault("Benchmark.BatchSize", 100)
+    output = properties.getProperty("Benchmark.Output")
+    baseline = properties.getProperty("Benchmark.Baseline")
+    maxRegression = properties.getPropertyAsIntWithDefault("Benchmark.MaxRegression", 0)
+    protocol = helper.getTestProtocol()
+    seqIterations = max(1, iterations // 10)
+
+    p = Test.BenchmarkPrx.checkedCast(communicator.stringToProxy("benchmark:{0}".format(helper.getTestEndpoint())))
+    test(p)
+    if collocated:
+        test(not p.ice_getConnection())
+
+    results = Results()
+
+    sys.stdout.write("testing twoway latency... ")
+    sys.stdout.flush()
+    p.ping() # Warm up
+    results.measure("latency.twoway.sync", iterations, syncLatency(p))
+    results.measure("latency.twoway.async", iterations, asyncLatency(p))
+    results.measure("latency.twoway.future", iterations, futureLatency(p))
+    print("ok")
+
+    sys.stdout.write("testing oneway throughput... ")
+    sys.stdout.flush()
+    results.measure("throughput.oneway", iterations, onewayThroughput(p))
+    results.measure("throughput.batchOneway", iterations, batchOnewayThroughput(p, batchSize))
+    print("ok")
+
+    sys.stdout.write("testing sequence marshaling... ")
+    sys.stdout.flush()
+    seqs = sequences(p, seqSize)
+    if sys.version_info[:2] >= (3, 3): # memoryview.cast is new in Python 3.3
+        seqs += memoryViewSequences(p, seqSize)
+    if hasNumPy and hasattr(Test, "NumPy"):
+        numPy = Test.NumPy.BenchmarkPrx.uncheckedCast(p.ice_identity(Ice.stringToIdentity("numpy")))
+        seqs += numPySequences(numPy, seqSize)
+    for (name, op, value) in seqs:
+        r = op(value)
+        test(len(r) == seqSize)
+        results.measure("marshal.{0}".format(name), seqIterations, echo(op, value), seqSize)
+    print("ok")
+
+    baselineData = None
+    if baseline:
+        with open(fileName(baseline, protocol, collocated), "r") as f:
+            baselineData = json.load(f)
+
+    regressions = report(results.results, baselineData)
+
+    if output:
+        data = { "iceVersion": Ice.stringVersion(),
+                 "pythonVersion": platform.python_version(),
+                 "protocol": protocol,
+                 "collocated": collocated,
+                 "iterations": iterations,
+                 "seqSize": seqSize,
+                 "results": results.results }
+        with open(fileName(output, protocol, collocated), "w") as f:
+            json.dump(data, f, indent=4, sort_keys=True)
+
+    if maxRegression > 0:
+        failed = [name for (name, regression) in regressions if regression > maxRegression]
+        if failed:
+            raise RuntimeError("benchmarks slower than the baseline by more than {0}%: {1}".format(
+                maxRegression, ", ".join(failed)))
+
+    return p
@@ -0,0 +1,29 @@
+#!/usr/bin/env python
+#
+# Copyright (c) ZeroC, Inc. All rights reserved.
+#
+
+from TestHelper import TestHelper
+TestHelper.loadSlice("Test.ice")
+
+#
+# Use separate try/except to ensure loadSlice correctly report ImportError
+# in ausence of numpy.
+#
+try:
+    TestHelper.loadSlice("TestNumPy.ice")
+except ImportError:
+    pass
+
+import AllTests
+
+
+class Client(TestHelper):
+
+    def run(self, args):
+        properties = self.createTestProperties(args)
+        properties.parseCommandLineOptions("Benchmark", args)
+        properties.setProperty("Ice.MessageSizeMax", "0")
+        with self.initialize(properties=properties) as communicator:
+            benchmark = AllTests.allTests(self, communicator, False)
+            benchmark.shutdown()
@@ -0,0 +1,37 @@
+#!/usr/bin/env python
+#
+# Copyright (c) ZeroC, Inc. All rights reserved.
+#
+
+from TestHelper import TestHelper
+TestHelper.loadSlice("Test.ice")
+
+#
+# Use separate try/except to ensure loadSlice correctly report ImportError
+# in ausence of numpy.
+#
+try:
+    TestHelper.loadSlice("TestNumPy.ice")
+except ImportError:
+    pass
+
+import Ice
+import TestI
+import AllTests
+
+
+class Collocated(TestHelper):
+
+    def run(self, args):
+        properties = self.createTestProperties(args)
+        properties.parseCommandLineOptions("Benchmark", args)
+        properties.setProperty("Ice.MessageSizeMax", "0")
+        with self.initialize(properties=properties) as communicator:
+            communicator.getProperties().setProperty("TestAdapter.Endpoints", self.getTestEndpoint())
+            adapter = communicator.createObjectAdapter("TestAdapter")
+            adapter.add(TestI.BenchmarkI(), Ice.stringToIdentity("benchmark"))
+            if TestI.hasNumPy:
+                adapter.add(TestI.NumPyBenchmarkI(), Ice.stringToIdentity("numpy"))
+            # adapter.activate() # Don't activate OA to ensure collocation is used.
+
+            AllTests.allTests(self, communicator, True)
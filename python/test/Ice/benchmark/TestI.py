@@ -0,0 +1,111 @@
+#
+# Copyright (c) ZeroC, Inc. All rights reserved.
+#
+
+import Test
+
+#
+# TestNumPy.ice is only loaded when NumPy is available.
+#
+hasNumPy = hasattr(Test, "NumPy")
+
+#
+# The servants return their arguments unchanged, the benchmarks measure the cost of marshaling and
+# unmarshaling the sequences in both directions.
+#
+class BenchmarkI(Test.Benchmark):
+    def ping(self, current=None):
+        pass
+
+    def echoByteSeq(self, s, current=None):
+        return s
+
+    def echoByteList(self, s, current=None):
+        return s
+
+    def echoByteTuple(self, s, current=None):
+        return s
+
+    def echoByteArray(self, s, current=None):
+        return s
+
+    def echoIntSeq(self, s, current=None):
+        return s
+
+    def echoIntList(self, s, current=None):
+        return s
+
+    def echoIntTuple(self, s, current=None):
+        return s
+
+    def echoIntArray(self, s, current=None):
+        return s
+
+    def echoDoubleSeq(self, s, current=None):
+        return s
+
+    def echoDoubleList(self, s, current=None):
+        return s
+
+    def echoDoubleTuple(self, s, current=None):
+        return s
+
+    def echoDoubleArray(self, s, current=None):
+        return s
+
+    def echoByteView(self, s, current=None):
+        return s
+
+    def echoIntView(self, s, current=None):
+        return s
+
+    def echoDoubleView(self, s, current=None):
+        return s
+
+    def echoDoubleZeroCopyView(self, s, current=None):
+        return s
+
+    def echoStringSeq(self, s, current=None):
+        return s
+
+    def echoStringList(self, s, current=None):
+        return s
+
+    def echoStringTuple(self, s, current=None):
+        return s
+
+    def echoFixedSeq(self, s, current=None):
+        return s
+
+    def echoFixedList(self, s, current=None):
+        return s
+
+    def echoFixedTuple(self, s, current=None):
+        return s
+
+    def echoNodeSeq(self, s, current=None):
+        return s
+
+    def echoNodeList(self, s, current=None):
+        return s
+
+    def echoNodeTuple(self, s, current=None):
+        return s
+
+    def shutdown(self, current=None):
+        current.adapter.getCommunicator().shutdown()
+
+if hasNumPy:
+
+    class NumPyBenchmarkI(Test.NumPy.Benchmark):
+        def echoByteSeq(self, s, current=None):
+            return s
+
+        def echoIntSeq(self, s, current=None):
+            return s
+
+        def echoDoubleSeq(self, s, current=None):
+            return s
+
+        def echoFixedSeq(self, s, current=None):
+            return s
@@ -0,0 +1,14 @@
+#
+# Copyright (c) ZeroC, Inc. All rights reserved.
+#
+
+import Ice
+
+#
+# Factory of the python:memoryview sequences, the sequences are returned as memoryview objects with the format
+# of their elements. The view is only copied when it doesn't remain valid after the call.
+#
+def createView(buffer, type, copy):
+    if copy:
+        buffer = memoryview(buffer.tobytes())
+    return buffer.cast(Ice.BuiltinArrayTypes[type])
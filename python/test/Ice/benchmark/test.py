@@ -0,0 +1,14 @@
+#
+# Copyright (c) ZeroC, Inc. All rights reserved.
+#
+
+#
+# The benchmarks run one at a time to avoid measuring other tests, and only with the options that affect
+# the invocation path. Use --protocol to select tcp, ssl or ws, and --cprops to set the Benchmark.*
+# properties described in AllTests.py, for example:
+#
+# python allTests.py --filter=Ice/benchmark --protocol=ssl \
+#     --cprops="Benchmark.Iterations=20000 Benchmark.Output=bench-{protocol}-{mode}.json"
+#
+TestSuite(__name__, options={ "compress" : [False], "serialize" : [False], "mx" : [False] },
+          runOnMainThread=True, multihost=False)
@@ -112,6 +112,93 @@ def allTests(helper, communicator):
 
     print("ok")
 
+    sys.stdout.write("testing string sharing... ")
+    sys.stdout.flush()
+
+    #
+    # Short strings unmarshaled by the same communicator share the same string object.
+    #
+    (r, b2) = custom.opStringList1(["s{0}".format(i % 3) for i in range(0, 9)])
+    test(r == b2)
+    test(r[0] is r[3])
+    test(r[0] is b2[0])
+    test(r[0] is not r[1])
+
+    longString = "x" * 100
+    (r, b2) = custom.opStringList1([longString, longString])
+    test(r == [longString, longString])
+
+    print("ok")
+
+    sys.stdout.write("testing python:slots... ")
+    sys.stdout.flush()
+
+    points = [Test.Point(i, i * 2) for i in range(0, 100)]
+    test(not hasattr(points[0], "__dict__"))
+    try:
+        points[0].z = 0
+        test(False)
+    except AttributeError:
+        pass
+
+    (r, v2) = custom.opPointSeq(points)
+    test(r == points)
+    test(v2 == points)
+    for p in r:
+        test(not hasattr(p, "__dict__"))
+
+    c = Test.SlotsC("slots", points)
+    test(not hasattr(c, "__dict__"))
+    r = custom.opSlotsC(c)
+    test(not hasattr(r, "__dict__"))
+    test(r.name == "slots")
+    test(r.points == points)
+
+    print("ok")
+
+    sys.stdout.write("testing iterables and python:seq:lazy... ")
+    sys.stdout.flush()
+
+    r = custom.opPointLazySeq(Ice.SizedIterator((Test.Point(i, i * 2) for i in range(0, 100)), 100))
+    test(isinstance(r, Ice.LazySequence))
+    test(len(r) == len(points))
+    test(r[10] == points[10])
+    test(r[-1] == points[-1])
+    test(list(r) == points)
+    try:
+        r[len(points)]
+        test(False)
+    except IndexError:
+        pass
+
+    r = custom.opStringLazySeq(set(stringList))
+    test(isinstance(r, Ice.LazySequence))
+    test(sorted(r) == sorted(stringList))
+
+    r = custom.opStringLazySeq(Ice.SizedIterator((s for s in []), 0))
+    test(len(r) == 0)
+    test(list(r) == [])
+
+    for length in [len(points) - 1, len(points) + 1]:
+        try:
+            custom.opPointLazySeq(Ice.SizedIterator(iter(points), length))
+            test(False)
+        except ValueError:
+            pass
+
+    print("ok")
+
+    sys.stdout.write("testing python:no-current... ")
+    sys.stdout.flush()
+
+    (r, s2) = custom.opNoCurrent("hello")
+    test(r == "hello")
+    test(s2 == "hello")
+    test(custom.opNoCurrentAMD("world") == "world")
+    test(custom.opNoCurrentAsync("async").result() == ("async", "async"))
+
+    print("ok")
+
     sys.stdout.write("testing python:array.array... ")
     sys.stdout.flush()
 
@@ -231,6 +318,24 @@ def allTests(helper, communicator):
         except ValueError:
             pass
 
+        #
+        # Large buffers are copied with the GIL released, the same checks apply.
+        #
+        v = [i * 0.5 for i in range(0, 20000)]
+        v1, v2 = custom.opDoubleSeq(array.array("d", v))
+        test(list(v1) == v)
+        test(list(v2) == v)
+
+        v = list(range(0, 40000))
+        v1, v2 = custom.opIntSeq(array.array("i", v))
+        test(list(v1) == v)
+
+        try:
+            custom.opIntSeq(array.array("h", [i % 1000 for i in range(0, 40000)]))
+            test(False)
+        except ValueError:
+            pass
+
     try:
         custom.opBogusArrayNotExistsFactory()
         test(False)
@@ -360,6 +465,47 @@ def allTests(helper, communicator):
         for i in range(len(v1)):
             test(v1[i] == v2[i])
 
+        dtype = numpy.dtype([('timestamp', '<i8'), ('position', [('x', '<f8'), ('y', '<f8')]), ('value', '<f4'),
+                             ('valid', '?')])
+        v1 = numpy.zeros(100, dtype)
+        for i in range(len(v1)):
+            v1[i] = (i, (i * 0.5, i * 1.5), i * 2.0, i % 2 == 0)
+        v2 = custom.opSampleSeq(v1)
+        test(isinstance(v2, numpy.recarray))
+        test(v2.dtype == dtype)
+        test(numpy.array_equal(v1, v2))
+        test(v2[10].position.y == 15.0)
+        test(len(custom.opSampleSeq(numpy.zeros(0, dtype))) == 0)
+
+        # Strided slices of the array and of a record array are not C-contiguous.
+        v2 = custom.opSampleSeq(v1[::3])
+        test(len(v2) == 34)
+        test(numpy.array_equal(v1[::3], v2))
+        v2 = custom.opSampleSeq(v1.view(numpy.recarray)[::-2])
+        test(numpy.array_equal(v1[::-2], v2))
+        test(v2[0].timestamp == 99)
+
+        v2 = custom.opSampleSeq([Test.NumPy.Sample(1, Test.NumPy.Point(2.0, 3.0), 4.0, True)])
+        test(len(v2) == 1 and v2[0].timestamp == 1 and v2[0].position.x == 2.0 and v2[0].valid)
+
+        try:
+            custom.opSampleSeq(numpy.zeros(1, numpy.dtype([('timestamp', '<i4')])))
+            test(False)
+        except ValueError:
+            pass
+
+        v1 = numpy.array([0.1 * i for i in range(0, 1000)], numpy.float64)
+        r, v2 = custom.opZeroCopyDoubleSeq(v1)
+        test(isinstance(r, numpy.ndarray))
+        test(isinstance(v2, numpy.ndarray))
+        test(numpy.array_equal(v1, r))
+        test(numpy.array_equal(v1, v2))
+        # The arrays reference the reply buffer rather than owning a copy of the data.
+        test(not r.flags.owndata and not r.flags.writeable)
+        test(not v2.flags.owndata and not v2.flags.writeable)
+        r = None
+        test(numpy.array_equal(v1, v2))
+
         v1 = custom.opBoolMatrix()
         test(numpy.array_equal(v1, numpy.array([[True, False, True],
                                                 [True, False, True],
@@ -100,6 +100,31 @@ class CustomI(Test.Custom):
         test(isinstance(val.s3, tuple))
         test(isinstance(val.s4, list))
 
+    def opPointSeq(self, v1, current):
+        for p in v1:
+            test(not hasattr(p, "__dict__"))
+        return v1, v1
+
+    def opPointLazySeq(self, v1, current):
+        test(isinstance(v1, list))
+        return v1
+
+    def opStringLazySeq(self, s1, current):
+        test(isinstance(s1, list))
+        return s1
+
+    def opSlotsC(self, c1, current):
+        test(not hasattr(c1, "__dict__"))
+        return c1
+
+    def opNoCurrent(self, s1):
+        return (s1, s1)
+
+    def opNoCurrentAMD(self, s1):
+        f = Ice.Future()
+        f.set_result(s1)
+        return f
+
     def opBoolSeq(self, v1, current):
         test(isinstance(v1, array.array))
         return v1, v1
@@ -185,6 +210,14 @@ if hasNumPy:
             test(isinstance(v1, numpy.ndarray))
             return v1
 
+        def opSampleSeq(self, v1, current):
+            test(isinstance(v1, numpy.recarray))
+            return v1
+
+        def opZeroCopyDoubleSeq(self, v1, current):
+            test(isinstance(v1, numpy.ndarray))
+            return v1, v1
+
         def opBoolMatrix(self, current):
             return numpy.array([[True, False, True],
                                 [True, False, True],
@@ -2,7 +2,7 @@
 # Copyright (c) ZeroC, Inc. All rights reserved.
 #
 
-import Ice, Test, MyObjectI, sys
+import Ice, Test, MyObjectI, gc, sys, time, weakref
 
 def test(b):
     if not b:
@@ -119,3 +119,130 @@ def allTests(helper, communicator):
         test(prx.getName() == names[idx])
 
     print("ok")
+
+    sys.stdout.write("testing dispatch table of servant types... ")
+    sys.stdout.flush()
+
+    #
+    # The servants of a type share a dispatch table, a subclass uses its own table.
+    #
+    class UpperCaseI(MyObjectI.MyObjectI):
+        def getName(self, current=None):
+            return MyObjectI.MyObjectI.getName(self, current).upper()
+
+    oa.addDefaultServant(UpperCaseI(), "upper")
+    for category in ["", "upper", ""]:
+        identity.category = category
+        identity.name = "name"
+        prx = Test.MyObjectPrx.uncheckedCast(oa.createProxy(identity))
+        test(prx.getName() == ("NAME" if category == "upper" else "name"))
+    oa.removeDefaultServant("upper")
+
+    #
+    # The table follows the changes made to the type after the first dispatch, instance attributes and a custom
+    # attribute lookup take precedence over the type's methods.
+    #
+    class ModifiedI(MyObjectI.MyObjectI):
+        pass
+
+    servant = ModifiedI()
+    oa.addDefaultServant(servant, "modified")
+    identity.category = "modified"
+    identity.name = "name"
+    prx = Test.MyObjectPrx.uncheckedCast(oa.createProxy(identity))
+    test(prx.getName() == "name")
+
+    ModifiedI.getName = lambda self, current=None: "modified"
+    test(prx.getName() == "modified")
+
+    servant.getName = lambda current=None: "instance"
+    test(prx.getName() == "instance")
+    del servant.getName
+    test(prx.getName() == "modified")
+
+    def getattribute(self, name):
+        if name == "getName":
+            return lambda current=None: "getattribute"
+        return object.__getattribute__(self, name)
+    ModifiedI.__getattribute__ = getattribute
+    test(prx.getName() == "getattribute")
+
+    #
+    # The dispatch uses the servant's current class.
+    #
+    servant.__class__ = UpperCaseI
+    test(prx.getName() == "NAME")
+    oa.removeDefaultServant("modified")
+
+    #
+    # The dispatch table doesn't keep the servant type alive, the class and its methods that use super() form
+    # a reference cycle that the garbage collector must be able to collect.
+    #
+    class CollectedI(MyObjectI.MyObjectI):
+        def getName(self, current=None):
+            return super(CollectedI, self).getName(current) + "-collected"
+
+    oa.addDefaultServant(CollectedI(), "collected")
+    identity.category = "collected"
+    prx = Test.MyObjectPrx.uncheckedCast(oa.createProxy(identity))
+    test(prx.getName() == "name-collected")
+    oa.removeDefaultServant("collected")
+
+    ref = weakref.ref(CollectedI)
+    del CollectedI
+    for i in range(0, 100):
+        gc.collect()
+        if ref() is None:
+            break
+        time.sleep(0.01) # The servant can still be referenced by the dispatch.
+    test(ref() is None)
+
+    print("ok")
+
+    sys.stdout.write("testing servant methods called directly... ")
+    sys.stdout.flush()
+
+    #
+    # A servant that overrides _iceDispatch doesn't get its methods called directly, also when the method
+    # is already in the dispatch table of its base type.
+    #
+    class DispatchI(MyObjectI.MyObjectI):
+        def __init__(self):
+            self.methods = []
+
+        def _iceDispatch(self, cb, method, args):
+            self.methods.append(method.__name__)
+            return MyObjectI.MyObjectI._iceDispatch(self, cb, method, args)
+
+    servant = DispatchI()
+    oa.addDefaultServant(servant, "dispatch")
+    identity.category = "dispatch"
+    identity.name = "name"
+    prx = Test.MyObjectPrx.uncheckedCast(oa.createProxy(identity))
+    test(prx.getName() == "name")
+    test(servant.methods == ["getName"])
+
+    #
+    # An instance attribute hides the method of the class, and a method replaced on the class after the first
+    # dispatch is called instead of the previous one.
+    #
+    class DirectI(MyObjectI.MyObjectI):
+        pass
+
+    servant = DirectI()
+    oa.addDefaultServant(servant, "direct")
+    identity.category = "direct"
+    prx = Test.MyObjectPrx.uncheckedCast(oa.createProxy(identity))
+    test(prx.getName() == "name")
+
+    servant.getName = lambda current=None: "instance"
+    test(prx.getName() == "instance")
+    del servant.getName
+
+    DirectI.getName = lambda self, current=None: "replaced"
+    test(prx.getName() == "replaced")
+    test(servant.getName() == "replaced")
+    oa.removeDefaultServant("direct")
+    oa.removeDefaultServant("dispatch")
+
+    print("ok")
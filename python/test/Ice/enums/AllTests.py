@@ -103,6 +103,44 @@ def allTests(helper, communicator):
 
     print("ok")
 
+    sys.stdout.write("testing enum base type... ")
+    sys.stdout.flush()
+
+    test(isinstance(Test.SimpleEnum.red, Ice.EnumBase))
+    test(Test.SimpleEnum.green.name == "green")
+    test(Test.SimpleEnum.green._name == "green")
+    test(Test.SimpleEnum.green._value == 1)
+    test(str(Test.SimpleEnum.blue) == "blue")
+    test(repr(Test.SimpleEnum.blue) == "blue")
+    test(hash(Test.SimpleEnum.blue) == 2)
+    test(Test.SimpleEnum.red < Test.SimpleEnum.green)
+    test(Test.SimpleEnum.blue >= Test.SimpleEnum.green)
+    test(Test.SimpleEnum.red != Test.SimpleEnum.green)
+    test(Test.SimpleEnum.red == Test.SimpleEnum("red", 0))
+    test(not (Test.SimpleEnum.red == None))
+    test(Test.SimpleEnum.red != Test.ByteEnum.benum1)
+    test({ Test.SimpleEnum.red: 1 }[Test.SimpleEnum.valueOf(0)] == 1)
+
+    import pickle
+    test(pickle.loads(pickle.dumps(Test.SimpleEnum.green)) == Test.SimpleEnum.green)
+
+    #
+    # Enumerators pickled by the former Python implementation with protocol 2.
+    #
+    try:
+        import copyreg
+    except ImportError:
+        import copy_reg as copyreg
+    class PreviousEnumerator(object):
+        def __reduce_ex__(self, protocol):
+            return (copyreg.__newobj__, (Test.SimpleEnum,), { "_name": "green", "_value": 1 })
+    e = pickle.loads(pickle.dumps(PreviousEnumerator(), 2))
+    test(isinstance(e, Test.SimpleEnum))
+    test(e == Test.SimpleEnum.green)
+    test(e.name == "green")
+
+    print("ok")
+
     sys.stdout.write("testing enum operations... ")
     sys.stdout.flush()
 
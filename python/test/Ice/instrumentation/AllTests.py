@@ -0,0 +1,217 @@
+#
+# Copyright (c) ZeroC, Inc. All rights reserved.
+#
+
+import Ice, Test, sys, threading, time
+
+def test(b):
+    if not b:
+        raise RuntimeError('test assertion failed')
+
+class Counter:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = {}
+
+    def increment(self, name, value=1):
+        with self.lock:
+            self.counts[name] = self.counts.get(name, 0) + value
+
+    def get(self, name):
+        with self.lock:
+            return self.counts.get(name, 0)
+
+    def waitFor(self, name, value):
+        #
+        # Observers are detached by Ice threads, possibly after the invocation returned to the caller.
+        #
+        for i in range(0, 100):
+            if self.get(name) >= value:
+                return
+            time.sleep(0.05)
+        test(False)
+
+class ObserverI(Ice.Instrumentation.Observer):
+    def __init__(self, counter, prefix):
+        self.counter = counter
+        self.prefix = prefix
+
+    def attach(self):
+        self.counter.increment(self.prefix + ".attach")
+
+    def detach(self):
+        self.counter.increment(self.prefix + ".detach")
+
+    def failed(self, exceptionName):
+        self.counter.increment(self.prefix + ".failed")
+
+class RemoteObserverI(Ice.Instrumentation.RemoteObserver, ObserverI):
+    def reply(self, size):
+        self.counter.increment("remote.reply")
+
+class InvocationObserverI(Ice.Instrumentation.InvocationObserver, ObserverI):
+    def userException(self):
+        self.counter.increment("invocation.userException")
+
+    def getRemoteObserver(self, connectionInfo, endpoint, requestId, size):
+        test(isinstance(endpoint, Ice.Endpoint))
+        test(size > 0)
+        return RemoteObserverI(self.counter, "remote")
+
+class ConnectionObserverI(Ice.Instrumentation.ConnectionObserver, ObserverI):
+    def sentBytes(self, num):
+        self.counter.increment("connection.sentBytes", num)
+        self.counter.increment("connection.sentBytesCalls")
+
+    def receivedBytes(self, num):
+        self.counter.increment("connection.receivedBytes", num)
+
+class ThreadObserverI(Ice.Instrumentation.ThreadObserver, ObserverI):
+    def stateChanged(self, oldState, newState):
+        test(isinstance(oldState, Ice.Instrumentation.ThreadState))
+        test(isinstance(newState, Ice.Instrumentation.ThreadState))
+
+class CommunicatorObserverI(Ice.Instrumentation.CommunicatorObserver):
+    def __init__(self):
+        self.counter = Counter()
+        self.updater = None
+        self.connectionObserver = ConnectionObserverI(self.counter, "connection")
+
+    def getConnectionObserver(self, connectionInfo, endpoint, state, old):
+        test(isinstance(state, Ice.Instrumentation.ConnectionState))
+        test(old is None or old is self.connectionObserver)
+        return self.connectionObserver
+
+    def getThreadObserver(self, parent, id, state, old):
+        return ThreadObserverI(self.counter, "thread")
+
+    def getInvocationObserver(self, proxy, operation, context):
+        test(isinstance(proxy, Test.HelloPrx) or isinstance(proxy, Ice.ObjectPrx))
+        if operation == "ice_isA":
+            return None
+        test(context.get("key") == "value")
+        return InvocationObserverI(self.counter, "invocation")
+
+    def setObserverUpdater(self, updater):
+        self.updater = updater
+
+class FailingObserverI(Ice.Instrumentation.CommunicatorObserver):
+    def getInvocationObserver(self, proxy, operation, context):
+        raise RuntimeError("failing observer")
+
+class LoggerI(Ice.Logger):
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.warnings = []
+
+    def _print(self, message):
+        pass
+
+    def trace(self, category, message):
+        pass
+
+    def warning(self, message):
+        with self.lock:
+            self.warnings.append(message)
+
+    def error(self, message):
+        pass
+
+    def getPrefix(self):
+        return ""
+
+    def cloneWithPrefix(self, prefix):
+        return self
+
+def createCommunicator(helper, args, observer, sampleRate=1, logger=None):
+    initData = Ice.InitializationData()
+    initData.properties = helper.createTestProperties(args)
+    initData.observer = observer
+    initData.observerSampleRate = sampleRate
+    initData.logger = logger
+    return helper.initialize(initData=initData)
+
+def allTests(helper, args):
+    ref = "hello:{0}".format(helper.getTestEndpoint())
+
+    sys.stdout.write("testing invocation observers... ")
+    sys.stdout.flush()
+    observer = CommunicatorObserverI()
+    with createCommunicator(helper, args, observer) as communicator:
+        test(observer.updater is not None)
+        hello = Test.HelloPrx.checkedCast(communicator.stringToProxy(ref)).ice_context({"key": "value"})
+        hello.op()
+        hello.opAsync().result()
+        try:
+            hello.fail()
+            test(False)
+        except Test.UserEx:
+            pass
+
+        counter = observer.counter
+        counter.waitFor("invocation.detach", 3)
+        test(counter.get("invocation.attach") == 3)
+        test(counter.get("invocation.detach") == 3)
+        test(counter.get("invocation.userException") == 1)
+        test(counter.get("invocation.failed") == 0)
+        counter.waitFor("remote.detach", 3)
+        test(counter.get("remote.attach") == 3)
+        test(counter.get("remote.reply") == 3)
+
+        test(counter.get("connection.attach") >= 1)
+        test(counter.get("connection.sentBytes") > 0)
+        test(counter.get("connection.receivedBytes") > 0)
+        test(counter.get("thread.attach") >= 1)
+
+        observer.updater.updateConnectionObservers()
+        observer.updater.updateThreadObservers()
+    print("ok")
+
+    sys.stdout.write("testing observer sampling... ")
+    sys.stdout.flush()
+    observer = CommunicatorObserverI()
+    with createCommunicator(helper, args, observer, 4) as communicator:
+        hello = Test.HelloPrx.uncheckedCast(communicator.stringToProxy(ref)).ice_context({"key": "value"})
+        for i in range(0, 20):
+            hello.op()
+        observer.counter.waitFor("invocation.detach", 5)
+        test(observer.counter.get("invocation.attach") == 5)
+
+    #
+    # The bytes sent by the 20 requests and the connection closure are reported in at most 6 calls,
+    # the remaining bytes are reported when the connection observer is detached.
+    #
+    test(observer.counter.get("connection.sentBytes") > 0)
+    test(0 < observer.counter.get("connection.sentBytesCalls") <= 7)
+
+    for rate in [0, -1, "1"]:
+        try:
+            createCommunicator(helper, args, observer, rate)
+            test(False)
+        except ValueError:
+            pass
+    print("ok")
+
+    sys.stdout.write("testing dispatch observers... ")
+    sys.stdout.flush()
+    with helper.initialize(args=args) as communicator:
+        hello = Test.HelloPrx.uncheckedCast(communicator.stringToProxy(ref))
+        count = hello.getDispatchCount()
+        hello.op()
+        hello.op()
+        test(hello.getDispatchCount() == count + 2)
+    print("ok")
+
+    sys.stdout.write("testing observer exceptions... ")
+    sys.stdout.flush()
+    logger = LoggerI()
+    with createCommunicator(helper, args, FailingObserverI(), logger=logger) as communicator:
+        hello = Test.HelloPrx.uncheckedCast(communicator.stringToProxy(ref))
+        hello.op()
+        test(len(logger.warnings) == 1)
+        test(logger.warnings[0].find("getInvocationObserver") >= 0)
+        test(logger.warnings[0].find("failing observer") >= 0)
+    print("ok")
+
+    with helper.initialize(args=args) as communicator:
+        Test.HelloPrx.uncheckedCast(communicator.stringToProxy(ref)).shutdown()
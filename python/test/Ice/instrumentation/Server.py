@@ -0,0 +1,24 @@
+#!/usr/bin/env python
+#
+# Copyright (c) ZeroC, Inc. All rights reserved.
+#
+
+from TestHelper import TestHelper
+TestHelper.loadSlice("Test.ice")
+import Ice
+import TestI
+
+
+class Server(TestHelper):
+
+    def run(self, args):
+        observer = TestI.CommunicatorObserverI()
+        initData = Ice.InitializationData()
+        initData.properties = self.createTestProperties(args)
+        initData.observer = observer
+        with self.initialize(initData=initData) as communicator:
+            communicator.getProperties().setProperty("TestAdapter.Endpoints", self.getTestEndpoint())
+            adapter = communicator.createObjectAdapter("TestAdapter")
+            adapter.add(TestI.HelloI(observer), Ice.stringToIdentity("hello"))
+            adapter.activate()
+            communicator.waitForShutdown()
@@ -0,0 +1,46 @@
+#
+# Copyright (c) ZeroC, Inc. All rights reserved.
+#
+
+import Ice, Test, threading
+
+class DispatchObserverI(Ice.Instrumentation.DispatchObserver):
+    def __init__(self, parent):
+        self.parent = parent
+
+    def attach(self):
+        self.parent.attached()
+
+class CommunicatorObserverI(Ice.Instrumentation.CommunicatorObserver):
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.dispatchCount = 0
+
+    def getDispatchObserver(self, current, size):
+        if current.operation == "getDispatchCount":
+            return None
+        return DispatchObserverI(self)
+
+    def attached(self):
+        with self.lock:
+            self.dispatchCount += 1
+
+    def getCount(self):
+        with self.lock:
+            return self.dispatchCount
+
+class HelloI(Test.Hello):
+    def __init__(self, observer):
+        self.observer = observer
+
+    def op(self, current=None):
+        pass
+
+    def fail(self, current=None):
+        raise Test.UserEx()
+
+    def getDispatchCount(self, current=None):
+        return self.observer.getCount()
+
+    def shutdown(self, current=None):
+        current.adapter.getCommunicator().shutdown()
@@ -768,6 +768,13 @@ def twoways(helper, p):
     test(ro[1100] == 123123)
     test(ro[1101] == 0)
 
+    for bad in ({70000: 1}, {110: 2**40}, {110: "1"}):
+        try:
+            p.opShortIntD(bad, di2)
+            test(False)
+        except ValueError:
+            pass
+
     #
     # opLongFloatD
     #
@@ -784,6 +791,15 @@ def twoways(helper, p):
     test(ro[999999111] - 123123.2 < 0.01)
     test(ro[999999130] - 0.5 < 0.01)
 
+    ro, do = p.opLongFloatD({1: 2, 3: float("inf")}, {})
+    test(do == {1: 2.0, 3: float("inf")})
+
+    try:
+        p.opLongFloatD({1: 1e300}, {})
+        test(False)
+    except ValueError:
+        pass
+
     #
     # opStringStringD
     #
@@ -1324,6 +1340,19 @@ def twoways(helper, p):
     r = p2.opContext(ctx)
     test(r == ctx)
 
+    #
+    # A context dictionary passed to several invocations must be converted again when it's modified.
+    #
+    ctx2 = dict(ctx)
+    test(p.opContext(ctx2) == ctx)
+    test(p.opContext(ctx2) == ctx)
+    ctx2['four'] = 'FOUR'
+    test(p.opContext(ctx2) == ctx2)
+    ctx2['one'] = 'UN'
+    test(p.opContext(ctx2)['one'] == 'UN')
+    del ctx2['four']
+    test(p.opContext(ctx2) == ctx2)
+
     #
     # Test implicit context propagation
     #
@@ -1431,3 +1460,35 @@ def twoways(helper, p):
     p1 = { "test": "test" }
     (p3, p2) = p.opMDict2(p1)
     test(p3["test"] == "test" and p2["test"] == "test")
+
+    #
+    # Marshaled arguments can be sent to several proxies.
+    #
+    args = Ice.MarshaledArgs(p, "opShortIntLong", (10, 11, 12))
+    for prx in [p, p.ice_context({ "one": "ONE" }), Test.MyDerivedClassPrx.uncheckedCast(p)]:
+        r, s, i, l = args.invoke(prx)
+        test(s == 10 and i == 11 and l == 12 and r == 12)
+        r, s, i, l = args.invokeAsync(prx).result()
+        test(s == 10 and i == 11 and l == 12 and r == 12)
+
+    args = Ice.MarshaledArgs(p, "opVoid")
+    args.invoke(p)
+
+    other = Ice.Encoding_1_1 if p.ice_getEncodingVersion() == Ice.Encoding_1_0 else Ice.Encoding_1_0
+    try:
+        args.invoke(p.ice_encodingVersion(other))
+        test(False)
+    except ValueError:
+        pass
+
+    try:
+        Ice.MarshaledArgs(p, "opShortIntLong", (10, 11))
+        test(False)
+    except RuntimeError:
+        pass
+
+    try:
+        Ice.MarshaledArgs(p, "unknownOperation")
+        test(False)
+    except ValueError:
+        pass
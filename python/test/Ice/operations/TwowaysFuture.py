@@ -1254,6 +1254,12 @@ def twowaysFuture(helper, p):
     c = f.result()
     test(c == ctx)
 
+    #
+    # AsyncMany invocations use the proxy context when no context is given.
+    #
+    test(p2.opContextAsyncMany([(), ()]).result() == [ctx, ctx])
+    test(p.opContextAsyncMany([()], ctx).result() == [ctx])
+
     #
     # Test implicit context propagation
     #
@@ -1299,6 +1305,7 @@ def twowaysFuture(helper, p):
             f = p3.opContextAsync()
             c = f.result()
             test(c == combined)
+            test(p3.opContextAsyncMany([()]).result() == [combined])
 
             ic.destroy()
 
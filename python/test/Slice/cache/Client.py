@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+#
+# Copyright (c) ZeroC, Inc. All rights reserved.
+#
+
+from TestHelper import TestHelper
+import os
+import shutil
+import sys
+import tempfile
+import Ice
+
+
+def test(b):
+    if not b:
+        raise RuntimeError('test assertion failed')
+
+
+def writeSlice(path, content):
+    with open(path, "w") as f:
+        f.write(content)
+
+
+def entries(cacheDir):
+    return sorted(os.listdir(cacheDir)) if os.path.exists(cacheDir) else []
+
+
+class Client(TestHelper):
+
+    def run(self, args):
+        sys.stdout.write("testing Slice cache... ")
+        sys.stdout.flush()
+
+        tmpDir = tempfile.mkdtemp()
+        try:
+            cacheDir = os.path.join(tmpDir, "cache")
+            sliceFile = os.path.join(tmpDir, "CacheTest.ice")
+            includedFile = os.path.join(tmpDir, "CacheIncluded.ice")
+            options = "--all '-I{0}' '--cache-dir={1}' '{2}'".format(tmpDir, cacheDir, sliceFile)
+
+            writeSlice(includedFile, "#pragma once\nmodule CacheTest { const int IncludedValue = 1; }\n")
+            writeSlice(sliceFile, "#include <CacheIncluded.ice>\nmodule CacheTest { const int Value = 1; }\n")
+
+            #
+            # The first load populates the cache, the second one loads the code from the cache.
+            #
+            Ice.loadSlice(options)
+            import CacheTest
+            test(CacheTest.Value == 1)
+            test(CacheTest.IncludedValue == 1)
+            test(len(entries(cacheDir)) == 1)
+            test(entries(cacheDir)[0].startswith("CacheTest-"))
+
+            Ice.loadSlice(options)
+            test(CacheTest.Value == 1)
+            test(len(entries(cacheDir)) == 1)
+
+            #
+            # Updating the Slice file or one of its included files selects a new entry.
+            #
+            writeSlice(sliceFile, "#include <CacheIncluded.ice>\nmodule CacheTest { const int Value = 2; }\n")
+            Ice.loadSlice(options)
+            test(CacheTest.Value == 2)
+            test(len(entries(cacheDir)) == 2)
+
+            writeSlice(includedFile, "#pragma once\nmodule CacheTest { const int IncludedValue = 2; }\n")
+            Ice.loadSlice(options)
+            test(CacheTest.IncludedValue == 2)
+            test(len(entries(cacheDir)) == 3)
+
+            #
+            # So does changing the preprocessor options.
+            #
+            Ice.loadSlice("-DCACHE_TEST " + options)
+            test(len(entries(cacheDir)) == 4)
+
+            #
+            # A corrupted entry is ignored and regenerated.
+            #
+            for e in entries(cacheDir):
+                writeSlice(os.path.join(cacheDir, e), "corrupted")
+            Ice.loadSlice(options)
+            test(CacheTest.Value == 2)
+            test(CacheTest.IncludedValue == 2)
+            test(len(entries(cacheDir)) == 4)
+
+            #
+            # --no-cache disables the cache.
+            #
+            shutil.rmtree(cacheDir)
+            Ice.loadSlice("--no-cache " + options)
+            test(entries(cacheDir) == [])
+        finally:
+            shutil.rmtree(tmpDir)
+
+        print("ok")